@@ -0,0 +1,60 @@
+# benchmarks/comparar.py
+"""
+Compara dos resultados de benchmarks.suite (p. ej. de dos commits).
+
+    python -m benchmarks.comparar antes.json despues.json [--umbral 1.25]
+
+Marca como regresión los casos cuya mediana creció más del umbral (relativo)
+y más de --minimo-ms (absoluto, para no alarmarse por ruido en casos de
+microsegundos). Sale con código 1 si hay regresiones.
+"""
+import argparse
+import json
+import sys
+
+
+def _cargar(ruta: str) -> dict:
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def comparar(antes: dict, despues: dict, umbral: float = 1.25, minimo_ms: float = 1.0) -> list[dict]:
+    previos = {(r["grupo"], r["caso"]): r for r in antes["resultados"]}
+    filas = []
+    for r in despues["resultados"]:
+        p = previos.get((r["grupo"], r["caso"]))
+        if not p or "ms_mediana" not in p or "ms_mediana" not in r:
+            continue
+        a, d = p["ms_mediana"], r["ms_mediana"]
+        razon = d / a if a else float("inf")
+        filas.append({
+            "grupo": r["grupo"], "caso": r["caso"], "antes": a, "despues": d, "razon": razon,
+            "regresion": razon > umbral and d - a > minimo_ms,
+        })
+    return filas
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Compara dos JSON de benchmarks.")
+    ap.add_argument("antes")
+    ap.add_argument("despues")
+    ap.add_argument("--umbral", type=float, default=1.25)
+    ap.add_argument("--minimo-ms", type=float, default=1.0)
+    args = ap.parse_args()
+
+    antes, despues = _cargar(args.antes), _cargar(args.despues)
+    for clave in ("escala", "semilla"):
+        if antes["meta"][clave] != despues["meta"][clave]:
+            print(f"Aviso: {clave} distinta ({antes['meta'][clave]} vs {despues['meta'][clave]})")
+
+    filas = comparar(antes, despues, args.umbral, args.minimo_ms)
+    print(f"{antes['meta']['commit']} -> {despues['meta']['commit']}")
+    print(f"{'grupo':<13}{'caso':<36}{'antes':>10}{'después':>10}{'x':>7}")
+    for f in sorted(filas, key=lambda f: -f["razon"]):
+        marca = "  REGRESIÓN" if f["regresion"] else ""
+        print(f"{f['grupo']:<13}{f['caso']:<36}{f['antes']:>10.2f}{f['despues']:>10.2f}{f['razon']:>7.2f}{marca}")
+    return 1 if any(f["regresion"] for f in filas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# benchmarks/concurrencia.py
+"""
+Escrituras concurrentes: varias "sesiones" (hilos) registrando llaves a la vez,
+como en un cambio de clase, con y sin el escritor único.
+
+    python -m benchmarks.concurrencia [--hilos 16] [--por-hilo 50] [--busy-ms 5000]
+
+Cada hilo llama registrar_evento por-hilo veces. Se mide throughput, latencia
+por llamada (p50/p95/max) y errores; en el modo "escritor" también las
+estadísticas de database_escritor (tamaño de lote, reintentos). --busy-ms
+fija el busy_timeout de las conexiones (bajarlo hace visibles los
+"database is locked" del modo directo). Sale con código 1 si el modo
+escritor tuvo errores o si el conteo final no cuadra.
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import database
+import database_escritor
+import database_pool
+
+
+def _sesion(i: int, n: int, latencias: list, errores: list, barrera: threading.Barrier) -> None:
+    barrera.wait()
+    for j in range(n):
+        t0 = time.perf_counter()
+        try:
+            database.registrar_evento(f"Portero {i}", "ADSO", f"Sala {j % 40}", "Entregada",
+                                      f"2025-03-03 07:{j % 60:02d}:00")
+        except Exception as e:
+            errores.append(str(e))
+        latencias.append((time.perf_counter() - t0) * 1000)
+
+
+def correr(modo: str, hilos: int, por_hilo: int, busy_ms: int) -> dict:
+    ruta = Path(tempfile.mkdtemp()) / f"concurrencia_{modo}.db"
+    database.RUTA_BD = str(ruta)
+    database_pool.cerrar_conexiones()
+    database.ensure_db()
+    database_escritor.HABILITADO = modo == "escritor"
+    database_escritor.limpiar_estadisticas()
+
+    latencias, errores = [], []
+    barrera = threading.Barrier(hilos)
+
+    def hilo(i):
+        with database.conexion() as conn:
+            conn.execute(f"PRAGMA busy_timeout = {int(busy_ms)}")
+        _sesion(i, por_hilo, latencias, errores, barrera)
+
+    t0 = time.perf_counter()
+    ts = [threading.Thread(target=hilo, args=(i,)) for i in range(hilos)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    seg = time.perf_counter() - t0
+
+    database_escritor.detener()
+    guardadas = database.contar_historial.sin_cache()
+    database_pool.cerrar_conexiones()
+    orden = sorted(latencias)
+    return {
+        "modo": modo,
+        "llamadas": len(latencias),
+        "guardadas": guardadas,
+        "errores": len(errores),
+        "ejemplo_error": errores[0] if errores else None,
+        "por_s": round(len(latencias) / seg, 1),
+        "p50_ms": round(statistics.median(orden), 2),
+        "p95_ms": round(orden[int(0.95 * (len(orden) - 1))], 2),
+        "max_ms": round(orden[-1], 2),
+        "escritor": database_escritor.estadisticas_escritor() if modo == "escritor" else None,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Escrituras concurrentes con y sin escritor único.")
+    ap.add_argument("--hilos", type=int, default=16)
+    ap.add_argument("--por-hilo", type=int, default=50)
+    ap.add_argument("--busy-ms", type=int, default=5000)
+    args = ap.parse_args()
+
+    fallo = False
+    for modo in ("directo", "escritor"):
+        r = correr(modo, args.hilos, args.por_hilo, args.busy_ms)
+        esc = r.pop("escritor")
+        print(f"{r['modo']:<9} {r['por_s']:>8} escr/s  p50 {r['p50_ms']:>7} ms  p95 {r['p95_ms']:>7} ms  "
+              f"max {r['max_ms']:>8} ms  errores {r['errores']}  guardadas {r['guardadas']}/{r['llamadas']}")
+        if r["ejemplo_error"]:
+            print(f"          p. ej.: {r['ejemplo_error']}")
+        if esc:
+            print(f"          lotes {esc['lotes']}  lote medio {esc['lote_medio']}  max {esc['max_lote']}  "
+                  f"reintentos {esc['reintentos']}  espera p95 {esc['espera_p95_ms']} ms")
+            fallo = r["errores"] > 0 or r["guardadas"] != r["llamadas"]
+    return 1 if fallo else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
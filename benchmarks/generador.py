@@ -0,0 +1,177 @@
+# benchmarks/generador.py
+"""
+Generador de datos sintéticos (con semilla) para medir database.py a escala.
+
+    python -m benchmarks.generador /tmp/bench.db --escala 100k
+
+La escala es el número de eventos de llaves; el resto de tablas se deriva de
+ella (ver proporciones). Las filas se insertan por lotes con executemany y el
+esquema/triggers son los de database.ensure_db(), así que índices, FTS y
+tablas derivadas quedan como en producción.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import database
+from database_utils import txn
+from validators import CATEGORIAS_VALIDAS, ESTADOS_VALIDOS
+
+ESCALAS = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+TAM_LOTE = 50_000
+EVENTOS_POR_DIA = 120  # ~60 préstamos/día en un colegio grande
+
+NOMBRES = ["Ana", "Luis", "María", "Carlos", "Laura", "Jorge", "Paula", "Andrés", "Sofía", "Diego",
+           "Camila", "Juan", "Valentina", "Mateo", "Juliana", "Felipe", "Daniela", "Santiago"]
+APELLIDOS = ["Gómez", "Pérez", "Rodríguez", "López", "Martínez", "García", "Hernández", "Díaz",
+             "Torres", "Ramírez", "Vargas", "Castro", "Rojas", "Moreno", "Ortiz", "de la Cruz"]
+PROGRAMAS = ["Electrónica", "ADSO", "Multimedia", "Redes", "Teleco", "Mecatrónica", "Contabilidad"]
+MARCAS = ["Dell", "HP", "Lenovo", "Cisco", "Fluke", "Tektronix", "Epson", "Samsung", "Asus"]
+MOTIVOS = ["Traslado", "Préstamo", "Mantenimiento", "Auditoría", "Otro"]
+
+
+def proporciones(escala: int) -> dict:
+    """Filas por tabla para una escala dada (eventos de llaves)."""
+    return {
+        "rooms": min(2_000, max(20, escala // 500)),
+        "llaves": escala,
+        "inventario": max(200, escala // 10),
+        "inventario_movs": max(200, escala // 5),
+        "recordatorios": min(5_000, max(20, escala // 1_000)),
+    }
+
+
+def _salones(rng, n):
+    vistos, out = set(), []
+    while len(out) < n:
+        codigo = f"C{rng.randint(1, 9)}-{rng.randint(100, 999)}"
+        if rng.random() < 0.2:
+            codigo += f"-{rng.choice('ABCDEF')}"
+        if codigo not in vistos:
+            vistos.add(codigo)
+            out.append(codigo)
+    return out
+
+
+def _personas(rng, n=400):
+    return sorted({f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+                   for _ in range(n)})
+
+
+def _por_lotes(conn, sql, filas):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= TAM_LOTE:
+            with txn(conn):
+                conn.executemany(sql, lote)
+            lote = []
+    if lote:
+        with txn(conn):
+            conn.executemany(sql, lote)
+
+
+def _eventos_llaves(rng, n, salones, personas, inicio):
+    """Entregas/devoluciones coherentes: una llave entregada se devuelve antes de volver a salir."""
+    activos = {}  # salón -> (nombre, área)
+    paso = timedelta(days=1) / EVENTOS_POR_DIA
+    t = inicio
+    for _ in range(n):
+        t += paso * rng.uniform(0.2, 1.8)
+        salon = rng.choice(salones)
+        if salon in activos:
+            nombre, area = activos.pop(salon)
+            accion = "Devuelta"
+        else:
+            nombre, area = rng.choice(personas), rng.choice(PROGRAMAS)
+            activos[salon] = (nombre, area)
+            accion = "Entregada"
+        yield (nombre, area, f"Sala {salon}", accion, t.strftime("%Y-%m-%d %H:%M:%S"))
+
+
+def _equipos(rng, n, salones, personas, inicio, dias):
+    pesos_estado = [70, 20, 7, 3]
+    for i in range(1, n + 1):
+        tipo = rng.choice(CATEGORIAS_VALIDAS)
+        fecha = inicio + timedelta(days=rng.uniform(0, dias))
+        yield (
+            f"{tipo} {rng.choice(MARCAS)} {rng.randint(100, 9999)}",
+            tipo,
+            rng.choices(ESTADOS_VALIDOS, pesos_estado)[0],
+            rng.choice(salones) if rng.random() < 0.9 else "BODEGA",
+            rng.choice(personas),
+            fecha.strftime("%Y-%m-%d %H:%M:%S"),
+            f"EQ-{i:08d}" if rng.random() < 0.9 else None,  # 10% consumibles sin placa
+        )
+
+
+def _movimientos(rng, n, n_equipos, salones, personas, inicio, dias):
+    for _ in range(n):
+        inv_id = rng.randint(1, n_equipos)
+        origen, destino = rng.sample(salones, 2)
+        fecha = inicio + timedelta(days=rng.uniform(0, dias))
+        yield (inv_id, f"EQ-{inv_id:08d}", origen, destino, rng.choice(MOTIVOS),
+               rng.choice(personas), fecha.strftime("%Y-%m-%d %H:%M:%S"), None)
+
+
+def generar(ruta: str, escala: int = 10_000, semilla: int = 42, filas: dict | None = None) -> dict:
+    """
+    Crea (o rellena) la BD en `ruta` con datos sintéticos reproducibles.
+    `filas` permite fijar el tamaño de tablas puntuales. Devuelve filas por
+    tabla y segundos empleados.
+    """
+    t0 = time.perf_counter()
+    rng = random.Random(semilla)
+    n = {**proporciones(escala), **(filas or {})}
+
+    database.RUTA_BD = str(ruta)
+    database.ensure_db()
+
+    salones = _salones(rng, n["rooms"])
+    personas = _personas(rng)
+    dias = max(1, n["llaves"] // EVENTOS_POR_DIA)
+    inicio = datetime(2025, 1, 1) - timedelta(days=dias)
+
+    with database.conexion() as conn:
+        _por_lotes(conn, "INSERT INTO rooms (codigo, edificio) VALUES (?, ?)",
+                   ((s, s.split("-")[0]) for s in salones))
+        _por_lotes(conn, "INSERT INTO llaves (nombre, area, salon, accion, fecha_hora) VALUES (?,?,?,?,?)",
+                   _eventos_llaves(rng, n["llaves"], salones, personas, inicio))
+        _por_lotes(conn, """INSERT INTO inventario
+                            (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
+                            VALUES (?,?,?,?,?,?,?)""",
+                   _equipos(rng, n["inventario"], salones, personas, inicio, dias))
+        _por_lotes(conn, """INSERT INTO inventario_movs
+                            (inventario_id, placa, salon_origen, salon_destino, motivo,
+                             responsable, fecha_hora, notas)
+                            VALUES (?,?,?,?,?,?,?,?)""",
+                   _movimientos(rng, n["inventario_movs"], n["inventario"], salones, personas, inicio, dias))
+        _por_lotes(conn, "INSERT INTO recordatorios (texto, fecha, responsable, hecho) VALUES (?,?,?,?)",
+                   ((f"Revisar equipos de Sala {rng.choice(salones)}",
+                     (inicio + timedelta(days=rng.uniform(0, dias + 30))).strftime("%Y-%m-%d"),
+                     rng.choice(personas), int(rng.random() < 0.6))
+                    for _ in range(n["recordatorios"])))
+
+    # Tablas derivadas: los INSERT directos no pasan por registrar_evento
+    database.reconstruir_llaves_estado()
+    database.reconstruir_llaves_diario()
+    return {"filas": n, "segundos": round(time.perf_counter() - t0, 2)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera una BD sintética para benchmarks.")
+    ap.add_argument("ruta")
+    ap.add_argument("--escala", default="10k", help=f"{', '.join(ESCALAS)} o un número de eventos")
+    ap.add_argument("--semilla", type=int, default=42)
+    args = ap.parse_args()
+
+    if Path(args.ruta).exists():
+        ap.error(f"{args.ruta} ya existe (el generador no mezcla datos con una BD previa)")
+    escala = ESCALAS.get(args.escala.lower()) or int(args.escala)
+    print(generar(args.ruta, escala, args.semilla))
+
+
+if __name__ == "__main__":
+    main()
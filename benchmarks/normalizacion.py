@@ -0,0 +1,107 @@
+# benchmarks/normalizacion.py
+"""
+Equivalencia y tiempos de las normalizaciones escalares vs vectorizadas.
+
+    python -m benchmarks.normalizacion [--filas 200000] [--semilla 42]
+
+Compara normalizar_salon_label/titlecase_nombre contra sus versiones *_series
+sobre casos borde y una muestra aleatoria, y comprueba que ambas sean
+idempotentes (f(f(x)) == f(x): las migraciones las aplican sobre datos ya
+guardados); sale con código 1 si algo falla. Luego mide escalar sin caché,
+escalar con LRU y Series.
+"""
+import argparse
+import random
+import sys
+import time
+
+import pandas as pd
+
+from normalizacion import (
+    normalizar_salon_label, normalizar_salon_series, titlecase_nombre, titlecase_series,
+)
+
+BORDE_SALON = [
+    "", " ", "7", "Sala 7", "sala   316 f", "SALÓN 303 - F", "salon 3-204", "316F", "303-F-2",
+    "bodega", "  La Bodega ", "BODEGA 2", "Sala", "salón", "Auditorio", "C3-512-A", "Sala C3-512",
+    "lab. 12b", "7a", "-", "\t7\n", "Sala A12", "piso 2 sala 14",
+    "Sala C3-204", "C3-204", "LAB 2", "Sala B2", "Salón", "sala de juntas", "Sala 303-F",
+]
+BORDE_NOMBRE = [
+    "", "  ", "ana maría de la cruz", "DE LA CRUZ", "juan y pedro", "luis e hijos", "o'neil",
+    "maría-josé  pérez", "josé DEL valle", "da silva", "y", "ñandú  ñoño", "ÁLVARO do carmo",
+    "  laura\tlos  santos ", "de", "la de los",
+]
+
+
+def _aleatorios(rng: random.Random, n: int, distintos: int = 3000) -> tuple[list, list]:
+    """Como en las tablas reales: pocos valores distintos repetidos muchas veces."""
+    prefijos = ["", "sala ", "Sala ", "SALON ", "salón ", "  sala  "]
+    sufijos = ["", "f", " F", "-A", " - b", "-2"]
+    salones = [f"{rng.choice(prefijos)}{rng.randint(1, 999)}{rng.choice(sufijos)}" for _ in range(distintos)]
+    palabras = ["ana", "MARÍA", "de", "la", "cruz", "Luis", "del", "valle", "y", "pérez", "los", "e"]
+    nombres = [" ".join(rng.choice(palabras) for _ in range(rng.randint(1, 5))) for _ in range(distintos)]
+    return rng.choices(salones, k=n), rng.choices(nombres, k=n)
+
+
+def diferencias(escalar, vectorial, valores: list) -> list[tuple]:
+    esperado = [escalar(v) for v in valores]
+    obtenido = vectorial(pd.Series(valores, dtype=object)).tolist()
+    return [(v, e, o) for v, e, o in zip(valores, esperado, obtenido) if e != o]
+
+
+def no_idempotentes(escalar, vectorial, valores: list) -> list[tuple]:
+    """Valores x con f(f(x)) != f(x), en la escalar o en la vectorizada."""
+    unicos = list(dict.fromkeys(valores))
+    una = vectorial(pd.Series(unicos, dtype=object))
+    dos = vectorial(una).tolist()
+    return [(v, e, escalar(e)) for v, e, d in zip(unicos, una.tolist(), dos)
+            if escalar(e) != e or d != e]
+
+
+def _ms(fn) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Equivalencia y tiempos de normalizacion.py.")
+    ap.add_argument("--filas", type=int, default=200_000)
+    ap.add_argument("--semilla", type=int, default=42)
+    args = ap.parse_args()
+
+    salones, nombres = _aleatorios(random.Random(args.semilla), args.filas)
+    pares = [
+        ("salon", normalizar_salon_label, normalizar_salon_series, BORDE_SALON + salones),
+        ("nombre", titlecase_nombre, titlecase_series, BORDE_NOMBRE + nombres),
+    ]
+
+    fallos = 0
+    for nombre, escalar, vectorial, valores in pares:
+        difs = diferencias(escalar, vectorial, valores)
+        fallos += len(difs)
+        print(f"{nombre}: {len(valores)} valores, {len(difs)} diferencias")
+        for v, e, o in difs[:10]:
+            print(f"  {v!r}: escalar={e!r} series={o!r}")
+        no_idem = no_idempotentes(escalar, vectorial, valores)
+        fallos += len(no_idem)
+        print(f"{nombre}: {len(no_idem)} valores no idempotentes")
+        for v, una, dos in no_idem[:10]:
+            print(f"  {v!r}: f(x)={una!r} f(f(x))={dos!r}")
+
+    print(f"\n{'caso':<10}{'sin caché':>12}{'LRU':>10}{'series':>10}  (ms, {args.filas} filas)")
+    for nombre, escalar, vectorial, valores in pares:
+        valores = valores[-args.filas:]
+        serie = pd.Series(valores, dtype=object)
+        crudo = escalar.__wrapped__
+        escalar.cache_clear()
+        t_crudo = _ms(lambda: [crudo(v) for v in valores])
+        t_lru = _ms(lambda: [escalar(v) for v in valores])
+        t_serie = _ms(lambda: vectorial(serie))
+        print(f"{nombre:<10}{t_crudo:>12.1f}{t_lru:>10.1f}{t_serie:>10.1f}")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+# benchmarks/suite.py
+"""
+Benchmarks de database.py y de los caminos de datos de cada página.
+
+    python -m benchmarks.suite --escala 100k --repeticiones 5
+    python -m benchmarks.comparar antes.json despues.json
+
+Genera (una vez por escala/semilla) una BD sintética en benchmarks/.datos,
+la copia a un archivo temporal y mide cada caso. Las lecturas se miden sin
+la caché (wrapper.sin_cache) salvo en el grupo "pagina_tibia". El resultado
+se escribe en JSON (benchmarks/resultados/<commit>_<escala>.json por
+defecto) para comparar entre commits.
+"""
+import argparse
+import inspect
+import io
+import itertools
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import database
+import database_cache
+import database_pool
+from benchmarks.generador import ESCALAS, generar
+from services.exportacion import escribir_csv
+
+DIR = Path(__file__).resolve().parent
+DIR_DATOS = DIR / ".datos"
+DIR_RESULTADOS = DIR / "resultados"
+
+# Funciones públicas que no tiene sentido medir (conexión, compatibilidad, esquema)
+SIN_MEDIR = {
+    "obtener_conexion", "conexion", "estadisticas_conexiones", "estadisticas_escritor", "ensure_db",
+    "estadisticas_instantaneas",
+    "asegurar_esquema_inventario", "asegurar_esquema_llaves_estado", "asegurar_campo_placa",
+    "asegurar_esquema_movimientos", "asegurar_esquema_recordatorios", "run_startup_migrations",
+    "reporte_migraciones", "progreso_migraciones", "plan_consulta", "verificar_planes_consulta",
+}
+
+
+@dataclass
+class Caso:
+    nombre: str
+    grupo: str          # lectura | escritura | pagina_fria | pagina_tibia
+    fn: object
+    funciones: tuple = ()  # funciones de database.py que cubre
+
+
+def _sin_cache(fn):
+    return getattr(fn, "sin_cache", fn)
+
+
+def _fria(fn):
+    """Corre `fn` con la caché vacía (mide el costo real de la BD)."""
+    def correr():
+        database_cache.limpiar_cache()
+        return fn()
+    return correr
+
+
+def _muestras() -> dict:
+    """Valores reales de la BD para parametrizar los casos."""
+    with database.conexion() as conn:
+        uno = lambda sql: conn.execute(sql).fetchone()[0]
+        return {
+            "salon_llaves": uno("SELECT salon FROM llaves ORDER BY id DESC LIMIT 1"),
+            "profesor": uno("SELECT nombre FROM llaves ORDER BY id DESC LIMIT 1"),
+            "salon_inv": uno("SELECT salon FROM inventario GROUP BY salon ORDER BY COUNT(*) DESC LIMIT 1"),
+            "placa": uno("SELECT placa FROM inventario WHERE placa IS NOT NULL ORDER BY id DESC LIMIT 1"),
+            "responsable_mov": uno("SELECT responsable FROM inventario_movs ORDER BY id DESC LIMIT 1"),
+            "max_inv": uno("SELECT MAX(id) FROM inventario"),
+            "ultima_fecha": uno("SELECT MAX(fecha_hora) FROM llaves")[:10],
+        }
+
+
+def casos(m: dict) -> list[Caso]:
+    fin = date.fromisoformat(m["ultima_fecha"])
+    ini = fin - timedelta(days=30)
+    cont = itertools.count(1)
+    lotes = itertools.count(1)
+    borrados = itertools.count(1)
+    ahora = lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    placa_nueva = lambda: f"BENCH-{next(cont):08d}"
+    sc = _sin_cache
+    d = database
+
+    # Ids: el último equipo se edita/mueve uno a uno, los lotes se toman hacia
+    # atrás desde el penúltimo y los borrados individuales desde el id 1.
+    tam_lote = max(1, min(100, m["max_inv"] // 100))
+
+    def ids_lote():
+        hasta = m["max_inv"] - tam_lote * (next(lotes) - 1)
+        return list(range(hasta - tam_lote, hasta))
+
+    lecturas = [
+        Caso("obtener_historial", "lectura", sc(d.obtener_historial)),
+        Caso("contar_historial", "lectura", sc(d.contar_historial)),
+        Caso("llave_activa_por_salon", "lectura", lambda: d.llave_activa_por_salon(m["salon_llaves"])),
+        Caso("consultar_historial", "lectura", lambda: sc(d.consultar_historial)(limite=50)),
+        Caso("consultar_historial_filtrado", "lectura",
+             lambda: sc(d.consultar_historial)(limite=50, profesor=m["profesor"], fecha_ini=ini, fecha_fin=fin),
+             ("consultar_historial",)),
+        Caso("resumen_historial", "lectura", sc(d.resumen_historial)),
+        Caso("movimientos_por_dia", "lectura", lambda: sc(d.movimientos_por_dia)(fecha_ini=ini, fecha_fin=fin)),
+        Caso("ultimos_eventos", "lectura", lambda: sc(d.ultimos_eventos)(20)),
+        Caso("actividad_ultimos_dias", "lectura", _fria(lambda: d.actividad_ultimos_dias(7, fin))),
+        Caso("top_llaves", "lectura", lambda: sc(d.top_llaves)("salon", 8)),
+        Caso("valores_filtro_historial", "lectura", sc(d.valores_filtro_historial)),
+        Caso("obtener_llaves_activas", "lectura", sc(d.obtener_llaves_activas)),
+        Caso("contar_llaves_activas", "lectura", sc(d.contar_llaves_activas)),
+        Caso("obtener_salones", "lectura", sc(d.obtener_salones)),
+        Caso("obtener_inventario", "lectura", sc(d.obtener_inventario)),
+        Caso("contar_inventario", "lectura", sc(d.contar_inventario)),
+        Caso("inventario_por_estado", "lectura", sc(d.inventario_por_estado)),
+        Caso("salones_inventario", "lectura", sc(d.salones_inventario)),
+        Caso("inventario_salon", "lectura", lambda: sc(d.inventario_salon)(m["salon_inv"])),
+        Caso("resumen_salon", "lectura", lambda: sc(d.resumen_salon)(m["salon_inv"])),
+        Caso("buscar_inventario", "lectura", lambda: sc(d.buscar_inventario)("port dell", limite=100)),
+        Caso("existe_placa", "lectura", lambda: d.existe_placa(m["placa"])),
+        Caso("obtener_movimientos", "lectura", lambda: sc(d.obtener_movimientos)(fecha_ini=ini, fecha_fin=fin)),
+        Caso("movimientos_por_placa", "lectura", _fria(lambda: d.movimientos_por_placa(m["placa"]))),
+        Caso("consultar_movimientos", "lectura", lambda: sc(d.consultar_movimientos)(limite=50)),
+        Caso("consultar_movimientos_responsable", "lectura",
+             lambda: sc(d.consultar_movimientos)(limite=50, responsable=m["responsable_mov"]),
+             ("consultar_movimientos",)),
+        Caso("resumen_movimientos", "lectura", sc(d.resumen_movimientos)),
+        Caso("movimientos_por_salon", "lectura", lambda: sc(d.movimientos_por_salon)("salon_destino", 15)),
+        Caso("valores_filtro_movimientos", "lectura", sc(d.valores_filtro_movimientos)),
+        Caso("exportar_historial_csv", "lectura",
+             lambda: escribir_csv(d.consulta_exportar_historial(), io.BytesIO()), ("consulta_exportar_historial",)),
+        Caso("exportar_inventario_csv", "lectura",
+             lambda: escribir_csv(d.consulta_exportar_inventario(d.COLUMNAS_INVENTARIO), io.BytesIO()),
+             ("consulta_exportar_inventario",)),
+        Caso("exportar_movimientos_csv", "lectura",
+             lambda: escribir_csv(d.consulta_exportar_movimientos(), io.BytesIO()), ("consulta_exportar_movimientos",)),
+        Caso("obtener_recordatorios", "lectura", sc(d.obtener_recordatorios)),
+        Caso("obtener_trabajo", "lectura", lambda: sc(d.obtener_trabajo)(1)),
+        Caso("listar_trabajos", "lectura", sc(d.listar_trabajos)),
+        Caso("reconstruir_llaves_estado", "lectura", d.reconstruir_llaves_estado),
+        Caso("reconstruir_llaves_diario", "lectura", d.reconstruir_llaves_diario),
+        Caso("conciliar_llaves_diario", "lectura", lambda: d.conciliar_llaves_diario(ini, fin)),
+        Caso("reconstruir_inventario_resumen", "lectura", d.reconstruir_inventario_resumen),
+        Caso("conciliar_inventario_resumen", "lectura", d.conciliar_inventario_resumen),
+        Caso("contar_inventario_salon", "lectura",
+             lambda: sc(d.contar_inventario)(salon=m["salon_inv"], estado="Disponible"), ("contar_inventario",)),
+        Caso("ultima_secuencia", "lectura", d.ultima_secuencia),
+        Caso("cambios_desde", "lectura", lambda: d.cambios_desde("llaves", max(0, d.ultima_secuencia() - 100))),
+        Caso("movimientos_por_dia_1_anio", "lectura",
+             lambda: sc(d.movimientos_por_dia)(fecha_ini=fin - timedelta(days=365), fecha_fin=fin),
+             ("movimientos_por_dia",)),
+    ]
+
+    escrituras = [
+        Caso("registrar_evento", "escritura",
+             lambda: d.registrar_evento("Bench Uno", "ADSO", "Sala BENCH", "Entregada", ahora())),
+        Caso("eliminar_registro", "escritura",
+             lambda: d.eliminar_registro(d.consultar_historial.sin_cache(limite=1)[0]["id"].iloc[0])),
+        Caso("registrar_salon", "escritura", lambda: d.registrar_salon(f"B-{next(cont)}")),
+        Caso("agregar_equipo", "escritura",
+             lambda: d.agregar_equipo("Bench", "Router", "Disponible", "BODEGA", "Bench", ahora(), placa_nueva())),
+        Caso("agregar_equipo_safe", "escritura",
+             lambda: d.agregar_equipo_safe("Bench", "Router", "Disponible", "BODEGA", "Bench", ahora(), placa_nueva())),
+        Caso("actualizar_equipo", "escritura", lambda: d.actualizar_equipo(m["max_inv"], estado="En uso")),
+        Caso("actualizar_equipo_safe", "escritura", lambda: d.actualizar_equipo_safe(m["max_inv"], estado="Disponible")),
+        Caso("eliminar_equipo", "escritura", lambda: d.eliminar_equipo(next(borrados))),
+        Caso("eliminar_equipo_safe", "escritura", lambda: d.eliminar_equipo_safe(next(borrados))),
+        Caso("actualizar_equipos_lote", "escritura",
+             lambda: d.actualizar_equipos_lote(ids_lote(), responsable="Bench", estado="Dañado")),
+        Caso("eliminar_equipos_lote", "escritura", lambda: d.eliminar_equipos_lote(ids_lote(), responsable="Bench")),
+        Caso("mover_equipo", "escritura",
+             lambda: d.mover_equipo(m["max_inv"], "C1-100", "Traslado", "Bench", ahora())),
+        Caso("mover_equipo_safe", "escritura",
+             lambda: d.mover_equipo_safe(m["max_inv"], "C1-101", "Traslado", "Bench", ahora())),
+        Caso("mover_equipos_lote", "escritura",
+             lambda: d.mover_equipos_lote(ids_lote(), "C1-102", "Traslado", "Bench")),
+        Caso("registrar_movimiento_equipo", "escritura",
+             lambda: d.registrar_movimiento_equipo(m["max_inv"], None, "C1-100", "C1-101", "Traslado", "Bench", ahora())),
+        Caso("importar_inventario_1000", "escritura",
+             lambda: d.importar_inventario([_bloque_importacion(next(cont), 1000)]), ("importar_inventario",)),
+        Caso("insertar_inventario_masivo", "escritura",
+             lambda: d.insertar_inventario_masivo(_bloque_importacion(next(cont), 200))),
+        Caso("insertar_inventario_masivo_safe", "escritura",
+             lambda: d.insertar_inventario_masivo_safe(_bloque_importacion(next(cont), 200))),
+        Caso("agregar_recordatorio", "escritura", lambda: d.agregar_recordatorio("Bench", None, "Bench")),
+        Caso("marcar_recordatorio", "escritura", lambda: d.marcar_recordatorio(1, True)),
+        Caso("eliminar_recordatorio", "escritura", lambda: d.eliminar_recordatorio(next(cont) + 1)),
+        Caso("crear_trabajo", "escritura", lambda: d.crear_trabajo("exportar", {"bench": True})),
+        Caso("actualizar_trabajo", "escritura", lambda: d.actualizar_trabajo(1, progreso=0.5, mensaje="Bench")),
+        Caso("marcar_trabajos_interrumpidos", "escritura", d.marcar_trabajos_interrumpidos),
+        Caso("purgar_cambios", "escritura", d.purgar_cambios),
+    ]
+
+    # Lo que cada página pide a la BD en un render (ver ui/pages)
+    paginas = {
+        "dashboard": lambda: (d.contar_historial(), d.contar_inventario(), d.contar_llaves_activas(),
+                              d.obtener_recordatorios(), d.ultimos_eventos(6), d.actividad_ultimos_dias(7, fin)),
+        "activas": lambda: (d.contar_historial(), d.obtener_llaves_activas()),
+        "historial": lambda: (d.valores_filtro_historial(), d.resumen_historial(),
+                              d.consultar_historial(limite=50)),
+        "stats": lambda: (d.resumen_historial(), d.contar_inventario(), d.valores_filtro_historial(),
+                          d.movimientos_por_dia(fecha_ini=ini, fecha_fin=fin),
+                          d.top_llaves("salon", 8, fecha_ini=ini, fecha_fin=fin),
+                          d.top_llaves("nombre", 8, fecha_ini=ini, fecha_fin=fin),
+                          d.inventario_por_estado()),
+        "inventario": lambda: (d.obtener_inventario(), d.obtener_inventario()),
+        "inventario_busqueda": lambda: (d.obtener_inventario(),
+                                        d.buscar_inventario("port", columnas=("placa", "nombre", "tipo", "salon"),
+                                                            limite=100)),
+        "inv_salon": lambda: (d.obtener_salones(), d.salones_inventario(), d.resumen_salon(m["salon_inv"]),
+                              d.inventario_salon(m["salon_inv"])),
+        "mov_equipos": lambda: (d.valores_filtro_movimientos(), d.resumen_movimientos(),
+                                d.consultar_movimientos(limite=50),
+                                d.movimientos_por_salon("salon_origen", 15),
+                                d.movimientos_por_salon("salon_destino", 15)),
+    }
+
+    return (lecturas + escrituras
+            + [Caso(f"pagina:{k}", "pagina_fria", _fria(fn)) for k, fn in paginas.items()]
+            + [Caso(f"pagina:{k}", "pagina_tibia", fn) for k, fn in paginas.items()])
+
+
+def _bloque_importacion(semilla: int, n: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "fila": range(2, n + 2),
+        "nombre": [f"Importado {semilla}-{i}" for i in range(n)],
+        "tipo": "Router",
+        "estado": "Disponible",
+        "salon": "BODEGA",
+        "responsable": "Bench",
+        "fecha_registro": "2025-01-01 00:00:00",
+        "placa": [f"IMP-{semilla:05d}-{i:05d}" for i in range(n)],
+        "error": None,
+    })[database.COLUMNAS_IMPORTACION]
+
+
+def _percentil(valores, p):
+    orden = sorted(valores)
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+def medir(caso: Caso, repeticiones: int) -> dict:
+    tiempos, error = [], None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        try:
+            r = caso.fn()
+        except Exception as e:  # el caso queda registrado con su error
+            error = f"{type(e).__name__}: {e}"
+            break
+        if getattr(r, "ok", True) is False:  # wrappers *_safe devuelven Result
+            error = f"Result no ok: {r.error}"
+            break
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    out = {"caso": caso.nombre, "grupo": caso.grupo, "repeticiones": len(tiempos)}
+    if tiempos:
+        out.update({
+            "ms_min": round(min(tiempos), 3),
+            "ms_mediana": round(statistics.median(tiempos), 3),
+            "ms_p95": round(_percentil(tiempos, 95), 3),
+            "ms_media": round(statistics.fmean(tiempos), 3),
+        })
+    if error:
+        out["error"] = error
+    return out
+
+
+def funciones_publicas() -> list[str]:
+    return sorted(
+        n for n, f in inspect.getmembers(database, inspect.isfunction)
+        if f.__module__ == "database" and not n.startswith("_")
+    )
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DIR.parent,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def preparar_bd(escala: int, semilla: int) -> Path:
+    """BD generada una vez por escala/semilla (se reutiliza entre corridas)."""
+    DIR_DATOS.mkdir(exist_ok=True)
+    ruta = DIR_DATOS / f"bench_{escala}_{semilla}.db"
+    if not ruta.exists():
+        tmp = ruta.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        print(f"Generando {ruta.name} ...", flush=True)
+        print(generar(str(tmp), escala, semilla), flush=True)
+        database_pool.cerrar_conexiones()
+        tmp.rename(ruta)
+    return ruta
+
+
+def correr(escala: int, semilla: int = 42, repeticiones: int = 5, grupos=None, filtro: str = None) -> dict:
+    base = preparar_bd(escala, semilla)
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "bench.db"
+        shutil.copy(base, ruta)
+        database.RUTA_BD = str(ruta)
+        database.ensure_db()
+        with database.conexion() as conn:
+            filas = {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                     for t in ("llaves", "inventario", "inventario_movs", "rooms", "recordatorios")}
+
+        lista = casos(_muestras())
+        resultados = []
+        for caso in lista:
+            if grupos and caso.grupo not in grupos:
+                continue
+            if filtro and filtro not in caso.nombre:
+                continue
+            r = medir(caso, repeticiones)
+            resultados.append(r)
+            print(f"{r['grupo']:<13}{r['caso']:<36}{r.get('ms_mediana', r.get('error'))!s:>12}", flush=True)
+        database_pool.cerrar_conexiones()
+
+    cubiertas = {c.nombre for c in lista} | {f for c in lista for f in c.funciones}
+    return {
+        "meta": {
+            "commit": _commit(),
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "escala": escala,
+            "semilla": semilla,
+            "repeticiones": repeticiones,
+            "filas": filas,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+        },
+        "resultados": resultados,
+        "sin_caso": [f for f in funciones_publicas() if f not in cubiertas and f not in SIN_MEDIR],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmarks de database.py")
+    ap.add_argument("--escala", default="10k", help=f"{', '.join(ESCALAS)} o un número de eventos")
+    ap.add_argument("--semilla", type=int, default=42)
+    ap.add_argument("--repeticiones", type=int, default=5)
+    ap.add_argument("--grupo", action="append", choices=["lectura", "escritura", "pagina_fria", "pagina_tibia"])
+    ap.add_argument("--filtro", help="solo casos cuyo nombre contiene este texto")
+    ap.add_argument("--salida", help="ruta del JSON (por defecto benchmarks/resultados/<commit>_<escala>.json)")
+    args = ap.parse_args()
+
+    escala = ESCALAS.get(args.escala.lower()) or int(args.escala)
+    res = correr(escala, args.semilla, args.repeticiones, args.grupo, args.filtro)
+    salida = Path(args.salida) if args.salida else DIR_RESULTADOS / f"{res['meta']['commit']}_{args.escala}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(res, indent=2, ensure_ascii=False), encoding="utf-8")
+    if res["sin_caso"]:
+        print(f"Funciones públicas sin caso: {', '.join(res['sin_caso'])}")
+    print(f"Resultados: {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,46 @@
 # database.py
+import json
+import os
+import re
 import sqlite3
+import tempfile
+import threading
 import pandas as pd
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
+import database_pool
+from database_cache import cacheado, invalidar, ESQUEMA_CACHE
+import database_cache
+import database_escritor
+from database_escritor import serializado
+import database_cambios
+from database_cambios import Instantanea, TABLAS_CAMBIOS, ESQUEMA_CAMBIOS
+import database_metricas
+from database_metricas import ESQUEMA_SLOW_QUERIES
 from database_utils import txn
-from validators import validar_equipo, norm_salon, norm_placa
+from validators import validar_equipo, norm_salon, norm_placa, norm_fecha_hora, ESTADOS_VALIDOS
 from patterns import OK, ERR, Result
-from errors import ValidationError, ConflictError, NotFoundError, IntegrityError
-from validators import normalizar_salon_label, titlecase_nombre
+from errors import AppError, ValidationError, ConflictError, NotFoundError, IntegrityError
 
 # ---- RUTA ÚNICA Y CONEXIÓN ----
 RUTA_BD = str(Path(__file__).with_name("llaves.db"))
 
 def obtener_conexion():
-    """Crea y devuelve una conexión SQLite con configuración estándar."""
-    conn = sqlite3.connect(RUTA_BD, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    """Crea y devuelve una conexión SQLite NUEVA (el llamador debe cerrarla)."""
+    return database_pool.crear_conexion(RUTA_BD)
+
+def conexion():
+    """Conexión reutilizada del hilo actual (pool). Usar como context manager."""
+    return database_pool.conexion(RUTA_BD)
+
+def estadisticas_conexiones() -> dict:
+    return database_pool.estadisticas_pool()
+
+def estadisticas_escritor() -> dict:
+    return database_escritor.estadisticas_escritor()
+
+database_cache.usar_conexion(conexion)
 
 # ---- ESQUEMA BASE (llaves + inventario) ----
 ESQUEMA_BASE = """
@@ -30,6 +53,9 @@ CREATE TABLE IF NOT EXISTS llaves (
     fecha_hora TEXT       -- ISO 'YYYY-MM-DD HH:MM:SS'
 );
 CREATE INDEX IF NOT EXISTS idx_llaves_salon_fecha ON llaves(salon, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_llaves_fecha ON llaves(fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_llaves_nombre_fecha ON llaves(nombre, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_llaves_area_fecha ON llaves(area, fecha_hora);
 CREATE INDEX IF NOT EXISTS idx_llaves_accion ON llaves(accion);
 
 CREATE TABLE IF NOT EXISTS inventario (
@@ -39,9 +65,11 @@ CREATE TABLE IF NOT EXISTS inventario (
     estado TEXT,          -- Disponible | En uso | Dañado | Extraviado
     salon TEXT,
     responsable TEXT,
-    fecha_registro TEXT
+    fecha_registro TEXT   -- ISO 'YYYY-MM-DD HH:MM:SS'
 );
-CREATE INDEX IF NOT EXISTS idx_inventario_salon ON inventario(salon);
+-- (salon, fecha_registro): los equipos de un salón ya salen en el orden de la tabla
+CREATE INDEX IF NOT EXISTS idx_inventario_salon ON inventario(salon, fecha_registro);
+CREATE INDEX IF NOT EXISTS idx_inv_fecha_registro ON inventario(fecha_registro);
 """
 
 # ---- ESQUEMA EXTRA (rooms + índices útiles) ----
@@ -58,156 +86,860 @@ CREATE INDEX IF NOT EXISTS idx_rooms_codigo ON rooms(codigo);
 
 CREATE INDEX IF NOT EXISTS idx_inv_estado ON inventario(estado);
 CREATE INDEX IF NOT EXISTS idx_inv_tipo ON inventario(tipo);
-CREATE INDEX IF NOT EXISTS idx_inv_salon ON inventario(salon);
-"""
-
-def ensure_db():
-    """Crea tablas base y deja inventario listo (placa + movimientos)."""
-    conn = obtener_conexion()
-    conn.executescript(ESQUEMA_BASE)
-    conn.commit(); conn.close()
-
-    # Extras
-    asegurar_esquema_inventario()
-    asegurar_campo_placa()
-    asegurar_esquema_movimientos()
+DROP INDEX IF EXISTS idx_inv_salon;  -- duplicaba idx_inventario_salon
 
+-- Auditoría de cambios/eliminaciones en lote (sin FK: sobrevive al borrado)
+CREATE TABLE IF NOT EXISTS inventario_auditoria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inventario_id INTEGER NOT NULL,
+    placa TEXT,
+    accion TEXT NOT NULL,     -- actualizar | eliminar
+    campo TEXT,               -- columna modificada (NULL al eliminar)
+    valor_anterior TEXT,
+    valor_nuevo TEXT,
+    responsable TEXT,
+    fecha_hora TEXT NOT NULL  -- ISO 'YYYY-MM-DD HH:MM:SS'
+);
+CREATE INDEX IF NOT EXISTS idx_audit_inv ON inventario_auditoria(inventario_id);
+CREATE INDEX IF NOT EXISTS idx_audit_fecha ON inventario_auditoria(fecha_hora);
+"""
 
 def asegurar_esquema_inventario():
-    """Crea tablas/índices adicionales para inventario/rooms si no existen."""
-    conn = obtener_conexion()
-    conn.executescript(ESQUEMA_INVENTARIO)
-    conn.commit()
-    conn.close()
+    """Compatibilidad: el esquema lo aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
 
 
 # -------------------------------------------------------------------
 #  FUNCIONES: LLAVES
 # -------------------------------------------------------------------
+@serializado
 def registrar_evento(nombre, area, salon, accion, fecha_hora):
-    conn = obtener_conexion()
-    conn.execute(
-        "INSERT INTO llaves (nombre, area, salon, accion, fecha_hora) VALUES (?, ?, ?, ?, ?)",
-        (nombre, area, salon, accion, fecha_hora),
-    )
-    conn.commit()
-    conn.close()
+    fecha_hora = norm_fecha_hora(fecha_hora)
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "llaves")
+        cur = conn.execute(
+            "INSERT INTO llaves (nombre, area, salon, accion, fecha_hora) VALUES (?, ?, ?, ?, ?)",
+            (nombre, area, salon, accion, fecha_hora),
+        )
+        _aplicar_evento_estado(conn, cur.lastrowid, nombre, area, salon, accion, fecha_hora)
+        _sumar_diario(conn, fecha_hora, salon, area, nombre, accion, +1)
 
+@cacheado("llaves")
 def obtener_historial():
-    conn = obtener_conexion()
-    df = pd.read_sql_query("SELECT * FROM llaves ORDER BY datetime(fecha_hora) DESC", conn)
-    conn.close()
-    return df
+    return _leer_instantanea("llaves")
+
+@cacheado("llaves")
+def contar_historial() -> int:
+    with conexion() as conn:
+        return conn.execute("SELECT COUNT(*) FROM llaves").fetchone()[0]
 
+@serializado
 def eliminar_registro(registro_id: int):
-    conn = obtener_conexion()
-    conn.execute("DELETE FROM llaves WHERE id = ?", (registro_id,))
-    conn.commit()
-    conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "llaves")
+        row = conn.execute(
+            "SELECT salon, area, nombre, accion, fecha_hora FROM llaves WHERE id = ?", (registro_id,)
+        ).fetchone()
+        conn.execute("DELETE FROM llaves WHERE id = ?", (registro_id,))
+        if row:
+            _sumar_diario(conn, row["fecha_hora"], row["salon"], row["area"], row["nombre"], row["accion"], -1)
+        if row and row["salon"]:
+            _recalcular_estado_salon(conn, row["salon"])
 
 def llave_activa_por_salon(salon: str) -> bool:
     """True si la última acción para ese salón es 'Entregada'."""
-    conn = obtener_conexion()
-    row = conn.execute(
-        "SELECT accion FROM llaves WHERE salon=? ORDER BY datetime(fecha_hora) DESC LIMIT 1",
+    with conexion() as conn:
+        row = conn.execute(
+            "SELECT accion FROM llaves_estado WHERE salon=?", (salon,)
+        ).fetchone()
+    return bool(row and row["accion"] == "Entregada")
+
+
+# ---- Historial paginado (keyset sobre (fecha_hora, id)) ----
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+COLUMNAS_HISTORIAL = "id, fecha_hora, nombre, area, salon, accion"
+
+def _where_historial(profesor=None, salon=None, area=None, dia_semana=None,
+                     fecha_ini=None, fecha_fin=None):
+    """Filtros del Historial como predicados SQL. Devuelve (where, params)."""
+    conds, params = [], []
+    if profesor:
+        conds.append("nombre = ?"); params.append(profesor)
+    if salon:
+        conds.append("salon = ?"); params.append(salon)
+    if area:
+        conds.append("area = ?"); params.append(area)
+    if dia_semana:
+        # strftime('%w'): 0 = domingo ... 6 = sábado
+        conds.append("strftime('%w', fecha_hora) = ?")
+        params.append(str((DIAS_SEMANA.index(dia_semana) + 1) % 7))
+    if fecha_ini:
+        conds.append("fecha_hora >= ?"); params.append(_inicio_dia(fecha_ini))
+    if fecha_fin:
+        conds.append("fecha_hora < ?"); params.append(_inicio_dia(fecha_fin, dias=1))
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+def _where_diario(profesor=None, salon=None, area=None, dia_semana=None,
+                  fecha_ini=None, fecha_fin=None):
+    """Los filtros del Historial traducidos a llaves_diario (fecha = 'YYYY-MM-DD')."""
+    conds, params = [], []
+    for col, val in (("nombre", profesor), ("salon", salon), ("area", area)):
+        if val:
+            conds.append(f"{col} = ?"); params.append(val)
+    if dia_semana:
+        conds.append("strftime('%w', fecha) = ?")
+        params.append(str((DIAS_SEMANA.index(dia_semana) + 1) % 7))
+    if fecha_ini:
+        conds.append("fecha >= ?"); params.append(_inicio_dia(fecha_ini)[:10])
+    if fecha_fin:
+        conds.append("fecha < ?"); params.append(_inicio_dia(fecha_fin, dias=1)[:10])
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+@cacheado("llaves")
+def consultar_historial(limite: int | None = 50, despues_de: tuple | None = None, **filtros):
+    """
+    Una página del historial, más reciente primero.
+    - despues_de: cursor (fecha_hora, id) de la última fila de la página anterior.
+    Devuelve (df, siguiente_cursor); siguiente_cursor es None en la última página.
+    """
+    where, params = _where_historial(**filtros)
+    if despues_de:
+        where += (" AND " if where else " WHERE ") + "(fecha_hora, id) < (?, ?)"
+        params += [despues_de[0], int(despues_de[1])]
+    sql = f"SELECT {COLUMNAS_HISTORIAL} FROM llaves{where} ORDER BY fecha_hora DESC, id DESC"
+    if limite:
+        sql += " LIMIT ?"; params.append(int(limite) + 1)  # +1 para saber si hay más
+    with conexion() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+
+    siguiente = None
+    if limite and len(df) > limite:
+        df = df.iloc[:limite]
+        ult = df.iloc[-1]
+        siguiente = (ult["fecha_hora"], int(ult["id"]))
+    return df, siguiente
+
+def consulta_exportar_historial(**filtros) -> tuple[str, list]:
+    """(sql, params) del historial completo con los filtros, para services.exportacion."""
+    where, params = _where_historial(**filtros)
+    return f"SELECT {COLUMNAS_HISTORIAL} FROM llaves{where} ORDER BY fecha_hora DESC, id DESC", params
+
+@cacheado("llaves")
+def resumen_historial(**filtros) -> dict:
+    """Conteos por acción con los mismos filtros: {'Entregada': n, 'Devuelta': n, 'total': n}."""
+    where, params = _where_historial(**filtros)
+    with conexion() as conn:
+        rows = conn.execute(
+            f"SELECT accion, COUNT(*) AS n FROM llaves{where} GROUP BY accion", params
+        ).fetchall()
+    out = {"Entregada": 0, "Devuelta": 0}
+    out.update({r["accion"]: r["n"] for r in rows if r["accion"]})
+    out["total"] = sum(r["n"] for r in rows)
+    return out
+
+# ---- Agregados para Estadísticas (sobre el rollup llaves_diario, no sobre llaves) ----
+@cacheado("llaves")
+def movimientos_por_dia(fecha_ini=None, fecha_fin=None, **filtros) -> pd.DataFrame:
+    """
+    Conteo de eventos por día en [fecha_ini, fecha_fin]: suma de llaves_diario
+    en el rango de su PK (fecha, ...), sin leer eventos. Columnas: fecha, movimientos.
+    """
+    where, params = _where_diario(fecha_ini=fecha_ini, fecha_fin=fecha_fin, **filtros)
+    with conexion() as conn:
+        return pd.read_sql_query(
+            f"""SELECT fecha, SUM(entregas + devoluciones) AS movimientos
+                FROM llaves_diario{where} GROUP BY fecha ORDER BY fecha""",
+            conn, params=params,
+        )
+
+@cacheado("llaves")
+def ultimos_eventos(n: int = 6) -> pd.DataFrame:
+    """Los n eventos más recientes (ORDER BY ... LIMIT sobre idx_llaves_fecha)."""
+    with conexion() as conn:
+        return pd.read_sql_query(
+            f"SELECT {COLUMNAS_HISTORIAL} FROM llaves ORDER BY fecha_hora DESC, id DESC LIMIT ?",
+            conn, params=(int(n),),
+        )
+
+@cacheado("llaves")
+def actividad_ultimos_dias(dias: int = 7, hoy: date | None = None) -> pd.DataFrame:
+    """
+    Eventos por día en los últimos `dias` días, hoy incluido (movimientos_por_dia:
+    lee llaves_diario, a lo sumo una fila por día y grupo). `hoy` forma parte
+    de la clave de caché: al cambiar el día la ventana se corre sola.
+    Columnas: fecha, movimientos.
+    """
+    hoy = hoy or date.today()
+    return movimientos_por_dia(fecha_ini=hoy - timedelta(days=int(dias) - 1), fecha_fin=hoy)
+
+@cacheado("llaves")
+def top_llaves(por: str = "salon", n: int = 8, **filtros) -> pd.DataFrame:
+    """
+    Top-N por 'salon', 'nombre' o 'area' con los filtros del historial,
+    sumando llaves_diario en vez de contar eventos. Columnas: <por>, mov.
+    """
+    if por not in ("salon", "nombre", "area"):
+        raise ValueError(f"Agrupación no soportada: {por}")
+    where, params = _where_diario(**filtros)
+    where += (" AND " if where else " WHERE ") + f"{por} <> ''"
+    with conexion() as conn:
+        return pd.read_sql_query(
+            f"""SELECT {por}, SUM(entregas + devoluciones) AS mov FROM llaves_diario{where}
+                GROUP BY {por} ORDER BY mov DESC, {por} LIMIT ?""",
+            conn, params=params + [int(n)],
+        )
+
+@cacheado("llaves")
+def valores_filtro_historial() -> dict:
+    """Opciones para los selectores (DISTINCT sobre índices, sin leer filas)."""
+    with conexion() as conn:
+        return {
+            col: [r[0] for r in conn.execute(
+                f"SELECT DISTINCT {col} FROM llaves WHERE {col} IS NOT NULL ORDER BY {col}"
+            ).fetchall()]
+            for col in ("nombre", "salon", "area")
+        }
+
+
+# -------------------------------------------------------------------
+#  ESTADO ACTUAL DE LLAVES (una fila por salón, mantenida al escribir)
+# -------------------------------------------------------------------
+ESQUEMA_LLAVES_ESTADO = """
+CREATE TABLE IF NOT EXISTS llaves_estado (
+    salon TEXT PRIMARY KEY,
+    nombre TEXT,          -- quién la tiene (o la devolvió)
+    area TEXT,
+    accion TEXT,          -- última acción: Entregada | Devuelta
+    fecha_hora TEXT,      -- desde cuándo
+    ultimo_id INTEGER     -- id del último evento en llaves
+);
+CREATE INDEX IF NOT EXISTS idx_llaves_estado_activas
+    ON llaves_estado(fecha_hora) WHERE accion = 'Entregada';
+"""
+
+def asegurar_esquema_llaves_estado():
+    """Compatibilidad: el esquema lo aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
+
+def _aplicar_evento_estado(conn, evento_id, nombre, area, salon, accion, fecha_hora):
+    """Upsert del estado del salón, solo si el evento es el más reciente."""
+    if not salon:
+        return
+    conn.execute(
+        """INSERT INTO llaves_estado (salon, nombre, area, accion, fecha_hora, ultimo_id)
+           VALUES (?,?,?,?,?,?)
+           ON CONFLICT(salon) DO UPDATE SET
+               nombre=excluded.nombre, area=excluded.area, accion=excluded.accion,
+               fecha_hora=excluded.fecha_hora, ultimo_id=excluded.ultimo_id
+           WHERE excluded.fecha_hora > llaves_estado.fecha_hora
+              OR (excluded.fecha_hora = llaves_estado.fecha_hora
+                  AND excluded.ultimo_id > llaves_estado.ultimo_id)""",
+        (salon, nombre, area, accion, fecha_hora, evento_id),
+    )
+
+def _recalcular_estado_salon(conn, salon):
+    """Vuelve a leer el último evento del salón (usa idx_llaves_salon_fecha)."""
+    ult = conn.execute(
+        """SELECT id, nombre, area, accion, fecha_hora FROM llaves
+           WHERE salon=? ORDER BY fecha_hora DESC, id DESC LIMIT 1""",
         (salon,)
     ).fetchone()
-    conn.close()
-    return bool(row and row["accion"] == "Entregada")
+    conn.execute("DELETE FROM llaves_estado WHERE salon=?", (salon,))
+    if ult:
+        _aplicar_evento_estado(conn, ult["id"], ult["nombre"], ult["area"], salon,
+                               ult["accion"], ult["fecha_hora"])
+
+def _reconstruir_llaves_estado(conn) -> int:
+    conn.execute("DELETE FROM llaves_estado")
+    conn.execute(
+        """INSERT INTO llaves_estado (salon, nombre, area, accion, fecha_hora, ultimo_id)
+           SELECT l.salon, l.nombre, l.area, l.accion, l.fecha_hora, l.id
+           FROM llaves l
+           WHERE l.salon IS NOT NULL AND l.salon <> ''
+             AND l.id = (SELECT l2.id FROM llaves l2 WHERE l2.salon = l.salon
+                         ORDER BY l2.fecha_hora DESC, l2.id DESC LIMIT 1)"""
+    )
+    return conn.execute("SELECT COUNT(*) FROM llaves_estado").fetchone()[0]
+
+@serializado
+def reconstruir_llaves_estado() -> int:
+    """Reconstruye llaves_estado desde todo el historial. Devuelve # de salones."""
+    ensure_db()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "llaves")
+        return _reconstruir_llaves_estado(conn)
+
+# ---- Rollup diario de llaves (gráficos por rango sin leer eventos) ----
+# Una fila por (día, salón, área, instructor). registrar_evento/eliminar_registro
+# la mantienen en la misma transacción; NULL se guarda como '' para la PK.
+ESQUEMA_LLAVES_DIARIO = """
+CREATE TABLE IF NOT EXISTS llaves_diario (
+    fecha TEXT NOT NULL,        -- 'YYYY-MM-DD'
+    salon TEXT NOT NULL DEFAULT '',
+    area TEXT NOT NULL DEFAULT '',
+    nombre TEXT NOT NULL DEFAULT '',
+    entregas INTEGER NOT NULL DEFAULT 0,
+    devoluciones INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, salon, area, nombre)
+) WITHOUT ROWID;
+"""
+
+def _sumar_diario(conn, fecha_hora, salon, area, nombre, accion, signo: int):
+    """Suma (o resta, signo=-1) un evento al rollup; borra el grupo si queda en cero."""
+    if not fecha_hora or accion not in ("Entregada", "Devuelta"):
+        return
+    clave = (str(fecha_hora)[:10], salon or "", area or "", nombre or "")
+    e, d = (signo, 0) if accion == "Entregada" else (0, signo)
+    conn.execute(
+        """INSERT INTO llaves_diario (fecha, salon, area, nombre, entregas, devoluciones)
+           VALUES (?,?,?,?,?,?)
+           ON CONFLICT(fecha, salon, area, nombre) DO UPDATE SET
+               entregas = entregas + excluded.entregas,
+               devoluciones = devoluciones + excluded.devoluciones""",
+        clave + (e, d),
+    )
+    if signo < 0:
+        conn.execute(
+            """DELETE FROM llaves_diario WHERE fecha=? AND salon=? AND area=? AND nombre=?
+               AND entregas <= 0 AND devoluciones <= 0""",
+            clave,
+        )
+
+_SQL_DIARIO_DESDE_LLAVES = """
+    SELECT substr(fecha_hora, 1, 10) AS fecha, COALESCE(salon, '') AS salon,
+           COALESCE(area, '') AS area, COALESCE(nombre, '') AS nombre,
+           SUM(accion = 'Entregada') AS entregas, SUM(accion = 'Devuelta') AS devoluciones
+    FROM llaves
+    WHERE fecha_hora IS NOT NULL AND accion IN ('Entregada', 'Devuelta'){filtro}
+    GROUP BY 1, 2, 3, 4"""
+
+def _reconstruir_llaves_diario(conn) -> int:
+    conn.execute("DELETE FROM llaves_diario")
+    conn.execute("INSERT INTO llaves_diario " + _SQL_DIARIO_DESDE_LLAVES.format(filtro=""))
+    return conn.execute("SELECT COUNT(*) FROM llaves_diario").fetchone()[0]
+
+@serializado
+def reconstruir_llaves_diario() -> int:
+    """Backfill: rehace llaves_diario desde todo el historial. Devuelve # de grupos."""
+    ensure_db()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "llaves")
+        return _reconstruir_llaves_diario(conn)
+
+def conciliar_llaves_diario(fecha_ini=None, fecha_fin=None) -> pd.DataFrame:
+    """
+    Compara llaves_diario contra los eventos crudos en [fecha_ini, fecha_fin].
+    Devuelve los grupos que no cuadran (vacío = rollup correcto), con los
+    conteos de cada lado.
+    """
+    filtro, p_crudo, p_rollup, rango = "", [], [], ""
+    if fecha_ini:
+        filtro += " AND fecha_hora >= ?"; p_crudo.append(_inicio_dia(fecha_ini))
+        rango += " AND fecha >= ?"; p_rollup.append(_inicio_dia(fecha_ini)[:10])
+    if fecha_fin:
+        filtro += " AND fecha_hora < ?"; p_crudo.append(_inicio_dia(fecha_fin, dias=1))
+        rango += " AND fecha < ?"; p_rollup.append(_inicio_dia(fecha_fin, dias=1)[:10])
+    sql = f"""
+        SELECT fecha, salon, area, nombre,
+               SUM(e_crudo) AS entregas_crudo, SUM(e_rollup) AS entregas_rollup,
+               SUM(d_crudo) AS devoluciones_crudo, SUM(d_rollup) AS devoluciones_rollup
+        FROM (
+            SELECT fecha, salon, area, nombre, entregas AS e_crudo, 0 AS e_rollup,
+                   devoluciones AS d_crudo, 0 AS d_rollup
+            FROM ({_SQL_DIARIO_DESDE_LLAVES.format(filtro=filtro)})
+            UNION ALL
+            SELECT fecha, salon, area, nombre, 0, entregas, 0, devoluciones
+            FROM llaves_diario WHERE 1=1{rango}
+        )
+        GROUP BY fecha, salon, area, nombre
+        HAVING SUM(e_crudo) <> SUM(e_rollup) OR SUM(d_crudo) <> SUM(d_rollup)
+        ORDER BY fecha, salon, area, nombre"""
+    with conexion() as conn:
+        return pd.read_sql_query(sql, conn, params=p_crudo + p_rollup)
+
+@cacheado("llaves")
+def obtener_llaves_activas() -> pd.DataFrame:
+    """Salones cuya última acción es 'Entregada' (mismas columnas que llaves)."""
+    with conexion() as conn:
+        return pd.read_sql_query(
+            """SELECT ultimo_id AS id, nombre, area, salon, accion, fecha_hora
+               FROM llaves_estado WHERE accion = 'Entregada'
+               ORDER BY fecha_hora DESC""",
+            conn,
+        )
+
+@cacheado("llaves")
+def contar_llaves_activas() -> int:
+    with conexion() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM llaves_estado WHERE accion = 'Entregada'"
+        ).fetchone()[0]
 
 
 # -------------------------------------------------------------------
 #  FUNCIONES: ROOMS (SALONES)
 # -------------------------------------------------------------------
+@serializado
 def registrar_salon(codigo, nombre=None, edificio=None, piso=None, observaciones=None):
     """Inserta o actualiza un salón (evita duplicados por código)."""
     codigo = (codigo or "").strip().upper()
     if not codigo:
         return None
-    conn = obtener_conexion()
-    cur = conn.cursor()
-
-    cur.execute("SELECT id FROM rooms WHERE codigo=?", (codigo,))
-    existente = cur.fetchone()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "rooms")
+        cur = conn.cursor()
+
+        cur.execute("SELECT id FROM rooms WHERE codigo=?", (codigo,))
+        existente = cur.fetchone()
+
+        if existente:
+            cur.execute(
+                """UPDATE rooms 
+                   SET nombre=COALESCE(?,nombre),
+                       edificio=COALESCE(?,edificio),
+                       piso=COALESCE(?,piso),
+                       observaciones=COALESCE(?,observaciones)
+                   WHERE codigo=?""",
+                (nombre, edificio, piso, observaciones, codigo),
+            )
+            return existente["id"]
 
-    if existente:
         cur.execute(
-            """UPDATE rooms 
-               SET nombre=COALESCE(?,nombre),
-                   edificio=COALESCE(?,edificio),
-                   piso=COALESCE(?,piso),
-                   observaciones=COALESCE(?,observaciones)
-               WHERE codigo=?""",
-            (nombre, edificio, piso, observaciones, codigo),
+            "INSERT INTO rooms (codigo, nombre, edificio, piso, observaciones) VALUES (?,?,?,?,?)",
+            (codigo, nombre, edificio, piso, observaciones),
         )
-        conn.commit()
-        conn.close()
-        return existente["id"]
-
-    cur.execute(
-        "INSERT INTO rooms (codigo, nombre, edificio, piso, observaciones) VALUES (?,?,?,?,?)",
-        (codigo, nombre, edificio, piso, observaciones),
-    )
-    conn.commit()
-    nuevo_id = cur.lastrowid
-    conn.close()
-    return nuevo_id
+        return cur.lastrowid
 
+@cacheado("rooms")
 def obtener_salones():
-    conn = obtener_conexion()
-    df = pd.read_sql_query("SELECT * FROM rooms ORDER BY codigo", conn)
-    conn.close()
-    return df
+    return _leer_instantanea("rooms")
 
 
 # -------------------------------------------------------------------
 #  FUNCIONES: INVENTARIO (CRUD + MASIVO)
 # -------------------------------------------------------------------
+@cacheado("inventario")
 def obtener_inventario():
-    conn = obtener_conexion()
-    df = pd.read_sql_query(
-        "SELECT * FROM inventario ORDER BY datetime(fecha_registro) DESC, id DESC", conn
-    )
-    conn.close()
-    return df
+    return _leer_instantanea("inventario")
+
+
+# ---- Resumen de inventario (KPIs sin recorrer la tabla) ----
+# Una fila por (salón, estado, tipo) con el total de equipos y cuántos no
+# tienen placa. Lo mantienen triggers, así que cuadra con cualquier escritura
+# (CRUD, lotes, importación, migraciones). NULL se guarda como '' para la PK.
+# Como inventario_fts, se crea en una migración (ver _migration_9_inventario_resumen).
+_CLAVE_RESUMEN = "COALESCE({f}.salon, ''), COALESCE({f}.estado, ''), COALESCE({f}.tipo, '')"
+_SIN_PLACA = "({f}.placa IS NULL OR {f}.placa = '')"
+
+ESQUEMA_INVENTARIO_RESUMEN = f"""
+CREATE TABLE IF NOT EXISTS inventario_resumen (
+    salon TEXT NOT NULL DEFAULT '',
+    estado TEXT NOT NULL DEFAULT '',
+    tipo TEXT NOT NULL DEFAULT '',
+    cantidad INTEGER NOT NULL DEFAULT 0,
+    sin_placa INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (salon, estado, tipo)
+) WITHOUT ROWID;
+-- cubre el GROUP BY estado del donut (sin B-tree temporal)
+CREATE INDEX IF NOT EXISTS idx_inv_resumen_estado ON inventario_resumen(estado, cantidad);
+CREATE TRIGGER IF NOT EXISTS inventario_resumen_ai AFTER INSERT ON inventario BEGIN
+    INSERT INTO inventario_resumen (salon, estado, tipo, cantidad, sin_placa)
+    VALUES ({_CLAVE_RESUMEN.format(f="new")}, 1, {_SIN_PLACA.format(f="new")})
+    ON CONFLICT (salon, estado, tipo) DO UPDATE SET
+        cantidad = cantidad + 1, sin_placa = sin_placa + excluded.sin_placa;
+END;
+CREATE TRIGGER IF NOT EXISTS inventario_resumen_ad AFTER DELETE ON inventario BEGIN
+    UPDATE inventario_resumen SET cantidad = cantidad - 1,
+                                  sin_placa = sin_placa - {_SIN_PLACA.format(f="old")}
+    WHERE (salon, estado, tipo) = ({_CLAVE_RESUMEN.format(f="old")});
+    DELETE FROM inventario_resumen
+    WHERE (salon, estado, tipo) = ({_CLAVE_RESUMEN.format(f="old")}) AND cantidad <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS inventario_resumen_au
+AFTER UPDATE OF salon, estado, tipo, placa ON inventario BEGIN
+    UPDATE inventario_resumen SET cantidad = cantidad - 1,
+                                  sin_placa = sin_placa - {_SIN_PLACA.format(f="old")}
+    WHERE (salon, estado, tipo) = ({_CLAVE_RESUMEN.format(f="old")});
+    DELETE FROM inventario_resumen
+    WHERE (salon, estado, tipo) = ({_CLAVE_RESUMEN.format(f="old")}) AND cantidad <= 0;
+    INSERT INTO inventario_resumen (salon, estado, tipo, cantidad, sin_placa)
+    VALUES ({_CLAVE_RESUMEN.format(f="new")}, 1, {_SIN_PLACA.format(f="new")})
+    ON CONFLICT (salon, estado, tipo) DO UPDATE SET
+        cantidad = cantidad + 1, sin_placa = sin_placa + excluded.sin_placa;
+END;
+"""
+
+_SQL_RESUMEN_DESDE_INVENTARIO = f"""
+    SELECT COALESCE(i.salon, '') AS salon, COALESCE(i.estado, '') AS estado,
+           COALESCE(i.tipo, '') AS tipo, COUNT(*) AS cantidad,
+           SUM({_SIN_PLACA.format(f="i")}) AS sin_placa
+    FROM inventario i
+    GROUP BY 1, 2, 3"""
+
+def _reconstruir_inventario_resumen(conn) -> int:
+    conn.execute("DELETE FROM inventario_resumen")
+    conn.execute("INSERT INTO inventario_resumen (salon, estado, tipo, cantidad, sin_placa)"
+                 + _SQL_RESUMEN_DESDE_INVENTARIO)
+    return conn.execute("SELECT COUNT(*) FROM inventario_resumen").fetchone()[0]
+
+@serializado
+def reconstruir_inventario_resumen() -> int:
+    """Backfill: rehace inventario_resumen desde inventario. Devuelve # de grupos."""
+    ensure_db()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario")
+        return _reconstruir_inventario_resumen(conn)
+
+def conciliar_inventario_resumen() -> pd.DataFrame:
+    """
+    Compara inventario_resumen contra inventario. Devuelve los grupos que no
+    cuadran (vacío = resumen correcto), con los conteos de cada lado.
+    """
+    sql = f"""
+        SELECT salon, estado, tipo,
+               SUM(c_crudo) AS cantidad_crudo, SUM(c_resumen) AS cantidad_resumen,
+               SUM(s_crudo) AS sin_placa_crudo, SUM(s_resumen) AS sin_placa_resumen
+        FROM (
+            SELECT salon, estado, tipo, cantidad AS c_crudo, 0 AS c_resumen,
+                   sin_placa AS s_crudo, 0 AS s_resumen
+            FROM ({_SQL_RESUMEN_DESDE_INVENTARIO})
+            UNION ALL
+            SELECT salon, estado, tipo, 0, cantidad, 0, sin_placa FROM inventario_resumen
+        )
+        GROUP BY salon, estado, tipo
+        HAVING SUM(c_crudo) <> SUM(c_resumen) OR SUM(s_crudo) <> SUM(s_resumen)
+        ORDER BY salon, estado, tipo"""
+    with conexion() as conn:
+        return pd.read_sql_query(sql, conn)
+
+def _where_resumen(salon=None, estado=None, tipo=None) -> tuple[str, list]:
+    where, params = [], []
+    if salon:
+        where.append("salon = ?"); params.append(norm_salon(salon))
+    if estado:
+        where.append("estado = ?"); params.append(estado)
+    if tipo:
+        where.append("tipo = ?"); params.append(tipo)
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+@cacheado("inventario")
+def contar_inventario(salon: str = None, estado: str = None, tipo: str = None) -> int:
+    """
+    Total de equipos, opcionalmente de un salón/estado/tipo, sumando los
+    grupos de inventario_resumen: hay uno por (salón, estado, tipo), muchos
+    menos que equipos, así que no depende del tamaño de inventario.
+    """
+    w, p = _where_resumen(salon, estado, tipo)
+    with conexion() as conn:
+        return conn.execute(
+            f"SELECT COALESCE(SUM(cantidad), 0) FROM inventario_resumen{w}", p
+        ).fetchone()[0]
+
+@cacheado("inventario")
+def inventario_por_estado(salon: str = None) -> pd.DataFrame:
+    """Equipos por estado (desde inventario_resumen). Columnas: estado, cantidad."""
+    w, p = _where_resumen(salon)
+    with conexion() as conn:
+        return pd.read_sql_query(
+            f"""SELECT NULLIF(estado, '') AS estado, SUM(cantidad) AS cantidad
+                FROM inventario_resumen{w} GROUP BY estado ORDER BY estado""",
+            conn, params=p,
+        )
 
 
+# ---- Búsqueda de texto (FTS5) ----
+# Índice de texto completo sobre inventario (tabla de contenido externo: solo
+# guarda el índice, las filas se leen de inventario). Los triggers lo mantienen
+# al día en cualquier INSERT/UPDATE/DELETE, incluidas las operaciones en lote.
+ESQUEMA_INVENTARIO_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS inventario_fts USING fts5(
+    placa, nombre, tipo, salon, responsable,
+    content='inventario', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS inventario_fts_ai AFTER INSERT ON inventario BEGIN
+    INSERT INTO inventario_fts (rowid, placa, nombre, tipo, salon, responsable)
+    VALUES (new.id, new.placa, new.nombre, new.tipo, new.salon, new.responsable);
+END;
+CREATE TRIGGER IF NOT EXISTS inventario_fts_ad AFTER DELETE ON inventario BEGIN
+    INSERT INTO inventario_fts (inventario_fts, rowid, placa, nombre, tipo, salon, responsable)
+    VALUES ('delete', old.id, old.placa, old.nombre, old.tipo, old.salon, old.responsable);
+END;
+CREATE TRIGGER IF NOT EXISTS inventario_fts_au
+AFTER UPDATE OF placa, nombre, tipo, salon, responsable ON inventario BEGIN
+    INSERT INTO inventario_fts (inventario_fts, rowid, placa, nombre, tipo, salon, responsable)
+    VALUES ('delete', old.id, old.placa, old.nombre, old.tipo, old.salon, old.responsable);
+    INSERT INTO inventario_fts (rowid, placa, nombre, tipo, salon, responsable)
+    VALUES (new.id, new.placa, new.nombre, new.tipo, new.salon, new.responsable);
+END;
+"""
+
+COLUMNAS_FTS = ("placa", "nombre", "tipo", "salon", "responsable")
+PESOS_FTS = (10.0, 5.0, 2.0, 2.0, 1.0)  # bm25: una coincidencia en placa pesa más
+_TOKEN_RE = re.compile(r"\w+")
+
+@cacheado("inventario")
+def salones_inventario() -> list[str]:
+    """Salones con equipos (claves de inventario_resumen, sin leer filas)."""
+    with conexion() as conn:
+        return [r[0] for r in conn.execute(
+            "SELECT DISTINCT salon FROM inventario_resumen WHERE salon <> '' ORDER BY salon"
+        ).fetchall()]
+
+@cacheado("inventario")
+def tipos_inventario() -> list[str]:
+    """Tipos con equipos (claves de inventario_resumen, sin leer filas)."""
+    with conexion() as conn:
+        return [r[0] for r in conn.execute(
+            "SELECT DISTINCT tipo FROM inventario_resumen WHERE tipo <> '' ORDER BY tipo"
+        ).fetchall()]
+
+@cacheado("inventario")
+def inventario_salon(salon: str) -> pd.DataFrame:
+    """Equipos de un salón (idx_inventario_salon): cuesta lo que mide el salón, no el inventario."""
+    with conexion() as conn:
+        return pd.read_sql_query(
+            "SELECT * FROM inventario WHERE salon = ? ORDER BY fecha_registro DESC, id DESC",
+            conn, params=(norm_salon(salon),),
+        )
+
+@cacheado("inventario")
+def resumen_salon(salon: str) -> dict:
+    """
+    KPIs de un salón leyendo sus filas de inventario_resumen (prefijo de la PK):
+    {'total', 'sin_placa', <estado>: n, 'por_tipo': DataFrame(tipo, cantidad)}.
+    """
+    with conexion() as conn:
+        filas = conn.execute(
+            """SELECT NULLIF(tipo, '') AS tipo, NULLIF(estado, '') AS estado,
+                      cantidad AS n, sin_placa
+               FROM inventario_resumen WHERE salon = ?""",
+            (norm_salon(salon),),
+        ).fetchall()
+    out = {"total": 0, "sin_placa": 0, **{e: 0 for e in ESTADOS_VALIDOS}}
+    por_tipo = {}
+    for r in filas:
+        out["total"] += r["n"]
+        out["sin_placa"] += r["sin_placa"]
+        out[r["estado"]] = out.get(r["estado"], 0) + r["n"]
+        por_tipo[r["tipo"]] = por_tipo.get(r["tipo"], 0) + r["n"]
+    out["por_tipo"] = (pd.DataFrame(list(por_tipo.items()), columns=["tipo", "cantidad"])
+                         .sort_values(["cantidad", "tipo"], ascending=[False, True], ignore_index=True))
+    return out
+
+def _consulta_fts(texto: str, columnas=None) -> str | None:
+    """'303-f port' -> '"303"* "f"* "port"*' (AND de prefijos). None si no hay palabras."""
+    tokens = _TOKEN_RE.findall(texto or "")
+    if not tokens:
+        return None
+    q = " ".join(f'"{t}"*' for t in tokens)
+    if columnas:
+        q = "{" + " ".join(columnas) + "} : (" + q + ")"
+    return q
+
+# Forma en que se guarda inventario.salon: validators.norm_salon (mayúsculas
+# Unicode, sin espacios a los lados y vacío -> BODEGA), registrada como
+# función SQL. Así los filtros por salón son `salon = ?` y usan
+# idx_inventario_salon. UPPER() de SQLite no sirve: solo cambia ASCII
+# ('salón 2' -> 'SALóN 2', que norm_salon escribe 'SALÓN 2').
+SALON_CANONICO_SQL = "norm_salon({col})"
+
+COLUMNAS_INVENTARIO = ("id", "nombre", "tipo", "estado", "salon", "responsable", "fecha_registro", "placa")
+_ORDEN_FTS = f"bm25(inventario_fts, {', '.join(str(p) for p in PESOS_FTS)}), i.id DESC"
+def _filtros_inventario(salon=None, tipo=None, estado=None):
+    """Predicados sobre inventario (alias i). Devuelve (lista de condiciones, params)."""
+    where, params = [], []
+    for col, val in (("salon", salon), ("tipo", tipo), ("estado", estado)):
+        if val:
+            where.append(f"i.{col} = ?")
+            params.append(val)
+    return where, params
+
+@cacheado("inventario")
+def buscar_inventario(texto: str, columnas: tuple = None, salon: str = None,
+                      tipo: str = None, estado: str = None,
+                      limite: int | None = 50, pagina: int = 0) -> tuple[pd.DataFrame, int]:
+    """
+    Búsqueda por prefijos en placa/nombre/tipo/salón/responsable, ordenada por
+    relevancia (bm25). `columnas` limita en qué campos buscar. Devuelve
+    (página de resultados, total de coincidencias); limite=None trae todas.
+    """
+    q = _consulta_fts(texto, columnas)
+    if q is None:
+        return pd.DataFrame(columns=list(COLUMNAS_INVENTARIO)), 0
+
+    where, params = _filtros_inventario(salon, tipo, estado)
+    base = f"""FROM inventario_fts f JOIN inventario i ON i.id = f.rowid
+               WHERE {' AND '.join(["inventario_fts MATCH ?"] + where)}"""
+    params = [q] + params
+    sql = f"SELECT i.* {base} ORDER BY {_ORDEN_FTS}"
+    if limite is not None:
+        sql += f" LIMIT {int(limite)} OFFSET {int(limite) * int(pagina)}"
+
+    with conexion() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+        if limite is None or (pagina == 0 and len(df) < limite):
+            total = len(df) + int(limite or 0) * int(pagina)
+        else:
+            total = conn.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+    return df, total
+
+@cacheado("inventario")
+def listar_inventario(salon: str = None, tipo: str = None, estado: str = None,
+                      limite: int | None = 100, pagina: int = 0) -> tuple[pd.DataFrame, int]:
+    """
+    Inventario filtrado, más reciente primero, por páginas (lo que muestra la
+    tabla cuando no hay texto de búsqueda). Devuelve (página, total filtrado).
+    """
+    where, params = _filtros_inventario(salon, tipo, estado)
+    filtro = " WHERE " + " AND ".join(where) if where else ""
+    sql = f"SELECT * FROM inventario i{filtro} ORDER BY i.fecha_registro DESC, i.id DESC"
+    if limite is not None:
+        sql += f" LIMIT {int(limite)} OFFSET {int(limite) * int(pagina)}"
+
+    with conexion() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+        if limite is None or (pagina == 0 and len(df) < limite):
+            total = len(df) + int(limite or 0) * int(pagina)
+        else:
+            total = conn.execute(f"SELECT COUNT(*) FROM inventario i{filtro}", params).fetchone()[0]
+    return df, total
+
+@cacheado("inventario")
+def obtener_equipo(inventario_id: int) -> dict | None:
+    """Un equipo por id (None si no existe)."""
+    with conexion() as conn:
+        row = conn.execute("SELECT * FROM inventario WHERE id = ?", (int(inventario_id),)).fetchone()
+    return dict(row) if row else None
+
+def consulta_exportar_inventario(salida: tuple, texto: str = None, columnas: tuple = None,
+                                 salon: str = None, tipo: str = None, estado: str = None) -> tuple[str, list]:
+    """
+    (sql, params) con las mismas filas y orden que muestra la tabla: la
+    búsqueda FTS si hay texto, si no el inventario filtrado. `salida` son las
+    columnas del archivo. Se ejecuta con services.exportacion.
+    """
+    desconocidas = set(salida) - set(COLUMNAS_INVENTARIO)
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {sorted(desconocidas)}")
+    cols = ", ".join(f"i.{c}" for c in salida)
+    where, params = _filtros_inventario(salon, tipo, estado)
+    if texto and texto.strip():
+        q = _consulta_fts(texto, columnas)
+        if q is not None:
+            where = ["inventario_fts MATCH ?"] + where
+            return (f"""SELECT {cols} FROM inventario_fts f JOIN inventario i ON i.id = f.rowid
+                        WHERE {' AND '.join(where)} ORDER BY {_ORDEN_FTS}""", [q] + params)
+        where.append("0")  # texto sin palabras: buscar_inventario no devuelve nada
+    sql = f"SELECT {cols} FROM inventario i"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + " ORDER BY i.fecha_registro DESC, i.id DESC", params
+
+
+@serializado
 def agregar_equipo(nombre, tipo, estado, salon, responsable, fecha_registro, placa=None):
-    conn = obtener_conexion()
-    conn.execute(
-        """INSERT INTO inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
-           VALUES (?,?,?,?,?,?,?)""",
-        (nombre, tipo, estado, salon, responsable, fecha_registro, placa),
-    )
-    conn.commit(); conn.close()
+    fecha_registro = norm_fecha_hora(fecha_registro)
+    salon = norm_salon(salon)
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario")
+        conn.execute(
+            """INSERT INTO inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
+               VALUES (?,?,?,?,?,?,?)""",
+            (nombre, tipo, estado, salon, responsable, fecha_registro, placa),
+        )
 
 
+@serializado
 def actualizar_equipo(id_equipo: int, **campos):
     if not campos:
         return
     # validar placa única si viene en la actualización
     if "placa" in campos and campos["placa"]:
-        conn = obtener_conexion()
-        row = conn.execute(
-            "SELECT id FROM inventario WHERE placa=? AND id<>?",
-            (campos["placa"], int(id_equipo))
-        ).fetchone()
-        conn.close()
+        with conexion() as conn:
+            row = conn.execute(
+                "SELECT id FROM inventario WHERE placa=? AND id<>?",
+                (campos["placa"], int(id_equipo))
+            ).fetchone()
         if row:
             raise ValueError(f"La placa {campos['placa']} ya existe en otro equipo.")
 
+    if "salon" in campos:
+        campos["salon"] = norm_salon(campos["salon"])
     sets = ", ".join([f"{k}=?" for k in campos.keys()])
     valores = list(campos.values()) + [id_equipo]
-    conn = obtener_conexion()
-    conn.execute(f"UPDATE inventario SET {sets} WHERE id=?", valores)
-    conn.commit(); conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario")
+        conn.execute(f"UPDATE inventario SET {sets} WHERE id=?", valores)
 
 
+@serializado
 def eliminar_equipo(id_equipo: int):
-    conn = obtener_conexion()
-    conn.execute("DELETE FROM inventario WHERE id=?", (id_equipo,))
-    conn.commit()
-    conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario", "inventario_movs")
+        conn.execute("DELETE FROM inventario WHERE id=?", (id_equipo,))
+
+# ---- Operaciones en lote (una sentencia por operación, ids como JSON) ----
+CAMPOS_EDITABLES_LOTE = ("nombre", "tipo", "estado", "salon", "responsable")
+_IDS_JSON = "(SELECT value FROM json_each(?))"  # sin límite de parámetros
+
+def _ids_json(ids) -> str:
+    return json.dumps(sorted({int(i) for i in ids}))
+
+@serializado
+def actualizar_equipos_lote(ids, responsable: str = None, **campos) -> int:
+    """
+    Aplica `campos` a todos los `ids` con UN UPDATE en UNA transacción y deja
+    una fila de auditoría por equipo y campo que realmente cambia.
+    Devuelve cuántos equipos se actualizaron.
+    """
+    invalidos = set(campos) - set(CAMPOS_EDITABLES_LOTE)
+    if invalidos:
+        raise ValidationError(f"Campos no editables en lote: {sorted(invalidos)}")
+    if "estado" in campos and campos["estado"] not in ESTADOS_VALIDOS:
+        raise ValidationError(f"Estado inválido. Usa uno de: {', '.join(ESTADOS_VALIDOS)}")
+    if "salon" in campos:
+        campos["salon"] = norm_salon(campos["salon"])
+    if not campos or not ids:
+        return 0
+
+    lista = _ids_json(ids)
+    ahora = norm_fecha_hora(datetime.now())
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario")
+        for campo, valor in campos.items():
+            conn.execute(
+                f"""INSERT INTO inventario_auditoria
+                    (inventario_id, placa, accion, campo, valor_anterior, valor_nuevo, responsable, fecha_hora)
+                    SELECT id, placa, 'actualizar', ?, {campo}, ?, ?, ?
+                    FROM inventario WHERE id IN {_IDS_JSON} AND {campo} IS NOT ?""",
+                (campo, valor, responsable, ahora, lista, valor),
+            )
+        sets = ", ".join(f"{k}=?" for k in campos)
+        return conn.execute(
+            f"UPDATE inventario SET {sets} WHERE id IN {_IDS_JSON}",
+            list(campos.values()) + [lista],
+        ).rowcount
+
+@serializado
+def eliminar_equipos_lote(ids, responsable: str = None) -> int:
+    """Elimina los `ids` con UN DELETE (auditado) en UNA transacción. Devuelve cuántos."""
+    if not ids:
+        return 0
+    lista = _ids_json(ids)
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario", "inventario_movs")
+        conn.execute(
+            f"""INSERT INTO inventario_auditoria
+                (inventario_id, placa, accion, valor_anterior, responsable, fecha_hora)
+                SELECT id, placa, 'eliminar',
+                       json_object('nombre', nombre, 'tipo', tipo, 'estado', estado, 'salon', salon),
+                       ?, ?
+                FROM inventario WHERE id IN {_IDS_JSON}""",
+            (responsable, norm_fecha_hora(datetime.now()), lista),
+        )
+        return conn.execute(f"DELETE FROM inventario WHERE id IN {_IDS_JSON}", (lista,)).rowcount
 
 def insertar_inventario_masivo(df: pd.DataFrame):
     """Inserta múltiples registros validados en el inventario."""
@@ -226,39 +958,129 @@ def insertar_inventario_masivo(df: pd.DataFrame):
         dups = sorted(dup_archivo[dup_archivo.duplicated()].unique().tolist())
         raise ValueError(f"Placas duplicadas en el archivo: {dups}")
 
-    # Validación contra BD
-    conn = obtener_conexion()
-    cur = conn.cursor()
-    conflictivas = []
-    for p in df["placa"].dropna().unique().tolist():
-        r = cur.execute("SELECT id FROM inventario WHERE placa=?", (p,)).fetchone()
-        if r:
-            conflictivas.append(p)
-    conn.close()
-    if conflictivas:
-        raise ValueError(f"Placas ya existentes en BD: {sorted(conflictivas)}")
-
-    # Inserción
-    conn = obtener_conexion()
-    datos = df[["nombre", "tipo", "estado", "salon", "responsable", "fecha_registro", "placa"]].values.tolist()
-    conn.executemany(
-        "INSERT INTO inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa) "
-        "VALUES (?,?,?,?,?,?,?)",
-        datos,
-    )
-    conn.commit()
-    cant = conn.total_changes
-    conn.close()
-    return cant
+    # Validación contra BD + inserción: una sola transacción (ver importar_inventario)
+    fechas = pd.to_datetime(df["fecha_registro"], errors="coerce")
+    df["fecha_registro"] = fechas.dt.strftime("%Y-%m-%d %H:%M:%S").where(fechas.notna(), df["fecha_registro"])
+    bloque = df[COLUMNAS_IMPORTACION[1:-1]].copy()
+    bloque.insert(0, "fila", range(1, len(df) + 1))
+    bloque["error"] = None
+    rep = importar_inventario([bloque], todo_o_nada=True)
+    if not rep["errores"].empty:
+        raise ValueError(f"Placas ya existentes en BD: {sorted(rep['errores']['placa'].dropna().tolist())}")
+    return rep["insertadas"]
+
+
+# ---- Importación masiva por bloques (staging en una BD temporal aparte) ----
+COLUMNAS_IMPORTACION = ["fila", "nombre", "tipo", "estado", "salon", "responsable",
+                        "fecha_registro", "placa", "error"]
+
+ESQUEMA_IMPORTACION = """
+CREATE TABLE import_inventario (
+    fila INTEGER PRIMARY KEY,   -- nº de fila en el archivo
+    nombre TEXT, tipo TEXT, estado TEXT, salon TEXT, responsable TEXT,
+    fecha_registro TEXT, placa TEXT,
+    error TEXT                  -- NULL = fila válida
+);
+CREATE INDEX idx_import_placa ON import_inventario(placa);
+"""
+
+class _ImportacionCancelada(AppError):
+    """Señal interna para revertir la transacción de importación."""
+
+def importar_inventario(bloques, registrar_salones: bool = False,
+                        todo_o_nada: bool = True, simular: bool = False) -> dict:
+    """
+    Importa bloques de DataFrames ya normalizados (columnas COLUMNAS_IMPORTACION;
+    'error' trae la validación de cada fila) en UNA transacción:
+      1. staging de cada bloque en un archivo SQLite temporal, en el hilo de
+         quien llama: leer y validar el archivo no ocupa al escritor único
+      2. conflictos de placa con un JOIN contra inventario (no un SELECT por placa)
+      3. INSERT ... SELECT de las filas válidas (+ salones nuevos si se pide)
+    - todo_o_nada: si hay cualquier error no se inserta nada.
+    - simular: valida y reporta, siempre revierte.
+    Devuelve {"total", "insertadas", "errores": DataFrame(fila, placa, error)}.
+    """
+    fd, ruta = tempfile.mkstemp(prefix="import_inventario_", suffix=".db")
+    os.close(fd)
+    try:
+        staging = sqlite3.connect(ruta)
+        try:
+            staging.execute("PRAGMA journal_mode = OFF")  # archivo desechable
+            staging.execute("PRAGMA synchronous = OFF")
+            staging.create_function("norm_salon", 1, norm_salon, deterministic=True)
+            for sentencia in _sentencias(ESQUEMA_IMPORTACION):
+                staging.execute(sentencia)
+            for df in bloques:
+                staging.executemany(
+                    f"INSERT INTO import_inventario ({', '.join(COLUMNAS_IMPORTACION)}) "
+                    f"VALUES ({', '.join('?' * len(COLUMNAS_IMPORTACION))})",
+                    df[COLUMNAS_IMPORTACION].astype(object).where(df[COLUMNAS_IMPORTACION].notna(), None)
+                      .itertuples(index=False, name=None),
+                )
+            staging.execute(f"UPDATE import_inventario SET salon = {SALON_CANONICO_SQL.format(col='salon')}")
+            staging.commit()
+        finally:
+            staging.close()
+        return _aplicar_importacion(ruta, registrar_salones, todo_o_nada, simular)
+    finally:
+        Path(ruta).unlink(missing_ok=True)
+
+@serializado(agrupar=False)  # ATTACH no se puede dentro de la transacción de un lote
+def _aplicar_importacion(ruta_staging: str, registrar_salones: bool,
+                         todo_o_nada: bool, simular: bool) -> dict:
+    with conexion() as conn:
+        conn.execute("ATTACH DATABASE ? AS imp", (ruta_staging,))
+        try:
+            insertadas = 0
+            try:
+                with txn(conn):
+                    # 2) conflictos contra la BD (usa idx_inv_placa_unique)
+                    conn.execute(
+                        """UPDATE imp.import_inventario SET error = 'Placa ya existe en BD'
+                           WHERE error IS NULL AND placa IS NOT NULL AND EXISTS (
+                               SELECT 1 FROM main.inventario v
+                               WHERE v.placa = import_inventario.placa
+                                 AND v.placa IS NOT NULL AND v.placa <> '')"""
+                    )
+                    # el reporte se lee antes de un posible ROLLBACK
+                    total = conn.execute("SELECT COUNT(*) FROM imp.import_inventario").fetchone()[0]
+                    errores = pd.read_sql_query(
+                        """SELECT fila, placa, error FROM imp.import_inventario
+                           WHERE error IS NOT NULL ORDER BY fila""",
+                        conn,
+                    )
+                    if simular or (todo_o_nada and not errores.empty):
+                        raise _ImportacionCancelada()
+
+                    # 3) inserción set-based
+                    invalidar(conn, "inventario", "rooms")
+                    if registrar_salones:
+                        conn.execute(
+                            """INSERT OR IGNORE INTO main.rooms (codigo)
+                               SELECT DISTINCT salon FROM imp.import_inventario
+                               WHERE error IS NULL AND salon IS NOT NULL
+                                 AND salon NOT IN ('', 'BODEGA')"""
+                        )
+                    insertadas = conn.execute(
+                        """INSERT INTO main.inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
+                           SELECT nombre, tipo, estado, salon, responsable, fecha_registro, placa
+                           FROM imp.import_inventario WHERE error IS NULL ORDER BY fila"""
+                    ).rowcount
+            except _ImportacionCancelada:
+                pass
+            return {"total": total, "insertadas": insertadas, "errores": errores}
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.execute("DETACH DATABASE imp")
 
 
 # --- MIGRACIÓN: asegurar columna PLACA única (opcional) ---
-def asegurar_campo_placa():
+def _campo_placa(conn):
     """
     Agrega la columna 'placa' a inventario si no existe y crea índice único
     (solo cuando placa no es nula ni vacía).
     """
-    conn = obtener_conexion()
     cur = conn.cursor()
 
     # ¿Existe la columna?
@@ -266,7 +1088,6 @@ def asegurar_campo_placa():
     cols = [r["name"] for r in cur.fetchall()]
     if "placa" not in cols:
         cur.execute("ALTER TABLE inventario ADD COLUMN placa TEXT")
-        conn.commit()
 
     # Índice único parcial (evita duplicados solo cuando hay valor)
     cur.execute("""
@@ -274,19 +1095,20 @@ def asegurar_campo_placa():
         ON inventario(placa)
         WHERE placa IS NOT NULL AND placa <> ''
     """)
-    conn.commit()
-    conn.close()
+
+def asegurar_campo_placa():
+    """Compatibilidad: el esquema lo aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
 
 
 def existe_placa(placa: str) -> bool:
     """Devuelve True si la placa ya existe en inventario (no vacía)."""
     if not placa:
         return False
-    conn = obtener_conexion()
-    row = conn.execute(
-        "SELECT 1 FROM inventario WHERE placa=? AND placa<>'' LIMIT 1", (placa,)
-    ).fetchone()
-    conn.close()
+    with conexion() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM inventario WHERE placa=? AND placa<>'' LIMIT 1", (placa,)
+        ).fetchone()
     return bool(row)
 
 # ========= ESQUEMA: movimientos de equipos =========
@@ -304,41 +1126,46 @@ CREATE TABLE IF NOT EXISTS inventario_movs (
     FOREIGN KEY(inventario_id) REFERENCES inventario(id) ON DELETE CASCADE
 );
 CREATE INDEX IF NOT EXISTS idx_movs_inv ON inventario_movs(inventario_id);
-CREATE INDEX IF NOT EXISTS idx_movs_placa ON inventario_movs(placa);
 CREATE INDEX IF NOT EXISTS idx_movs_fecha ON inventario_movs(fecha_hora);
+-- filtro por igualdad + orden/rango por fecha (paginación keyset de la página Movimientos)
+CREATE INDEX IF NOT EXISTS idx_movs_placa_fecha ON inventario_movs(placa, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_movs_origen_fecha ON inventario_movs(salon_origen, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_movs_destino_fecha ON inventario_movs(salon_destino, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_movs_resp_fecha ON inventario_movs(responsable, fecha_hora);
+DROP INDEX IF EXISTS idx_movs_placa;  -- prefijo de idx_movs_placa_fecha
 """
 
 def asegurar_esquema_movimientos():
-    conn = obtener_conexion()
-    conn.executescript(ESQUEMA_MOVIMIENTOS)
-    conn.commit()
-    conn.close()
+    """Compatibilidad: el esquema lo aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
 
 # ---- Helpers movimientos ----
+@serializado
 def registrar_movimiento_equipo(inventario_id:int, placa:str, salon_origen:str, salon_destino:str,
                                 motivo:str, responsable:str, fecha_hora:str, notas:str=None):
-    conn = obtener_conexion()
-    conn.execute(
-        """INSERT INTO inventario_movs
-           (inventario_id, placa, salon_origen, salon_destino, motivo, responsable, fecha_hora, notas)
-           VALUES (?,?,?,?,?,?,?,?)""",
-        (int(inventario_id),
-         (placa or None),
-         (salon_origen or None),
-         (salon_destino or None),
-         (motivo or None),
-         (responsable or None),
-         fecha_hora,
-         (notas or None))
-    )
-    conn.commit(); conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario_movs")
+        conn.execute(
+            """INSERT INTO inventario_movs
+               (inventario_id, placa, salon_origen, salon_destino, motivo, responsable, fecha_hora, notas)
+               VALUES (?,?,?,?,?,?,?,?)""",
+            (int(inventario_id),
+             (placa or None),
+             (salon_origen or None),
+             (salon_destino or None),
+             (motivo or None),
+             (responsable or None),
+             norm_fecha_hora(fecha_hora),
+             (notas or None))
+        )
 
+@serializado
 def mover_equipo(inventario_id:int, nuevo_salon:str, motivo:str, responsable:str,
                  fecha_hora:str, notas:str=None):
-    conn = obtener_conexion()
-    cur = conn.cursor()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario", "inventario_movs")
+        cur = conn.cursor()
 
-    with txn(conn):
         # Datos actuales
         cur.execute("SELECT id, salon, placa FROM inventario WHERE id=?", (int(inventario_id),))
         row = cur.fetchone()
@@ -347,7 +1174,7 @@ def mover_equipo(inventario_id:int, nuevo_salon:str, motivo:str, responsable:str
 
         salon_origen = (row["salon"] or "").strip().upper()
         placa_actual = (row["placa"] or None)
-        nuevo_salon_up = (nuevo_salon or "").strip().upper()
+        nuevo_salon_up = norm_salon(nuevo_salon)
 
         # Update inventario
         cur.execute("UPDATE inventario SET salon=? WHERE id=?", (nuevo_salon_up, int(inventario_id)))
@@ -358,41 +1185,168 @@ def mover_equipo(inventario_id:int, nuevo_salon:str, motivo:str, responsable:str
                (inventario_id, placa, salon_origen, salon_destino, motivo, responsable, fecha_hora, notas)
                VALUES (?,?,?,?,?,?,?,?)""",
             (int(inventario_id), placa_actual, salon_origen or None, nuevo_salon_up or None,
-             (motivo or None), (responsable or None), fecha_hora, (notas or None))
+             (motivo or None), (responsable or None), norm_fecha_hora(fecha_hora), (notas or None))
         )
 
-def obtener_movimientos(fecha_ini:str=None, fecha_fin:str=None, placa:str=None,
-                        salon_origen:str=None, salon_destino:str=None, responsable:str=None):
+@serializado
+def mover_equipos_lote(ids, destino: str, motivo: str, responsable: str,
+                       notas: str = None, fecha_hora: str = None) -> dict:
     """
-    Devuelve DataFrame de movimientos con filtros opcionales (fechas en 'YYYY-MM-DD').
+    Mueve varios equipos a `destino` en UNA transacción:
+    una lectura de salones actuales, un UPDATE ... WHERE id IN (...) y un
+    executemany a inventario_movs. Devuelve {id: Result} por cada id pedido.
     """
-    base = """SELECT id, inventario_id, placa, salon_origen, salon_destino, motivo,
-                     responsable, fecha_hora, notas
-              FROM inventario_movs WHERE 1=1"""
-    params = []
+    ids = list(dict.fromkeys(int(i) for i in ids))
+    if not ids:
+        return {}
+    destino_n = norm_salon(destino)
+    fecha_hora = norm_fecha_hora(fecha_hora or datetime.now())
+    marcas = ",".join("?" * len(ids))
+
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "inventario", "inventario_movs", "rooms")
+        actuales = {
+            r["id"]: r for r in conn.execute(
+                f"SELECT id, salon, placa FROM inventario WHERE id IN ({marcas})", ids
+            ).fetchall()
+        }
+        if destino_n != "BODEGA":
+            conn.execute("INSERT OR IGNORE INTO rooms(codigo) VALUES (?)", (destino_n,))
+        encontrados = [i for i in ids if i in actuales]
+        if encontrados:
+            conn.execute(
+                f"UPDATE inventario SET salon=? WHERE id IN ({','.join('?' * len(encontrados))})",
+                [destino_n] + encontrados,
+            )
+            conn.executemany(
+                """INSERT INTO inventario_movs
+                   (inventario_id, placa, salon_origen, salon_destino, motivo, responsable, fecha_hora, notas)
+                   VALUES (?,?,?,?,?,?,?,?)""",
+                [(i, (actuales[i]["placa"] or None), (actuales[i]["salon"] or "").strip().upper() or None,
+                  destino_n, (motivo or None), (responsable or None), fecha_hora, (notas or None))
+                 for i in encontrados],
+            )
+
+    return {
+        i: OK(msg=f"Equipo {i} movido a {destino_n}.") if i in actuales
+        else ERR(f"Equipo id={i} no existe")
+        for i in ids
+    }
+
+def _inicio_dia(fecha, dias: int = 0) -> str:
+    """'YYYY-MM-DD' (o date) -> 'YYYY-MM-DD 00:00:00' desplazado N días, para rangos [ini, fin)."""
+    d = fecha if isinstance(fecha, date) else datetime.fromisoformat(str(fecha).strip()[:10])
+    d = datetime(d.year, d.month, d.day) + timedelta(days=dias)
+    return d.strftime("%Y-%m-%d %H:%M:%S")
+
+COLUMNAS_MOVIMIENTOS = """id, inventario_id, placa, salon_origen, salon_destino, motivo,
+                          responsable, fecha_hora, notas"""
+
+def _where_movimientos(fecha_ini=None, fecha_fin=None, placa=None, salon_origen=None,
+                       salon_destino=None, responsable=None):
+    """
+    Filtros de movimientos como predicados SQL. Devuelve (where, params).
+    Todo es igualdad o rango sobre columnas indexadas (sin LIKE '%x%' ni
+    funciones sobre fecha_hora), así cada filtro puede usar su índice.
+    """
+    conds, params = [], []
     if fecha_ini:
-        base += " AND date(fecha_hora) >= date(?)"; params.append(fecha_ini)
+        conds.append("fecha_hora >= ?"); params.append(_inicio_dia(fecha_ini))
     if fecha_fin:
-        base += " AND date(fecha_hora) <= date(?)"; params.append(fecha_fin)
+        conds.append("fecha_hora < ?"); params.append(_inicio_dia(fecha_fin, dias=1))
     if placa:
-        base += " AND placa = ?"; params.append(placa)
+        conds.append("placa = ?"); params.append(placa.strip().upper())
     if salon_origen:
-        base += " AND salon_origen = ?"; params.append(salon_origen.upper())
+        conds.append("salon_origen = ?"); params.append(salon_origen.upper())
     if salon_destino:
-        base += " AND salon_destino = ?"; params.append(salon_destino.upper())
+        conds.append("salon_destino = ?"); params.append(salon_destino.upper())
     if responsable:
-        base += " AND responsable LIKE ?"; params.append(f"%{responsable}%")
+        conds.append("responsable = ?"); params.append(responsable)
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
 
-    base += " ORDER BY datetime(fecha_hora) DESC, id DESC"
-    conn = obtener_conexion()
-    df = pd.read_sql_query(base, conn, params=params)
-    conn.close()
-    return df
+@cacheado("inventario_movs")
+def obtener_movimientos(fecha_ini:str=None, fecha_fin:str=None, placa:str=None,
+                        salon_origen:str=None, salon_destino:str=None, responsable:str=None):
+    """
+    Devuelve DataFrame de movimientos con filtros opcionales (fechas en 'YYYY-MM-DD').
+    `responsable` es coincidencia exacta (ver valores_filtro_movimientos).
+    """
+    where, params = _where_movimientos(fecha_ini, fecha_fin, placa, salon_origen,
+                                       salon_destino, responsable)
+    sql = f"SELECT {COLUMNAS_MOVIMIENTOS} FROM inventario_movs{where} ORDER BY fecha_hora DESC, id DESC"
+    with conexion() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+@cacheado("inventario_movs")
+def consultar_movimientos(limite: int = 50, despues_de: tuple | None = None, **filtros):
+    """
+    Una página de movimientos, más reciente primero (keyset sobre (fecha_hora, id)).
+    Devuelve (df, siguiente_cursor); siguiente_cursor es None en la última página.
+    """
+    where, params = _where_movimientos(**filtros)
+    if despues_de:
+        where += (" AND " if where else " WHERE ") + "(fecha_hora, id) < (?, ?)"
+        params += [despues_de[0], int(despues_de[1])]
+    sql = (f"SELECT {COLUMNAS_MOVIMIENTOS} FROM inventario_movs{where} "
+           "ORDER BY fecha_hora DESC, id DESC LIMIT ?")
+    params.append(int(limite) + 1)  # +1 para saber si hay más
+    with conexion() as conn:
+        df = pd.read_sql_query(sql, conn, params=params)
+
+    siguiente = None
+    if len(df) > limite:
+        df = df.iloc[:limite]
+        ult = df.iloc[-1]
+        siguiente = (ult["fecha_hora"], int(ult["id"]))
+    return df, siguiente
+
+@cacheado("inventario_movs")
+def resumen_movimientos(**filtros) -> dict:
+    """Totales con los mismos filtros: movimientos, equipos distintos y rango de fechas."""
+    where, params = _where_movimientos(**filtros)
+    with conexion() as conn:
+        r = conn.execute(
+            f"""SELECT COUNT(*) AS total, COUNT(DISTINCT inventario_id) AS equipos,
+                       MIN(fecha_hora) AS primero, MAX(fecha_hora) AS ultimo
+                FROM inventario_movs{where}""", params
+        ).fetchone()
+    return dict(r)
+
+@cacheado("inventario_movs")
+def movimientos_por_salon(lado: str = "salon_destino", n: int | None = 15, **filtros) -> pd.DataFrame:
+    """Conteo de movimientos por salón de origen o de destino (GROUP BY en SQL)."""
+    if lado not in ("salon_origen", "salon_destino"):
+        raise ValueError("lado debe ser 'salon_origen' o 'salon_destino'")
+    where, params = _where_movimientos(**filtros)
+    sql = (f"SELECT COALESCE({lado}, '(sin dato)') AS salon, COUNT(*) AS movimientos "
+           f"FROM inventario_movs{where} GROUP BY {lado} ORDER BY movimientos DESC, salon")
+    if n:
+        sql += " LIMIT ?"; params.append(int(n))
+    with conexion() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+@cacheado("inventario_movs")
+def valores_filtro_movimientos() -> dict:
+    """Opciones para los selectores (DISTINCT sobre los índices compuestos)."""
+    with conexion() as conn:
+        return {
+            col: [r[0] for r in conn.execute(
+                f"SELECT DISTINCT {col} FROM inventario_movs WHERE {col} IS NOT NULL ORDER BY {col}"
+            ).fetchall()]
+            for col in ("salon_origen", "salon_destino", "responsable")
+        }
+
+def consulta_exportar_movimientos(**filtros) -> tuple[str, list]:
+    """(sql, params) de todos los movimientos con los filtros, para services.exportacion."""
+    where, params = _where_movimientos(**filtros)
+    return (f"SELECT {COLUMNAS_MOVIMIENTOS} FROM inventario_movs{where} "
+            "ORDER BY fecha_hora DESC, id DESC", params)
 
 def movimientos_por_placa(placa:str):
     return obtener_movimientos(placa=(placa or "").strip().upper())
 
 # --- SAFE WRAPPERS (usan validators + Result + txn) ---
+@serializado
 def agregar_equipo_safe(nombre, tipo, estado, salon, responsable, fecha_registro, placa=None) -> Result:
     try:
         nombre, tipo, estado = validar_equipo(nombre, tipo, estado)
@@ -402,14 +1356,14 @@ def agregar_equipo_safe(nombre, tipo, estado, salon, responsable, fecha_registro
         if placa and existe_placa(placa):
             return ERR(f"La placa {placa} ya existe.")
 
-        conn = obtener_conexion()
-        with txn(conn):
+        with conexion() as conn, txn(conn):
+            invalidar(conn, "inventario", "rooms")
             if salon != "BODEGA":
                 conn.execute("INSERT OR IGNORE INTO rooms(codigo) VALUES (?)", (salon,))
             conn.execute(
                 """INSERT INTO inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
                    VALUES (?,?,?,?,?,?,?)""",
-                (nombre, tipo, estado, salon, (responsable or ""), fecha_registro, placa),
+                (nombre, tipo, estado, salon, (responsable or ""), norm_fecha_hora(fecha_registro), placa),
             )
         return OK(True)
     except ValidationError as e:
@@ -427,11 +1381,10 @@ def actualizar_equipo_safe(id_equipo:int, **campos) -> Result:
             p = norm_placa(campos["placa"])
             campos["placa"] = p
             if p:
-                conn = obtener_conexion()
-                row = conn.execute(
-                    "SELECT id FROM inventario WHERE placa=? AND id<>?", (p, int(id_equipo))
-                ).fetchone()
-                conn.close()
+                with conexion() as conn:
+                    row = conn.execute(
+                        "SELECT id FROM inventario WHERE placa=? AND id<>?", (p, int(id_equipo))
+                    ).fetchone()
                 if row:
                     return ERR(f"La placa {p} ya existe en otro equipo.")
 
@@ -471,6 +1424,7 @@ def insertar_inventario_masivo_safe(df: pd.DataFrame) -> Result:
     except Exception as e:
         return ERR(f"Error en carga masiva: {e}")
 
+@serializado
 def mover_equipo_safe(inventario_id:int, nuevo_salon:str, motivo:str, responsable:str,
                       fecha_hora:str, notas:str=None) -> Result:
     try:
@@ -483,6 +1437,7 @@ def mover_equipo_safe(inventario_id:int, nuevo_salon:str, motivo:str, responsabl
 from patterns import Result, OK, ERR
 from validators import validar_equipo, norm_salon, norm_placa
 
+@serializado
 def agregar_equipo_safe(nombre, tipo, estado, salon, responsable, fecha_registro, placa=None) -> Result:
     # Validaciones de dominio
     err = validar_equipo(nombre, tipo, estado, salon, fecha_registro)
@@ -496,8 +1451,8 @@ def agregar_equipo_safe(nombre, tipo, estado, salon, responsable, fecha_registro
         return ERR(f"La placa {placa_n} ya existe.")
 
     try:
-        conn = obtener_conexion()
-        with txn(conn):
+        with conexion() as conn, txn(conn):
+            invalidar(conn, "inventario", "rooms")
             # asegurar salón si no existe
             registrar_salon(salon_n)
             # insertar
@@ -505,19 +1460,17 @@ def agregar_equipo_safe(nombre, tipo, estado, salon, responsable, fecha_registro
                 """INSERT INTO inventario (nombre, tipo, estado, salon, responsable, fecha_registro, placa)
                    VALUES (?,?,?,?,?,?,?)""",
                 (nombre.strip(), tipo.strip().title(), estado.strip(), salon_n,
-                 (responsable or "").strip(), fecha_registro, placa_n),
+                 (responsable or "").strip(), norm_fecha_hora(fecha_registro), placa_n),
             )
-        conn.close()
         return OK()
     except Exception as e:
-        try: conn.close()
-        except: pass
         return ERR(f"Error guardando equipo: {e}")
 
+@serializado
 def mover_equipo_safe(inventario_id:int, salon_destino:str, motivo:str, responsable:str, fecha_hora:str, notas:str|None=None) -> Result:
     try:
-        conn = obtener_conexion()
-        with txn(conn):
+        with conexion() as conn, txn(conn):
+            invalidar(conn, "inventario", "inventario_movs", "rooms")
             # leer actual
             row = conn.execute("SELECT id, salon, placa FROM inventario WHERE id=?", (int(inventario_id),)).fetchone()
             if not row: return ERR(f"Equipo id={inventario_id} no existe")
@@ -532,60 +1485,149 @@ def mover_equipo_safe(inventario_id:int, salon_destino:str, motivo:str, responsa
                 """INSERT INTO inventario_movs (inventario_id, placa, salon_origen, salon_destino, motivo, responsable, fecha_hora, notas)
                    VALUES (?,?,?,?,?,?,?,?)""",
                 (int(inventario_id), (row["placa"] or None), origen or None, destino or None,
-                 (motivo or None), (responsable or None), fecha_hora, (notas or None))
+                 (motivo or None), (responsable or None), norm_fecha_hora(fecha_hora), (notas or None))
             )
-        conn.close()
         return OK()
     except Exception as e:
-        try: conn.close()
-        except: pass
         return ERR(f"Error moviendo equipo: {e}")
 
 # database.py
-from validators import normalizar_salon_label, titlecase_nombre
+from database_migraciones import PasoLote, PasoSerie, aplicar_migraciones, ESQUEMA_MIGRACIONES
+from normalizacion import normalizar_salon_series, titlecase_series
 
 def _get_db_version(conn) -> int:
     return conn.execute("PRAGMA user_version").fetchone()[0]
 
-def _set_db_version(conn, v: int) -> None:
-    conn.execute(f"PRAGMA user_version = {v}")
-
-def _migration_1_normalize_data(conn):
-    """Normaliza salones y nombres ya existentes."""
-    cur = conn.cursor()
-
-    # llaves: normalizar salón
-    for _id, salon in cur.execute("SELECT id, salon FROM llaves").fetchall():
-        new = normalizar_salon_label(salon or "")
-        if new and new != (salon or ""):
-            cur.execute("UPDATE llaves SET salon=? WHERE id=?", (new, _id))
-
-    # llaves: normalizar nombre
-    for _id, nombre in cur.execute("SELECT id, nombre FROM llaves").fetchall():
-        new = titlecase_nombre(nombre or "")
-        if new and new != (nombre or ""):
-            cur.execute("UPDATE llaves SET nombre=? WHERE id=?", (new, _id))
+# v0 -> v1: normalización de salones y nombres ya existentes en llaves
+# (versiones vectorizadas de normalizacion, por lotes). inventario.salon no
+# se toca: guarda códigos de norm_salon ('C3-204') que deben coincidir con
+# rooms.codigo, y la etiqueta 'Sala ...' los rompería.
+# Valores que ya tienen la forma de la etiqueta ('Sala 7', 'Sala C3-204',
+# 'BODEGA') se saltan: volver a etiquetarlos no debe cambiarlos.
+_SALON_LABEL_CANONICO = ("({col} = 'BODEGA' OR ({col} GLOB 'Sala [0-9A-Z]*' "
+                         "AND substr({col}, 6) NOT GLOB '*[^0-9A-Z-]*'))")
+MIGRACION_1_NORMALIZAR = [
+    PasoSerie("llaves_salon", "llaves", "salon", normalizar_salon_series,
+              filtro=f"{{col}} IS NULL OR NOT {_SALON_LABEL_CANONICO}"),
+    PasoSerie("llaves_nombre", "llaves", "nombre", titlecase_series),
+]
+
+# v1 -> v2: fechas a 'YYYY-MM-DD HH:MM:SS' para poder ordenar/filtrar por la
+# columna directamente (sin datetime()/date(), que impiden usar índices).
+# Valores que SQLite no sabe interpretar (strftime -> NULL) se dejan como están.
+_FMT_SQL = "'%Y-%m-%d %H:%M:%S'"
+MIGRACION_2_FECHAS = [
+    PasoLote("llaves_fecha", "llaves", "fecha_hora", f"strftime({_FMT_SQL}, {{col}})"),
+    PasoLote("inventario_fecha", "inventario", "fecha_registro", f"strftime({_FMT_SQL}, {{col}})"),
+    PasoLote("movs_fecha", "inventario_movs", "fecha_hora", f"strftime({_FMT_SQL}, {{col}})"),
+]
+
+def _migration_3_llaves_estado(conn):
+    """Salones/fechas cambiaron (v1, v2) o la tabla es nueva: recalcula el estado."""
+    _reconstruir_llaves_estado(conn)
+
+def _migration_4_inventario_fts(conn):
+    """
+    Crea inventario_fts + triggers y lo llena con lo que ya existe. Va como
+    migración (no en PASOS_ESQUEMA): con contenido externo, un trigger de
+    UPDATE/DELETE sobre filas aún no indexadas corrompe el índice, así que
+    las migraciones anteriores deben correr antes de crear los triggers.
+    """
+    for sentencia in _sentencias(ESQUEMA_INVENTARIO_FTS):
+        conn.execute(sentencia)
+    conn.execute("INSERT INTO inventario_fts (inventario_fts) VALUES ('rebuild')")
+
+# v6 -> v7: inventario.salon en su forma canónica (norm_salon) para
+# filtrar por salón con `salon = ?`, e idx_inventario_salon pasa a
+# (salon, fecha_registro). El DROP/CREATE va después de normalizar: así el
+# índice se construye una sola vez sobre los valores finales.
+def _migration_7_indice_salon(conn):
+    conn.execute("DROP INDEX IF EXISTS idx_inventario_salon")
+    conn.execute("CREATE INDEX idx_inventario_salon ON inventario(salon, fecha_registro)")
+
+MIGRACION_7_SALON = [
+    PasoLote("inventario_salon_canonico", "inventario", "salon", SALON_CANONICO_SQL),
+    _migration_7_indice_salon,
+]
+
+def _migration_8_llaves_diario(conn):
+    """Backfill de llaves_diario con el historial existente."""
+    _reconstruir_llaves_diario(conn)
+
+def _migration_9_inventario_resumen(conn):
+    """
+    Crea inventario_resumen + triggers y lo llena desde inventario. Va como
+    migración por lo mismo que inventario_fts: los triggers descuentan grupos
+    que deben existir, así que se crean junto con el backfill.
+    """
+    for sentencia in _sentencias(ESQUEMA_INVENTARIO_RESUMEN):
+        conn.execute(sentencia)
+    _reconstruir_inventario_resumen(conn)
 
-    # inventario: normalizar salón
-    for _id, salon in cur.execute("SELECT id, salon FROM inventario").fetchall():
-        new = normalizar_salon_label(salon or "")
-        if new and new != (salon or ""):
-            cur.execute("UPDATE inventario SET salon=? WHERE id=?", (new, _id))
+def _migration_11_cambios(conn):
+    """
+    Crea cambios + triggers. Va al final de las migraciones: los UPDATE
+    masivos de las anteriores no tienen por qué quedar en el registro (una
+    Instantanea sin secuencia previa relee la tabla completa igual).
+    """
+    for sentencia in _sentencias(ESQUEMA_CAMBIOS):
+        conn.execute(sentencia)
 
 def run_startup_migrations():
+    """Compatibilidad: las migraciones las aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
+
+
+# ---- Verificación de planes: las consultas calientes deben usar índice ----
+CONSULTAS_INDEXADAS = {
+    # nombre: (sql, params, índice esperado)
+    "historial": ("SELECT * FROM llaves ORDER BY fecha_hora DESC, id DESC", (), "idx_llaves_fecha"),
+    "historial_pagina": (
+        "SELECT id FROM llaves WHERE nombre=? AND (fecha_hora, id) < (?, ?) ORDER BY fecha_hora DESC, id DESC LIMIT 51",
+        ("Ana", "2025-01-01 00:00:00", 1), "idx_llaves_nombre_fecha"),
+    "ultimo_evento_salon": (
+        "SELECT id FROM llaves WHERE salon=? ORDER BY fecha_hora DESC, id DESC LIMIT 1",
+        ("Sala 1",), "idx_llaves_salon_fecha"),
+    "llaves_activas": (
+        "SELECT * FROM llaves_estado WHERE accion = 'Entregada' ORDER BY fecha_hora DESC",
+        (), "idx_llaves_estado_activas"),
+    "inventario": ("SELECT * FROM inventario ORDER BY fecha_registro DESC, id DESC", (), "idx_inv_fecha_registro"),
+    "inventario_salon": (
+        "SELECT * FROM inventario WHERE salon=? ORDER BY fecha_registro DESC, id DESC",
+        ("BODEGA",), "idx_inventario_salon"),
+    "resumen_salon": (
+        "SELECT tipo, estado, cantidad, sin_placa FROM inventario_resumen WHERE salon=?",
+        ("BODEGA",), "PRIMARY KEY"),
+    "inventario_por_estado": (
+        "SELECT estado, SUM(cantidad) FROM inventario_resumen GROUP BY estado ORDER BY estado",
+        (), "idx_inv_resumen_estado"),
+    "movimientos_rango": (
+        "SELECT * FROM inventario_movs WHERE fecha_hora >= ? AND fecha_hora < ? ORDER BY fecha_hora DESC, id DESC",
+        ("2025-01-01 00:00:00", "2025-02-01 00:00:00"), "idx_movs_fecha"),
+    "movimientos_placa_pagina": (
+        "SELECT id FROM inventario_movs WHERE placa=? AND (fecha_hora, id) < (?, ?) ORDER BY fecha_hora DESC, id DESC LIMIT 51",
+        ("EQ-1", "2025-01-01 00:00:00", 1), "idx_movs_placa_fecha"),
+    "movimientos_responsable": (
+        "SELECT id FROM inventario_movs WHERE responsable=? AND fecha_hora >= ? ORDER BY fecha_hora DESC, id DESC LIMIT 51",
+        ("Ana", "2025-01-01 00:00:00"), "idx_movs_resp_fecha"),
+}
+
+def plan_consulta(sql: str, params=()) -> list[str]:
+    """Devuelve las líneas 'detail' de EXPLAIN QUERY PLAN."""
+    with conexion() as conn:
+        return [r["detail"] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()]
+
+def verificar_planes_consulta() -> dict:
     """
-    Ejecuta migraciones pendientes UNA sola vez, controlado por user_version.
-    - v0 -> v1: normalización de salones y nombres existentes
+    Comprueba que cada consulta de CONSULTAS_INDEXADAS usa su índice y no
+    necesita ordenar en un B-tree temporal. {nombre: {"ok", "plan"}}.
     """
-    conn = obtener_conexion()
-    try:
-        ver = _get_db_version(conn)
-        if ver < 1:
-            _migration_1_normalize_data(conn)
-            _set_db_version(conn, 1)
-            conn.commit()
-    finally:
-        conn.close()
+    out = {}
+    for nombre, (sql, params, indice) in CONSULTAS_INDEXADAS.items():
+        plan = plan_consulta(sql, params)
+        ok = any(indice in d for d in plan) and not any("TEMP B-TREE" in d for d in plan)
+        out[nombre] = {"ok": ok, "plan": plan}
+    return out
 
 # =======================================================
 #  📌 SECCIÓN: RECORDATORIOS (dashboard colaborativo)
@@ -601,41 +1643,282 @@ CREATE TABLE IF NOT EXISTS recordatorios (
 """
 
 def asegurar_esquema_recordatorios():
-    conn = obtener_conexion()
-    conn.executescript(ESQUEMA_RECORDATORIOS)
-    conn.commit()
-    conn.close()
+    """Compatibilidad: el esquema lo aplica ensure_db() (una vez por proceso)."""
+    ensure_db()
 
 
+@serializado
 def agregar_recordatorio(texto, fecha=None, responsable=None):
-    conn = obtener_conexion()
-    conn.execute(
-        "INSERT INTO recordatorios (texto, fecha, responsable) VALUES (?, ?, ?)",
-        (texto.strip(), fecha, responsable)
-    )
-    conn.commit()
-    conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "recordatorios")
+        conn.execute(
+            "INSERT INTO recordatorios (texto, fecha, responsable) VALUES (?, ?, ?)",
+            (texto.strip(), fecha, responsable)
+        )
 
 
+@cacheado("recordatorios")
 def obtener_recordatorios(incluir_hechos=True):
-    conn = obtener_conexion()
     query = "SELECT * FROM recordatorios"
     if not incluir_hechos:
         query += " WHERE hecho = 0"
-    df = pd.read_sql_query(query + " ORDER BY COALESCE(fecha, datetime('now')) ASC", conn)
-    conn.close()
-    return df
+    with conexion() as conn:
+        return pd.read_sql_query(query + " ORDER BY COALESCE(fecha, datetime('now')) ASC", conn)
 
 
+@serializado
 def marcar_recordatorio(id_record, hecho=True):
-    conn = obtener_conexion()
-    conn.execute("UPDATE recordatorios SET hecho = ? WHERE id = ?", (1 if hecho else 0, id_record))
-    conn.commit()
-    conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "recordatorios")
+        conn.execute("UPDATE recordatorios SET hecho = ? WHERE id = ?", (1 if hecho else 0, id_record))
 
 
+@serializado
 def eliminar_recordatorio(id_record):
-    conn = obtener_conexion()
-    conn.execute("DELETE FROM recordatorios WHERE id = ?", (id_record,))
-    conn.commit()
-    conn.close()
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "recordatorios")
+        conn.execute("DELETE FROM recordatorios WHERE id = ?", (id_record,))
+
+
+# =======================================================
+#  ⏳ SECCIÓN: TRABAJOS EN SEGUNDO PLANO (ver services/trabajos.py)
+# =======================================================
+ESQUEMA_TRABAJOS = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tipo TEXT NOT NULL,           -- importar_inventario | exportar | reconstruir
+    estado TEXT NOT NULL DEFAULT 'pendiente',  -- pendiente | corriendo | ok | error | interrumpido
+    progreso REAL NOT NULL DEFAULT 0,          -- 0..1
+    mensaje TEXT,
+    parametros TEXT,              -- JSON
+    resultado TEXT,               -- JSON (p. ej. {"archivo": ruta, "filas": n})
+    error TEXT,
+    creado TEXT NOT NULL,         -- ISO 'YYYY-MM-DD HH:MM:SS'
+    iniciado TEXT,
+    terminado TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trabajos_estado ON trabajos(estado);
+"""
+
+ESTADOS_TRABAJO_ACTIVOS = ("pendiente", "corriendo")
+_CAMPOS_TRABAJO = {"estado", "progreso", "mensaje", "resultado", "error", "iniciado", "terminado"}
+
+def _trabajo_dict(row) -> dict:
+    t = dict(row)
+    for campo in ("parametros", "resultado"):
+        t[campo] = json.loads(t[campo]) if t[campo] else None
+    return t
+
+@serializado
+def crear_trabajo(tipo: str, parametros: dict | None = None) -> int:
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "trabajos")
+        return conn.execute(
+            "INSERT INTO trabajos (tipo, parametros, creado) VALUES (?, ?, ?)",
+            (tipo, json.dumps(parametros or {}, default=str), norm_fecha_hora(datetime.now())),
+        ).lastrowid
+
+@serializado
+def actualizar_trabajo(trabajo_id: int, **campos):
+    """Actualiza estado/progreso/mensaje/resultado/error/iniciado/terminado."""
+    desconocidos = set(campos) - _CAMPOS_TRABAJO
+    if desconocidos:
+        raise ValidationError(f"Campos no válidos para un trabajo: {sorted(desconocidos)}")
+    if "resultado" in campos and campos["resultado"] is not None:
+        campos["resultado"] = json.dumps(campos["resultado"], default=str)
+    sets = ", ".join(f"{k} = ?" for k in campos)
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "trabajos")
+        conn.execute(f"UPDATE trabajos SET {sets} WHERE id = ?", (*campos.values(), int(trabajo_id)))
+
+@serializado
+def marcar_trabajos_interrumpidos() -> int:
+    """Al arrancar: lo que quedó pendiente/corriendo murió con el proceso anterior."""
+    with conexion() as conn, txn(conn):
+        invalidar(conn, "trabajos")
+        return conn.execute(
+            f"""UPDATE trabajos SET estado = 'interrumpido', terminado = ?,
+                       error = COALESCE(error, 'El proceso se reinició antes de terminar')
+                WHERE estado IN {ESTADOS_TRABAJO_ACTIVOS}""",
+            (norm_fecha_hora(datetime.now()),),
+        ).rowcount
+
+@cacheado("trabajos")
+def obtener_trabajo(trabajo_id: int) -> dict | None:
+    """El trabajo con parametros/resultado ya decodificados (None si no existe)."""
+    with conexion() as conn:
+        row = conn.execute("SELECT * FROM trabajos WHERE id = ?", (int(trabajo_id),)).fetchone()
+    return _trabajo_dict(row) if row else None
+
+@cacheado("trabajos")
+def listar_trabajos(limite: int = 20, tipo: str | None = None) -> pd.DataFrame:
+    """Últimos trabajos (más recientes primero), sin parámetros ni resultado."""
+    sql = "SELECT id, tipo, estado, progreso, mensaje, error, creado, terminado FROM trabajos"
+    params = []
+    if tipo:
+        sql += " WHERE tipo = ?"; params.append(tipo)
+    sql += " ORDER BY id DESC LIMIT ?"; params.append(int(limite))
+    with conexion() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+# =======================================================
+#  🔁 SECCIÓN: REGISTRO DE CAMBIOS (ver database_cambios.py)
+# =======================================================
+# Las lecturas de tabla completa (obtener_historial, obtener_inventario,
+# obtener_salones) se guardan en una Instantanea y, cuando cambia la tabla,
+# se parchan con el delta del registro en vez de releer todas las filas.
+_INSTANTANEAS = {
+    "llaves": Instantanea("llaves", "SELECT * FROM llaves ORDER BY fecha_hora DESC, id DESC",
+                          ["fecha_hora", "id"], descendente=True),
+    "inventario": Instantanea("inventario", "SELECT * FROM inventario ORDER BY fecha_registro DESC, id DESC",
+                              ["fecha_registro", "id"], descendente=True),
+    "rooms": Instantanea("rooms", "SELECT * FROM rooms ORDER BY codigo", ["codigo"]),
+}
+
+def _leer_instantanea(tabla: str) -> pd.DataFrame:
+    with conexion() as conn:
+        return _INSTANTANEAS[tabla].obtener(conn, RUTA_BD).copy()
+
+def ultima_secuencia() -> int:
+    """Secuencia del último cambio registrado (0 si no hay)."""
+    with conexion() as conn:
+        return database_cambios.ultima_secuencia(conn)
+
+def cambios_desde(tabla: str, desde: int | None) -> dict:
+    """
+    Filas insertadas/actualizadas e ids borrados de `tabla` después de la
+    secuencia `desde` (ver database_cambios.cambios_desde). Guardar
+    delta["hasta"] y pasarlo en la próxima llamada.
+    """
+    if tabla not in TABLAS_CAMBIOS:
+        raise ValidationError(f"{tabla} no tiene registro de cambios ({', '.join(TABLAS_CAMBIOS)})")
+    with conexion() as conn:
+        return database_cambios.cambios_desde(conn, tabla, desde)
+
+@serializado
+def purgar_cambios(conservar: int = database_cambios.CONSERVAR) -> int:
+    """Deja las últimas `conservar` entradas del registro (quien quede atrás relee completo)."""
+    with conexion() as conn, txn(conn):
+        # generación propia: si no, el cambio de data_version sin generaciones
+        # nuevas se toma como escritura externa y vacía toda la caché
+        invalidar(conn, "cambios")
+        return database_cambios.purgar_cambios(conn, conservar)
+
+def estadisticas_instantaneas() -> dict:
+    return {t: dict(i.stats) for t, i in _INSTANTANEAS.items()}
+
+
+# -------------------------------------------------------------------
+#  REGISTRO DE ESQUEMA (se aplica una vez por proceso, ver ensure_db)
+# -------------------------------------------------------------------
+# Pasos de DDL idempotentes, en orden. Un paso es un script SQL o una función
+# que recibe la conexión (para lo que no se puede expresar con IF NOT EXISTS).
+PASOS_ESQUEMA = [
+    ("base", ESQUEMA_BASE),
+    ("placa", _campo_placa),
+    ("inventario", ESQUEMA_INVENTARIO),
+    ("movimientos", ESQUEMA_MOVIMIENTOS),
+    ("recordatorios", ESQUEMA_RECORDATORIOS),
+    ("cache", ESQUEMA_CACHE),
+    ("migraciones", ESQUEMA_MIGRACIONES),
+    ("slow_queries", ESQUEMA_SLOW_QUERIES),
+    ("llaves_estado", ESQUEMA_LLAVES_ESTADO),
+    ("llaves_diario", ESQUEMA_LLAVES_DIARIO),
+    ("trabajos", ESQUEMA_TRABAJOS),
+]
+
+# (versión, tablas que invalida en caché, pasos). Ver database_migraciones:
+# los PasoLote se confirman por lotes y se reanudan si el proceso se corta.
+MIGRACIONES = [
+    (1, ("llaves",), MIGRACION_1_NORMALIZAR),
+    (2, ("llaves", "inventario", "inventario_movs"), MIGRACION_2_FECHAS),
+    (3, ("llaves",), [_migration_3_llaves_estado]),
+    (4, ("inventario",), [_migration_4_inventario_fts]),
+    (5, (), []),  # slow_queries: solo DDL (PASOS_ESQUEMA)
+    (6, (), []),  # índices compuestos de inventario_movs: solo DDL
+    (7, ("inventario",), MIGRACION_7_SALON),
+    (8, ("llaves",), [_migration_8_llaves_diario]),
+    (9, ("inventario",), [_migration_9_inventario_resumen]),
+    (10, (), []),  # trabajos: solo DDL
+    (11, (), [_migration_11_cambios]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+_versiones: dict[str, int] = {}   # ruta -> versión ya verificada en este proceso
+_reporte_migraciones: list[dict] = []
+_lock_esquema = threading.Lock()
+
+
+def _sentencias(script: str) -> list[str]:
+    """Parte un script en sentencias (executescript haría COMMIT por su cuenta)."""
+    out, buf = [], ""
+    for linea in script.splitlines(keepends=True):
+        buf += linea
+        if sqlite3.complete_statement(buf):
+            if buf.strip():
+                out.append(buf)
+            buf = ""
+    if buf.strip():
+        out.append(buf)
+    return out
+
+
+def _aplicar_pasos_esquema(conn) -> None:
+    with txn(conn):
+        for _nombre, paso in PASOS_ESQUEMA:
+            if callable(paso):
+                paso(conn)
+            else:
+                for sentencia in _sentencias(paso):
+                    conn.execute(sentencia)
+
+
+def ensure_db() -> int:
+    """
+    Deja la BD en VERSION_ESQUEMA. La primera llamada del proceso lee
+    PRAGMA user_version y, si va atrasada, aplica DDL y migraciones con una
+    sola conexión; las siguientes (cada rerun de Streamlit) solo comparan un
+    entero en memoria. Devuelve la versión.
+    """
+    ruta = RUTA_BD
+    if _versiones.get(ruta) == VERSION_ESQUEMA:
+        return VERSION_ESQUEMA
+
+    with _lock_esquema:
+        if _versiones.get(ruta) == VERSION_ESQUEMA:
+            return VERSION_ESQUEMA
+        with conexion() as conn:
+            ver = _get_db_version(conn)
+            if ver < VERSION_ESQUEMA:
+                _aplicar_pasos_esquema(conn)
+                _reporte_migraciones[:] = aplicar_migraciones(conn, MIGRACIONES, ver)
+                ver = _get_db_version(conn)
+        _versiones[ruta] = ver
+    return ver
+
+
+def reporte_migraciones() -> list[dict]:
+    """Tiempo/filas de cada paso migrado por este proceso (vacío si no hubo)."""
+    return list(_reporte_migraciones)
+
+
+def progreso_migraciones() -> pd.DataFrame:
+    """Progreso guardado de todas las migraciones (incluye las de otros arranques)."""
+    with conexion() as conn:
+        return pd.read_sql_query(
+            "SELECT * FROM migraciones_progreso ORDER BY version, paso", conn
+        )
+
+
+# ---- Escritor único: las funciones @serializado corren en su hilo ----
+database_escritor.usar_conexion(conexion, preparar=ensure_db)
+
+# ---- Métricas: toda función pública queda medida (un `if` si está desactivado) ----
+database_metricas.usar_conexion(conexion)
+database_metricas.instrumentar(
+    globals(),
+    excluir={"obtener_conexion", "conexion", "estadisticas_conexiones", "estadisticas_escritor",
+             "estadisticas_instantaneas", "ensure_db"},
+)
@@ -0,0 +1,144 @@
+# database_cache.py
+"""
+Caché de lecturas compartida entre sesiones, invalidada por escrituras.
+
+Cada escritura de database.py incrementa, dentro de su misma transacción, la
+generación de las tablas que toca (tabla cache_generaciones). Las lecturas
+cacheadas usan esas generaciones como parte de la clave, así que una escritura
+—de este proceso o de otro que use la misma BD— deja obsoletas solo las
+entradas de sus tablas.
+
+Para no consultar cache_generaciones en cada lectura se usa PRAGMA
+data_version: si ninguna otra conexión confirmó cambios y este proceso no
+escribió, las generaciones leídas antes siguen valiendo.
+"""
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+ESQUEMA_CACHE = """
+CREATE TABLE IF NOT EXISTS cache_generaciones (
+    tabla TEXT PRIMARY KEY,
+    gen INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+HABILITADO = True
+MAX_ENTRADAS = 128
+
+_lock = threading.Lock()
+_local = threading.local()
+_entradas: "OrderedDict[tuple, object]" = OrderedDict()
+_escrituras_locales = 0   # se incrementa en cada invalidar() de este proceso
+_gen_externa = 0          # cambios hechos sin pasar por invalidar() (otra herramienta)
+_stats = {"hits": 0, "misses": 0, "desalojos": 0, "externas": 0}
+_conexion = None          # context manager de conexión (lo registra database.py)
+
+
+def usar_conexion(proveedor) -> None:
+    """Registra la función que entrega la conexión del pool (database.conexion)."""
+    global _conexion
+    _conexion = proveedor
+
+
+def invalidar(conn, *tablas: str) -> None:
+    """Sube la generación de las tablas. Llamar DENTRO de la transacción de escritura."""
+    global _escrituras_locales
+    conn.executemany(
+        """INSERT INTO cache_generaciones (tabla, gen) VALUES (?, 1)
+           ON CONFLICT(tabla) DO UPDATE SET gen = gen + 1""",
+        [(t,) for t in tablas],
+    )
+    with _lock:
+        _escrituras_locales += 1
+
+
+def _generaciones(conn) -> tuple[dict, int]:
+    """Generaciones vigentes; solo relee la tabla si algo cambió desde la última vez."""
+    global _gen_externa
+    dv = conn.execute("PRAGMA data_version").fetchone()[0]
+    previo = getattr(_local, "estado", None)
+    locales = _escrituras_locales
+    if previo and previo["conn"] is conn and previo["dv"] == dv and previo["locales"] == locales:
+        return previo["gens"], _gen_externa
+
+    gens = {r[0]: r[1] for r in conn.execute("SELECT tabla, gen FROM cache_generaciones")}
+    if previo and previo["conn"] is conn and previo["dv"] != dv \
+            and previo["locales"] == locales and previo["gens"] == gens:
+        # Otra conexión confirmó cambios sin tocar las generaciones: invalidamos todo
+        with _lock:
+            _gen_externa += 1
+            _stats["externas"] += 1
+    _local.estado = {"conn": conn, "dv": dv, "locales": locales, "gens": gens}
+    return gens, _gen_externa
+
+
+def _copiar(v):
+    # Los llamadores modifican los DataFrames (p. ej. procesar_fechas): nunca
+    # devolvemos el objeto guardado.
+    if isinstance(v, pd.DataFrame):
+        return v.copy()
+    if isinstance(v, tuple):
+        return tuple(_copiar(x) for x in v)
+    if isinstance(v, dict):
+        return {k: _copiar(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return list(v)
+    return v
+
+
+def cacheado(*tablas: str):
+    """Decorador para lecturas de database.py que dependen de `tablas`."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not HABILITADO or _conexion is None:
+                return fn(*args, **kwargs)
+            try:
+                with _conexion() as conn:
+                    if conn.in_transaction:  # lectura dentro de una escritura: sin caché
+                        return fn(*args, **kwargs)
+                    gens, externa = _generaciones(conn)
+                clave = (fn.__qualname__, args, tuple(sorted(kwargs.items())),
+                         tuple(gens.get(t, 0) for t in tablas), externa)
+                hash(clave)
+            except (sqlite3.OperationalError, TypeError):
+                # sin tabla de generaciones o argumentos no hasheables
+                return fn(*args, **kwargs)
+
+            with _lock:
+                if clave in _entradas:
+                    _entradas.move_to_end(clave)
+                    _stats["hits"] += 1
+                    return _copiar(_entradas[clave])
+                _stats["misses"] += 1
+
+            valor = fn(*args, **kwargs)
+            with _lock:
+                _entradas[clave] = valor
+                while len(_entradas) > MAX_ENTRADAS:
+                    _entradas.popitem(last=False)
+                    _stats["desalojos"] += 1
+            return _copiar(valor)
+
+        wrapper.sin_cache = fn
+        return wrapper
+    return deco
+
+
+def limpiar_cache() -> None:
+    with _lock:
+        _entradas.clear()
+
+
+def estadisticas_cache() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["entradas"] = len(_entradas)
+        stats["max_entradas"] = MAX_ENTRADAS
+    total = stats["hits"] + stats["misses"]
+    stats["tasa_hit"] = round(stats["hits"] / total, 3) if total else 0.0
+    return stats
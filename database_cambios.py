@@ -0,0 +1,210 @@
+# database_cambios.py
+"""
+Registro de cambios (tabla cambios) y refresco incremental de DataFrames.
+
+Triggers en llaves, inventario, inventario_movs, rooms y recordatorios anotan
+cada INSERT/UPDATE/DELETE como (seq, tabla, fila_id, op) en la misma
+transacción de la escritura. seq es AUTOINCREMENT: crece siempre y no se
+reutiliza aunque se purgue el registro.
+
+cambios_desde(conn, tabla, desde) devuelve lo que cambió después de la
+secuencia `desde`: filas insertadas y actualizadas (leídas de la tabla, tal
+como están ahora) e ids borrados. Aplicar un delta es idempotente: si una
+escritura se confirma entre la lectura de la secuencia y la de las filas, el
+siguiente delta la vuelve a traer y el resultado es el mismo.
+
+Instantanea guarda una tabla completa en memoria y la parcha con deltas en
+vez de releerla; si el registro ya no cubre el rango (purgado) o el delta es
+muy grande, relee todo.
+"""
+import json
+import threading
+
+import pandas as pd
+
+TABLAS_CAMBIOS = ("llaves", "inventario", "inventario_movs", "rooms", "recordatorios")
+LIMITE_DELTA = 5000       # más ids cambiados que esto: conviene releer la tabla
+CONSERVAR = 200_000       # entradas que deja purgar_cambios
+
+_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS cambios_{t}_ai AFTER INSERT ON {t} BEGIN
+    INSERT INTO cambios (tabla, fila_id, op) VALUES ('{t}', new.id, 'I');
+END;
+CREATE TRIGGER IF NOT EXISTS cambios_{t}_au AFTER UPDATE ON {t} BEGIN
+    INSERT INTO cambios (tabla, fila_id, op) VALUES ('{t}', new.id, 'U');
+END;
+CREATE TRIGGER IF NOT EXISTS cambios_{t}_ad AFTER DELETE ON {t} BEGIN
+    INSERT INTO cambios (tabla, fila_id, op) VALUES ('{t}', old.id, 'D');
+END;
+"""
+
+# Se crea en una migración (database._migration_11_cambios), después de las
+# migraciones de datos: así sus UPDATE masivos no llenan el registro.
+ESQUEMA_CAMBIOS = """
+CREATE TABLE IF NOT EXISTS cambios (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    tabla TEXT NOT NULL,
+    fila_id INTEGER NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('I', 'U', 'D'))
+);
+CREATE INDEX IF NOT EXISTS idx_cambios_tabla_seq ON cambios(tabla, seq);
+""" + "".join(_TRIGGERS.format(t=t) for t in TABLAS_CAMBIOS)
+
+
+def ultima_secuencia(conn) -> int:
+    """Última secuencia asignada (sqlite_sequence: no baja al purgar)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'cambios'").fetchone()
+    return row[0] if row else 0
+
+
+def cambios_desde(conn, tabla: str, desde: int | None, limite: int = LIMITE_DELTA) -> dict:
+    """
+    Delta de `tabla` después de la secuencia `desde`:
+    {"hasta", "completo", "insertados": DataFrame, "actualizados": DataFrame, "borrados": [ids]}.
+    completo=True significa que el delta no alcanza (desde es None, el registro
+    se purgó o cambiaron más de `limite` filas): hay que releer la tabla.
+    """
+    if tabla not in TABLAS_CAMBIOS:
+        raise ValueError(f"{tabla} no tiene registro de cambios")
+    hasta = ultima_secuencia(conn)
+    vacio = {"hasta": hasta, "completo": False, "insertados": None, "actualizados": None, "borrados": []}
+    if desde is None or desde > hasta:
+        return {**vacio, "completo": True}
+    if desde == hasta:
+        return vacio
+    minimo = conn.execute("SELECT MIN(seq) FROM cambios").fetchone()[0]
+    if minimo is None or desde < minimo - 1:
+        return {**vacio, "completo": True}  # el rango ya se purgó
+
+    primera, ultima = {}, {}
+    for fila_id, op in conn.execute(
+        "SELECT fila_id, op FROM cambios WHERE tabla = ? AND seq > ? AND seq <= ? ORDER BY seq",
+        (tabla, desde, hasta),
+    ):
+        primera.setdefault(fila_id, op)
+        ultima[fila_id] = op
+        if len(primera) > limite:
+            return {**vacio, "completo": True}
+
+    # neto por fila: insertada y borrada en el rango -> nada
+    nuevas = [i for i, op in ultima.items() if op != "D" and primera[i] == "I"]
+    cambiadas = [i for i, op in ultima.items() if op != "D" and primera[i] != "I"]
+    borrados = [i for i, op in ultima.items() if op == "D" and primera[i] != "I"]
+
+    filas = pd.read_sql_query(
+        f"SELECT * FROM {tabla} WHERE id IN (SELECT value FROM json_each(?))",
+        conn, params=(json.dumps(nuevas + cambiadas),),
+    )
+    # ya no está (se borró después de leer `hasta`): el próximo delta lo confirma
+    borrados += [i for i in nuevas + cambiadas if i not in set(filas["id"])]
+    return {
+        "hasta": hasta,
+        "completo": False,
+        "insertados": filas[filas["id"].isin(nuevas)],
+        "actualizados": filas[filas["id"].isin(cambiadas)],
+        "borrados": borrados,
+    }
+
+
+def _alinear(nuevas: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame | None:
+    """
+    Lleva las filas del delta a los tipos de df (una lectura parcial infiere
+    otros: una columna toda NULL sale object). None si no se puede sin
+    perder el tipo que daría una relectura: entonces se relee la tabla.
+    """
+    if list(nuevas.columns) != list(df.columns):
+        return None
+    cambios = {}
+    for col in df.columns:
+        if nuevas[col].dtype == df[col].dtype:
+            continue
+        if df[col].isna().all():   # df vacío o columna sin valores: tipo desconocido
+            return None
+        cambios[col] = df[col].dtype
+    try:
+        return nuevas.astype(cambios) if cambios else nuevas
+    except (TypeError, ValueError):  # p. ej. NULL en una columna int64
+        return None
+
+
+def aplicar_delta(df: pd.DataFrame, delta: dict, orden: list[str], descendente: bool = False) -> pd.DataFrame | None:
+    """
+    DataFrame nuevo con el delta aplicado (df no se modifica), ordenado como
+    la consulta original (`orden`; NULL al final en DESC y al inicio en ASC,
+    como SQLite). None si hay que releer la tabla (ver _alinear).
+    """
+    nuevas = [d for d in (delta["insertados"], delta["actualizados"]) if d is not None and not d.empty]
+    fuera = set(delta["borrados"]).union(*(set(d["id"]) for d in nuevas))
+    if not fuera:
+        return df
+    out = df[~df["id"].isin(fuera)].reset_index(drop=True)  # filtrar no cambia el orden
+    if not nuevas:
+        return out
+    nuevas = [_alinear(d, df) for d in nuevas]
+    if any(d is None for d in nuevas):
+        return None
+
+    def ordenar(x):
+        return x.sort_values(orden, ascending=not descendente, kind="stable",
+                             na_position="last" if descendente else "first", ignore_index=True)
+
+    nuevas = ordenar(pd.concat(nuevas, ignore_index=True))
+    # Caso común (eventos/equipos recién registrados): todo va antes o después
+    # de lo que ya estaba y no hace falta reordenar las filas existentes.
+    if out.empty or _en_orden(nuevas.tail(1), out.head(1), ordenar):
+        return pd.concat([nuevas, out], ignore_index=True)
+    if _en_orden(out.tail(1), nuevas.head(1), ordenar):
+        return pd.concat([out, nuevas], ignore_index=True)
+    return ordenar(pd.concat([out, nuevas], ignore_index=True))
+
+
+def _en_orden(a: pd.DataFrame, b: pd.DataFrame, ordenar) -> bool:
+    """True si la fila `a` va antes que la fila `b` en el orden de la consulta."""
+    par = pd.concat([a, b], ignore_index=True)
+    return ordenar(par)["id"].tolist() == par["id"].tolist()
+
+
+def purgar_cambios(conn, conservar: int = CONSERVAR) -> int:
+    """Borra las entradas más viejas y deja las últimas `conservar`. Devuelve cuántas borró."""
+    return conn.execute(
+        "DELETE FROM cambios WHERE seq <= ?", (ultima_secuencia(conn) - int(conservar),)
+    ).rowcount
+
+
+class Instantanea:
+    """
+    Tabla completa en memoria (por ruta de BD) que se actualiza con deltas.
+    `sql` debe leer toda la tabla en el orden `orden`.
+    """
+
+    def __init__(self, tabla: str, sql: str, orden: list[str], descendente: bool = False):
+        self.tabla = tabla
+        self.sql = sql
+        self.orden = orden
+        self.descendente = descendente
+        self._lock = threading.Lock()
+        self._por_ruta: dict[str, tuple[int, pd.DataFrame]] = {}
+        self.stats = {"completas": 0, "deltas": 0, "descartados": 0, "sin_cambios": 0}
+
+    def obtener(self, conn, ruta: str) -> pd.DataFrame:
+        """El DataFrame al día. Es compartido: quien lo modifique debe copiarlo."""
+        if conn.in_transaction:
+            # lo leído puede revertirse (y su secuencia reusarse): no se guarda
+            return pd.read_sql_query(self.sql, conn)
+        with self._lock:
+            previo = self._por_ruta.get(ruta)
+            delta = cambios_desde(conn, self.tabla, previo[0] if previo else None)
+            df = None
+            if not delta["completo"]:
+                if delta["hasta"] == previo[0]:
+                    df = previo[1]
+                    self.stats["sin_cambios"] += 1
+                else:
+                    df = aplicar_delta(previo[1], delta, self.orden, self.descendente)
+                    self.stats["deltas" if df is not None else "descartados"] += 1
+            if df is None:
+                # la secuencia se lee ANTES que las filas (ver docstring del módulo)
+                df = pd.read_sql_query(self.sql, conn)
+                self.stats["completas"] += 1
+            self._por_ruta[ruta] = (delta["hasta"], df)
+            return df
@@ -0,0 +1,338 @@
+# database_escritor.py
+"""
+Escritor único: todas las escrituras de database.py pasan por un hilo propio.
+
+Cada sesión de Streamlit corre en su hilo y antes escribía con su propia
+conexión; en un cambio de clase varias sesiones piden el bloqueo de escritura
+a la vez y alguna termina en "database is locked". Ahora las funciones
+decoradas con @serializado encolan la llamada y el hilo escritor:
+
+- toma lo que haya en la cola (hasta MAX_LOTE) y lo ejecuta en UNA
+  transacción (group commit): un solo BEGIN IMMEDIATE y un solo COMMIT/fsync
+  para todo el lote. Cada llamada va en su SAVEPOINT: si una falla, solo se
+  revierte esa y las demás se confirman;
+- si la BD está ocupada por otro proceso (SQLITE_BUSY) reintenta el lote
+  con backoff exponencial + jitter;
+- entrega el resultado (o la excepción) en un Future. La función decorada
+  sigue siendo síncrona; fn.en_cola(...) devuelve el Future sin esperar.
+
+Si el llamador se cansa de esperar (TIMEOUT_S) y su pedido sigue en la
+cola, se cancela: el escritor lo descarta y nunca se confirma. Si ya empezó,
+se espera a que termine (lo que devuelva es lo que quedó confirmado).
+
+Las llamadas que manejan sus propias transacciones (importar_inventario)
+se marcan con @serializado(agrupar=False): corren solas, fuera de un lote.
+
+Se desactiva con ALMACEN_ESCRITOR=0 (cada hilo vuelve a escribir directo).
+"""
+import functools
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FuturoTimeout
+
+HABILITADO = os.environ.get("ALMACEN_ESCRITOR", "1") != "0"
+MAX_LOTE = 64            # llamadas por transacción
+MAX_REINTENTOS = 6       # reintentos de un lote ante SQLITE_BUSY
+BACKOFF_BASE_S = 0.02    # 20, 40, 80... ms (+ jitter), tope BACKOFF_MAX_S
+BACKOFF_MAX_S = 1.0
+TIMEOUT_S = 60.0         # espera en cola antes de cancelar el pedido (ver _esperar)
+VENTANA = 2000           # muestras de latencia que se guardan
+
+_lock = threading.Lock()
+_local = threading.local()
+_cola: queue.Queue = queue.Queue()
+_FIN = object()           # pedido que termina el hilo (ver detener)
+_hilo: threading.Thread | None = None
+_conexion = None          # context manager de conexión (lo registra database.py)
+_preparar = None          # se llama antes de cada lote (database.ensure_db)
+_muestras: deque = deque(maxlen=VENTANA)   # (fin, espera_ms, total_ms)
+_lotes: deque = deque(maxlen=VENTANA)      # tamaño de cada lote
+_stats = {
+    "encoladas": 0,
+    "completadas": 0,
+    "fallidas": 0,        # la función lanzó excepción (se entrega al llamador)
+    "lotes": 0,
+    "max_lote": 0,
+    "reintentos": 0,      # lotes repetidos por SQLITE_BUSY
+    "busy_agotados": 0,   # lotes que agotaron MAX_REINTENTOS
+    "directas": 0,        # ejecutadas sin cola (anidadas o escritor desactivado)
+    "canceladas": 0,      # el llamador dejó de esperar antes de que empezaran
+}
+
+
+class _Pedido:
+    __slots__ = ("fn", "args", "kwargs", "agrupar", "futuro", "t_encolado", "t_inicio")
+
+    def __init__(self, fn, args, kwargs, agrupar: bool):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.agrupar = agrupar
+        self.futuro = Future()
+        self.t_encolado = time.perf_counter()
+        self.t_inicio = None
+
+
+def usar_conexion(proveedor, preparar=None) -> None:
+    """Registra database.conexion y, opcionalmente, lo que se corre antes de cada lote."""
+    global _conexion, _preparar
+    _conexion = proveedor
+    _preparar = preparar
+
+
+def es_escritor() -> bool:
+    """True si el hilo actual es el escritor (las llamadas anidadas van directo)."""
+    return getattr(_local, "escritor", False)
+
+
+def _arrancar() -> None:
+    global _hilo
+    with _lock:
+        if _hilo is None or not _hilo.is_alive():
+            _hilo = threading.Thread(target=_bucle, name="almacen-escritor", daemon=True)
+            _hilo.start()
+
+
+def detener(timeout: float | None = 10.0) -> None:
+    """Termina el hilo escritor después de vaciar la cola (se rearranca solo si hace falta)."""
+    global _hilo
+    with _lock:
+        hilo = _hilo
+    if hilo is None or not hilo.is_alive():
+        return
+    _cola.put(_FIN)
+    hilo.join(timeout)
+    with _lock:
+        if _hilo is hilo and not hilo.is_alive():
+            _hilo = None
+
+
+def enviar(fn, *args, agrupar: bool = True, **kwargs) -> Future:
+    """Encola fn(*args, **kwargs) para el hilo escritor y devuelve su Future."""
+    pedido = _Pedido(fn, args, kwargs, agrupar)
+    with _lock:
+        _stats["encoladas"] += 1
+    _arrancar()
+    _cola.put(pedido)
+    return pedido.futuro
+
+
+def _directo() -> bool:
+    """Casos en que la llamada no pasa por la cola."""
+    if not HABILITADO or _conexion is None or es_escritor():
+        return True
+    # El hilo ya tiene una transacción abierta: el escritor esperaría su bloqueo
+    with _conexion() as conn:
+        return conn.in_transaction
+
+
+def serializado(fn=None, *, agrupar: bool = True):
+    """
+    Decorador para las escrituras de database.py: la llamada se ejecuta en el
+    hilo escritor y el llamador espera su resultado (o recibe su excepción).
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _directo():
+                with _lock:
+                    _stats["directas"] += 1
+                return fn(*args, **kwargs)
+            return _esperar(enviar(fn, *args, agrupar=agrupar, **kwargs))
+
+        def en_cola(*args, **kwargs) -> Future:
+            if _directo():
+                futuro = Future()
+                try:
+                    futuro.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    futuro.set_exception(e)
+                return futuro
+            return enviar(fn, *args, agrupar=agrupar, **kwargs)
+
+        wrapper.en_cola = en_cola
+        return wrapper
+
+    return deco(fn) if fn is not None else deco
+
+
+def _esperar(futuro: Future):
+    """
+    Resultado del pedido. Pasado TIMEOUT_S: si todavía no empezó se cancela
+    (no se ejecutará) y se lanza TimeoutError; si ya está corriendo se espera
+    sin límite, porque su escritura se va a confirmar igual.
+    """
+    try:
+        return futuro.result(TIMEOUT_S)
+    except FuturoTimeout:
+        if futuro.cancel():
+            with _lock:
+                _stats["canceladas"] += 1
+            raise TimeoutError(
+                f"La escritura no empezó en {TIMEOUT_S:g} s; se canceló sin aplicarse."
+            ) from None
+    return futuro.result()
+
+
+# ---------------------------
+# Hilo escritor
+# ---------------------------
+def _es_busy(e: BaseException) -> bool:
+    # txn() convierte los errores de SQLite en AppError: se mira el mensaje
+    msg = str(e).lower()
+    return "database is locked" in msg or "database is busy" in msg
+
+
+def _espera(intento: int) -> float:
+    return min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** intento) * (0.5 + random.random())
+
+
+def _tomar(pedido) -> bool:
+    """Marca el pedido como en curso (ya no se puede cancelar). False si estaba cancelado."""
+    return pedido is _FIN or pedido.futuro.set_running_or_notify_cancel()
+
+
+def _bucle() -> None:
+    _local.escritor = True
+    siguiente = None
+    while True:
+        pedido = siguiente if siguiente is not None else _cola.get()
+        siguiente = None
+        if not _tomar(pedido):
+            continue  # el llamador lo canceló mientras esperaba en cola
+        if pedido is _FIN:
+            return
+        lote = [pedido]
+        if pedido.agrupar:
+            # group commit: todo lo que llegó mientras se confirmaba el lote anterior
+            while len(lote) < MAX_LOTE:
+                try:
+                    sig = _cola.get_nowait()
+                except queue.Empty:
+                    break
+                if sig is _FIN or not sig.agrupar:
+                    siguiente = sig  # va en la próxima vuelta, fuera de este lote
+                    break
+                if _tomar(sig):
+                    lote.append(sig)
+        try:
+            _ejecutar(lote)
+        except BaseException as e:  # el hilo no puede morir: el error va a los llamadores
+            for p in lote:
+                if not p.futuro.done():
+                    p.futuro.set_exception(e)
+
+
+def _ejecutar(lote: list) -> None:
+    for intento in range(MAX_REINTENTOS + 1):
+        if _preparar is not None:
+            _preparar()
+        for p in lote:
+            p.t_inicio = time.perf_counter()
+        try:
+            resultados = _lote_agrupado(lote) if lote[0].agrupar else _solo(lote[0])
+        except Exception as e:
+            if not _es_busy(e) or intento == MAX_REINTENTOS:
+                if _es_busy(e):
+                    with _lock:
+                        _stats["busy_agotados"] += 1
+                raise
+            with _lock:
+                _stats["reintentos"] += 1
+            time.sleep(_espera(intento))
+            continue
+        _entregar(lote, resultados)
+        return
+
+
+def _lote_agrupado(lote: list) -> list:
+    """Un BEGIN IMMEDIATE, un SAVEPOINT por pedido y un COMMIT. Devuelve [(valor, error)]."""
+    resultados = []
+    with _conexion() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for p in lote:
+                conn.execute("SAVEPOINT escritor_pedido")
+                try:
+                    valor = p.fn(*p.args, **p.kwargs)
+                except Exception as e:
+                    if _es_busy(e):
+                        raise
+                    conn.execute("ROLLBACK TO escritor_pedido")
+                    conn.execute("RELEASE escritor_pedido")
+                    resultados.append((None, e))
+                else:
+                    conn.execute("RELEASE escritor_pedido")
+                    resultados.append((valor, None))
+            conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+    return resultados
+
+
+def _solo(p) -> list:
+    """Pedido que maneja sus propias transacciones (agrupar=False)."""
+    try:
+        return [(p.fn(*p.args, **p.kwargs), None)]
+    except Exception as e:
+        if _es_busy(e):
+            raise
+        return [(None, e)]
+
+
+def _entregar(lote: list, resultados: list) -> None:
+    fin = time.perf_counter()
+    with _lock:
+        _stats["lotes"] += 1
+        _stats["max_lote"] = max(_stats["max_lote"], len(lote))
+        _lotes.append(len(lote))
+        for p, (_valor, error) in zip(lote, resultados):
+            _stats["fallidas" if error is not None else "completadas"] += 1
+            _muestras.append((fin, (p.t_inicio - p.t_encolado) * 1000, (fin - p.t_encolado) * 1000))
+    for p, (valor, error) in zip(lote, resultados):
+        if error is not None:
+            p.futuro.set_exception(error)
+        else:
+            p.futuro.set_result(valor)
+
+
+# ---------------------------
+# Métricas
+# ---------------------------
+def _percentil(orden: list[float], p: float) -> float:
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))] if orden else 0.0
+
+
+def estadisticas_escritor() -> dict:
+    """
+    Contadores, tamaño de cola y de lote, escrituras/s y percentiles de
+    latencia (espera en cola y total, en ms) sobre las últimas VENTANA llamadas.
+    """
+    with _lock:
+        stats = dict(_stats)
+        muestras = list(_muestras)
+        lotes = list(_lotes)
+    stats["en_cola"] = _cola.qsize()
+    stats["activo"] = _hilo is not None and _hilo.is_alive()
+    stats["lote_medio"] = round(sum(lotes) / len(lotes), 2) if lotes else 0.0
+    duracion = muestras[-1][0] - muestras[0][0] if len(muestras) > 1 else 0.0
+    stats["escrituras_por_s"] = round((len(muestras) - 1) / duracion, 1) if duracion > 0 else 0.0
+    for nombre, i in (("espera", 1), ("total", 2)):
+        orden = sorted(m[i] for m in muestras)
+        for p in (50, 95, 99):
+            stats[f"{nombre}_p{p}_ms"] = round(_percentil(orden, p), 3)
+    return stats
+
+
+def limpiar_estadisticas() -> None:
+    with _lock:
+        for k in _stats:
+            _stats[k] = 0
+        _muestras.clear()
+        _lotes.clear()
@@ -0,0 +1,233 @@
+# database_metricas.py
+"""
+Medición de las funciones de database.py: duración, filas devueltas y página
+que hizo la llamada.
+
+Desactivado (por defecto) el costo es un `if` por llamada. Activado:
+- cada llamada deja una muestra en una ventana circular por función, de la
+  que salen percentiles p50/p95/p99 (estadisticas_consultas);
+- se capturan las sentencias SQL ejecutadas (set_trace_callback, con los
+  parámetros ya expandidos) y, si la llamada supera UMBRAL_LENTO_MS, se
+  guardan en slow_queries junto con su EXPLAIN QUERY PLAN. El INSERT lo
+  hace el escritor único (database_escritor) sin que la llamada lo espere.
+
+Se activa con la variable de entorno ALMACEN_METRICAS=1 (umbral en
+ALMACEN_UMBRAL_LENTO_MS) o llamando a activar().
+"""
+import functools
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import pandas as pd
+
+from database_cache import invalidar
+from database_escritor import serializado
+from database_utils import txn
+
+ESQUEMA_SLOW_QUERIES = """
+CREATE TABLE IF NOT EXISTS slow_queries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha_hora TEXT NOT NULL,     -- ISO 'YYYY-MM-DD HH:MM:SS'
+    funcion TEXT NOT NULL,
+    pagina TEXT,
+    ms REAL NOT NULL,
+    filas INTEGER,
+    sql TEXT,                     -- sentencias ejecutadas (parámetros expandidos)
+    plan TEXT                     -- EXPLAIN QUERY PLAN de cada SELECT
+);
+CREATE INDEX IF NOT EXISTS idx_slow_fecha ON slow_queries(fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_slow_funcion ON slow_queries(funcion, ms);
+"""
+
+HABILITADO = os.environ.get("ALMACEN_METRICAS", "") == "1"
+UMBRAL_LENTO_MS = float(os.environ.get("ALMACEN_UMBRAL_LENTO_MS", "200"))
+VENTANA = 500  # muestras que se guardan por función
+
+_lock = threading.Lock()
+_local = threading.local()
+_muestras: dict[str, deque] = {}
+_conexion = None  # context manager de conexión (lo registra database.py)
+
+
+def usar_conexion(proveedor) -> None:
+    global _conexion
+    _conexion = proveedor
+
+
+def activar(umbral_ms: float | None = None) -> None:
+    global HABILITADO, UMBRAL_LENTO_MS
+    if umbral_ms is not None:
+        UMBRAL_LENTO_MS = float(umbral_ms)
+    HABILITADO = True
+
+
+def desactivar() -> None:
+    global HABILITADO
+    HABILITADO = False
+
+
+def fijar_pagina(pagina: str | None) -> None:
+    """Página que está renderizando este hilo (cada sesión de Streamlit tiene el suyo)."""
+    _local.pagina = pagina
+
+
+def _filas(resultado) -> int | None:
+    if isinstance(resultado, pd.DataFrame):
+        return len(resultado)
+    if isinstance(resultado, tuple) and resultado and isinstance(resultado[0], pd.DataFrame):
+        return len(resultado[0])  # (df, cursor/total)
+    if isinstance(resultado, (list, dict)):
+        return len(resultado)
+    if resultado is None:
+        return 0
+    return 1
+
+
+def _plan(conn, sentencias: list[str]) -> str:
+    partes = []
+    for sql in sentencias:
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        try:
+            detalle = [r[3] for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+        except Exception as e:  # p. ej. sentencia truncada
+            detalle = [f"(sin plan: {e})"]
+        partes.append("\n".join(detalle))
+    return "\n---\n".join(partes)
+
+
+def _guardar_lenta(conn, funcion, pagina, ms, filas, sentencias) -> None:
+    # El plan se lee aquí (con la conexión de la llamada); solo el INSERT va a
+    # la cola del escritor y no se espera: la sesión no pide el bloqueo.
+    fila = (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), funcion, pagina, round(ms, 3),
+            filas, ";\n".join(sentencias), _plan(conn, sentencias))
+    _insertar_lenta.en_cola(fila)
+
+
+@serializado
+def _insertar_lenta(fila: tuple) -> None:
+    with _conexion() as conn, txn(conn):
+        # invalidar: que otras conexiones no tomen este INSERT por una escritura externa
+        invalidar(conn, "slow_queries")
+        conn.execute(
+            """INSERT INTO slow_queries (fecha_hora, funcion, pagina, ms, filas, sql, plan)
+               VALUES (?,?,?,?,?,?,?)""",
+            fila,
+        )
+
+
+def medido(fn):
+    """Envuelve una función de database.py; sin efecto mientras HABILITADO sea False."""
+    nombre = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not HABILITADO or _conexion is None:
+            return fn(*args, **kwargs)
+        if getattr(_local, "sentencias", None) is not None:
+            # llamada anidada: la externa ya captura el SQL; aquí solo el tiempo
+            t0 = time.perf_counter()
+            resultado = fn(*args, **kwargs)
+            _registrar(nombre, (time.perf_counter() - t0) * 1000, _filas(resultado))
+            return resultado
+
+        with _conexion() as conn:
+            sentencias = _local.sentencias = []
+            conn.set_trace_callback(sentencias.append)
+            t0 = time.perf_counter()
+            try:
+                resultado = fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                conn.set_trace_callback(None)
+                _local.sentencias = None
+            filas = _filas(resultado)
+            _registrar(nombre, ms, filas)
+            if ms >= UMBRAL_LENTO_MS and sentencias:
+                try:
+                    _guardar_lenta(conn, nombre, getattr(_local, "pagina", None), ms, filas, sentencias)
+                except Exception:
+                    pass  # la métrica nunca debe romper la llamada
+        return resultado
+
+    return wrapper
+
+
+def _registrar(nombre: str, ms: float, filas) -> None:
+    muestra = (ms, filas, getattr(_local, "pagina", None))
+    with _lock:
+        d = _muestras.get(nombre)
+        if d is None:
+            d = _muestras[nombre] = deque(maxlen=VENTANA)
+        d.append(muestra)
+
+
+def instrumentar(espacio: dict, excluir=()) -> list[str]:
+    """
+    Reemplaza en `espacio` (globals() de database.py) cada función pública
+    definida en ese módulo por su versión medida. Devuelve los nombres.
+    """
+    modulo = espacio["__name__"]
+    nombres = []
+    for nombre, obj in list(espacio.items()):
+        if nombre.startswith("_") or nombre in excluir or not callable(obj):
+            continue
+        if getattr(obj, "__module__", None) != modulo or isinstance(obj, type):
+            continue
+        espacio[nombre] = medido(obj)
+        nombres.append(nombre)
+    return nombres
+
+
+def _percentil(orden: list[float], p: float) -> float:
+    return orden[min(len(orden) - 1, int(round(p / 100 * (len(orden) - 1))))]
+
+
+def estadisticas_consultas(por_pagina: bool = False) -> pd.DataFrame:
+    """Percentiles de la ventana en memoria, por función (y por página si se pide)."""
+    with _lock:
+        copia = {k: list(v) for k, v in _muestras.items()}
+    grupos: dict[tuple, list] = {}
+    for nombre, muestras in copia.items():
+        for ms, filas, pagina in muestras:
+            clave = (nombre, pagina) if por_pagina else (nombre,)
+            grupos.setdefault(clave, []).append((ms, filas))
+
+    filas_out = []
+    for clave, muestras in grupos.items():
+        tiempos = sorted(m[0] for m in muestras)
+        con_filas = [m[1] for m in muestras if m[1] is not None]
+        filas_out.append({
+            "funcion": clave[0],
+            **({"pagina": clave[1]} if por_pagina else {}),
+            "llamadas": len(tiempos),
+            "p50_ms": round(_percentil(tiempos, 50), 3),
+            "p95_ms": round(_percentil(tiempos, 95), 3),
+            "p99_ms": round(_percentil(tiempos, 99), 3),
+            "max_ms": round(tiempos[-1], 3),
+            "filas_media": round(sum(con_filas) / len(con_filas), 1) if con_filas else None,
+        })
+    cols = ["funcion"] + (["pagina"] if por_pagina else []) + \
+           ["llamadas", "p50_ms", "p95_ms", "p99_ms", "max_ms", "filas_media"]
+    return pd.DataFrame(filas_out, columns=cols).sort_values("p95_ms", ascending=False, ignore_index=True)
+
+
+def limpiar_metricas() -> None:
+    with _lock:
+        _muestras.clear()
+
+
+def consultas_lentas(limite: int = 50, funcion: str | None = None) -> pd.DataFrame:
+    """Últimas llamadas lentas guardadas (más recientes primero)."""
+    sql = "SELECT * FROM slow_queries"
+    params = []
+    if funcion:
+        sql += " WHERE funcion = ?"
+        params.append(funcion)
+    sql += " ORDER BY id DESC LIMIT ?"
+    params.append(int(limite))
+    with _conexion() as conn:
+        return pd.read_sql_query(sql, conn, params=params)
@@ -0,0 +1,195 @@
+# database_migraciones.py
+"""
+Migraciones de datos por conjuntos, en lotes y reanudables.
+
+En vez de traer filas a Python y actualizar una por una, las reglas de
+normalización (normalizacion.normalizar_salon_label, titlecase_nombre,
+validators.norm_salon) se registran como funciones SQLite y cada paso es un
+UPDATE sobre un rango de ids (PasoLote) o, si la regla tiene versión
+vectorizada (normalizacion.*_series), una lectura + UPDATE de las filas que
+cambian (PasoSerie). Cada lote se confirma por separado (el bloqueo de
+escritura dura solo ese lote) y deja anotado hasta qué id llegó en
+migraciones_progreso: si el proceso se interrumpe, la siguiente ejecución
+continúa desde ahí.
+"""
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+import pandas as pd
+
+from database_cache import invalidar
+from database_utils import txn
+from normalizacion import normalizar_salon_label, titlecase_nombre
+from validators import norm_salon
+
+TAM_LOTE = 5000
+
+ESQUEMA_MIGRACIONES = """
+CREATE TABLE IF NOT EXISTS migraciones_progreso (
+    version INTEGER NOT NULL,
+    paso TEXT NOT NULL,
+    ultimo_id INTEGER NOT NULL DEFAULT 0,   -- lotes confirmados hasta este id
+    filas INTEGER NOT NULL DEFAULT 0,       -- filas modificadas
+    lotes INTEGER NOT NULL DEFAULT 0,
+    ms REAL NOT NULL DEFAULT 0,             -- tiempo acumulado (incluye reanudaciones)
+    terminado INTEGER NOT NULL DEFAULT 0,
+    actualizado TEXT,
+    PRIMARY KEY (version, paso)
+);
+"""
+
+# Funciones Python disponibles en SQL durante las migraciones
+FUNCIONES_SQL = {
+    "normalizar_salon_label": normalizar_salon_label,
+    "titlecase_nombre": titlecase_nombre,
+    "norm_salon": norm_salon,
+}
+
+
+def registrar_funciones(conn) -> None:
+    for nombre, fn in FUNCIONES_SQL.items():
+        conn.create_function(nombre, 1, fn, deterministic=True)
+
+
+@dataclass(frozen=True)
+class PasoLote:
+    """
+    UPDATE por lotes: columna = expr, solo donde el resultado no es NULL ni
+    vacío y cambia el valor. `expr` usa {col} para referirse a la columna,
+    p. ej. "normalizar_salon_label({col})". `filtro` (opcional, también con
+    {col}) limita las filas candidatas, p. ej. para saltar valores que ya
+    están en la forma final.
+    """
+    nombre: str
+    tabla: str
+    columna: str
+    expr: str
+    filtro: str = ""
+
+    def sql(self) -> str:
+        nuevo = self.expr.format(col=self.columna)
+        extra = f"AND ({self.filtro.format(col=self.columna)}) " if self.filtro else ""
+        return (
+            f"UPDATE {self.tabla} SET {self.columna} = {nuevo} "
+            f"WHERE id > :desde AND id <= :hasta {extra}"
+            f"AND {nuevo} <> '' AND {nuevo} IS NOT {self.columna}"
+        )
+
+    def aplicar(self, conn, desde: int, hasta: int) -> int:
+        return conn.execute(self.sql(), {"desde": desde, "hasta": hasta}).rowcount
+
+
+@dataclass(frozen=True)
+class PasoSerie:
+    """
+    Como PasoLote, pero la regla es una función pd.Series -> pd.Series
+    (p. ej. normalizacion.normalizar_salon_series): cada lote se lee, se
+    normaliza de una vez (por valores distintos) y se escriben solo las filas
+    cuyo resultado no es vacío y cambia.
+    """
+    nombre: str
+    tabla: str
+    columna: str
+    fn: Callable[[pd.Series], pd.Series]
+    filtro: str = ""
+
+    def aplicar(self, conn, desde: int, hasta: int) -> int:
+        extra = f"AND ({self.filtro.format(col=self.columna)})" if self.filtro else ""
+        filas = conn.execute(
+            f"SELECT id, {self.columna} FROM {self.tabla} WHERE id > ? AND id <= ? {extra}",
+            (desde, hasta),
+        ).fetchall()
+        if not filas:
+            return 0
+        viejos = [f[1] for f in filas]
+        nuevos = self.fn(pd.Series(viejos, dtype=object)).tolist()
+        cambios = [(n, f[0]) for f, v, n in zip(filas, viejos, nuevos) if n and n != v]
+        conn.executemany(f"UPDATE {self.tabla} SET {self.columna} = ? WHERE id = ?", cambios)
+        return len(cambios)
+
+
+def _progreso(conn, version: int, paso: str):
+    return conn.execute(
+        "SELECT ultimo_id, terminado FROM migraciones_progreso WHERE version=? AND paso=?",
+        (version, paso),
+    ).fetchone()
+
+
+def _anotar(conn, version: int, paso: str, ultimo_id: int, filas: int, ms: float,
+            terminado: bool = False) -> None:
+    conn.execute(
+        """INSERT INTO migraciones_progreso
+               (version, paso, ultimo_id, filas, lotes, ms, terminado, actualizado)
+           VALUES (?,?,?,?,1,?,?,?)
+           ON CONFLICT(version, paso) DO UPDATE SET
+               ultimo_id = excluded.ultimo_id,
+               filas = filas + excluded.filas,
+               lotes = lotes + 1,
+               ms = ms + excluded.ms,
+               terminado = excluded.terminado,
+               actualizado = excluded.actualizado""",
+        (version, paso, ultimo_id, filas, ms, int(terminado),
+         datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+    )
+
+
+def _correr_lotes(conn, version: int, tablas, paso, tam_lote: int) -> dict:
+    fila = _progreso(conn, version, paso.nombre)
+    desde = fila["ultimo_id"] if fila else 0
+    maximo = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {paso.tabla}").fetchone()[0]
+    filas = lotes = 0
+    t_paso = time.perf_counter()
+    while True:
+        hasta = min(desde + tam_lote, maximo)
+        t0 = time.perf_counter()
+        with txn(conn):
+            invalidar(conn, *tablas)
+            n = paso.aplicar(conn, desde, hasta)
+            _anotar(conn, version, paso.nombre, hasta, n,
+                    (time.perf_counter() - t0) * 1000, terminado=hasta >= maximo)
+        filas += n
+        lotes += 1
+        desde = hasta
+        if desde >= maximo:
+            break
+    return {"filas": filas, "lotes": lotes, "ms": (time.perf_counter() - t_paso) * 1000}
+
+
+def _correr_funcion(conn, version: int, tablas, nombre: str, fn) -> dict:
+    t0 = time.perf_counter()
+    with txn(conn):
+        invalidar(conn, *tablas)
+        fn(conn)
+        _anotar(conn, version, nombre, 0, 0, (time.perf_counter() - t0) * 1000, terminado=True)
+    return {"filas": None, "lotes": 1, "ms": (time.perf_counter() - t0) * 1000}
+
+
+def aplicar_migraciones(conn, migraciones, version_actual: int, tam_lote: int = TAM_LOTE) -> list[dict]:
+    """
+    Aplica las migraciones con versión > version_actual, en orden.
+    `migraciones` es una lista de (versión, tablas_a_invalidar, pasos), donde
+    cada paso es un PasoLote/PasoSerie o una función fn(conn) que corre en una sola
+    transacción. Al terminar todos los pasos de una versión se fija
+    PRAGMA user_version. Devuelve el tiempo de cada paso ejecutado.
+    """
+    registrar_funciones(conn)
+    reporte = []
+    for version, tablas, pasos in migraciones:
+        if version <= version_actual:
+            continue
+        for paso in pasos:
+            por_lotes = isinstance(paso, (PasoLote, PasoSerie))
+            nombre = paso.nombre if por_lotes else paso.__name__
+            fila = _progreso(conn, version, nombre)
+            if fila and fila["terminado"]:
+                continue  # quedó hecho en una ejecución interrumpida
+            if por_lotes:
+                r = _correr_lotes(conn, version, tablas, paso, tam_lote)
+            else:
+                r = _correr_funcion(conn, version, tablas, nombre, paso)
+            reporte.append({"version": version, "paso": nombre, **r})
+        with txn(conn):
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+    return reporte
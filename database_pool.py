@@ -0,0 +1,180 @@
+# database_pool.py
+"""
+Pool de conexiones SQLite: una conexión afinada por hilo.
+
+Cada sesión de Streamlit corre en su propio hilo; en vez de abrir/cerrar una
+conexión por llamada, el hilo reutiliza la suya. Cuando el hilo termina, su
+conexión vuelve a una lista de libres para que el siguiente hilo la recicle.
+"""
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+# PRAGMAs que se aplican UNA vez al crear la conexión (no en cada llamada)
+PRAGMAS_CONEXION = (
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA journal_mode = WAL",        # lectores no bloquean al escritor
+    "PRAGMA synchronous = NORMAL",      # seguro con WAL, menos fsync
+    "PRAGMA busy_timeout = 5000",       # espera hasta 5 s si la BD está ocupada
+    "PRAGMA cache_size = -16000",       # ~16 MB de caché de páginas
+    "PRAGMA mmap_size = 134217728",     # 128 MB mapeados en memoria
+    "PRAGMA temp_store = MEMORY",
+)
+
+MAX_LIBRES = 8  # conexiones ociosas que se guardan para reciclar
+
+_lock = threading.RLock()
+_local = threading.local()
+_libres: dict[str, list[sqlite3.Connection]] = {}
+_vivas: "weakref.WeakSet[_ConexionHilo]" = weakref.WeakSet()
+_stats = {
+    "creadas": 0,        # conexiones nuevas abiertas
+    "recicladas": 0,     # tomadas de la lista de libres
+    "reutilizadas": 0,   # checkouts servidos por la conexión del hilo
+    "cerradas": 0,
+    "ms_apertura": 0.0,  # tiempo total gastado abriendo conexiones
+}
+
+
+def crear_conexion(ruta: str) -> sqlite3.Connection:
+    """Abre una conexión nueva con los PRAGMAs de rendimiento aplicados."""
+    t0 = time.perf_counter()
+    conn = sqlite3.connect(ruta, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS_CONEXION:
+        conn.execute(pragma)
+    with _lock:
+        _stats["creadas"] += 1
+        _stats["ms_apertura"] += (time.perf_counter() - t0) * 1000
+    return conn
+
+
+def _cerrar(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+    with _lock:
+        _stats["cerradas"] += 1
+
+
+def _esta_abierta(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.total_changes  # lanza ProgrammingError si está cerrada
+        return True
+    except sqlite3.ProgrammingError:
+        return False
+
+
+class _ConexionHilo:
+    """Conexión de un hilo + profundidad de uso (para contextos anidados)."""
+
+    __slots__ = ("ruta", "conn", "profundidad", "__weakref__")
+
+    def __init__(self, ruta: str, conn: sqlite3.Connection):
+        self.ruta = ruta
+        self.conn = conn
+        self.profundidad = 0
+
+    def liberar(self) -> None:
+        """Devuelve la conexión a la lista de libres (o la cierra si sobra)."""
+        conn, self.conn = self.conn, None
+        if conn is None or not _esta_abierta(conn):
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        with _lock:
+            libres = _libres.setdefault(self.ruta, [])
+            if len(libres) < MAX_LIBRES:
+                libres.append(conn)
+                return
+        _cerrar(conn)
+
+    def __del__(self):
+        # El hilo terminó: su threading.local se destruye y la conexión se recicla
+        try:
+            self.liberar()
+        except Exception:
+            pass
+
+
+def _holder(ruta: str) -> _ConexionHilo:
+    por_ruta = getattr(_local, "por_ruta", None)
+    if por_ruta is None:
+        por_ruta = _local.por_ruta = {}
+
+    h = por_ruta.get(ruta)
+    if h is not None and h.conn is not None and _esta_abierta(h.conn):
+        with _lock:
+            _stats["reutilizadas"] += 1
+        return h
+
+    conn = None
+    with _lock:
+        libres = _libres.get(ruta)
+        if libres:
+            conn = libres.pop()
+            _stats["recicladas"] += 1
+    if conn is None:
+        conn = crear_conexion(ruta)
+
+    h = _ConexionHilo(ruta, conn)
+    por_ruta[ruta] = h
+    with _lock:
+        _vivas.add(h)
+    return h
+
+
+@contextmanager
+def conexion(ruta: str):
+    """
+    Entrega la conexión del hilo actual. Se puede anidar y combinar con
+    database_utils.txn:
+
+        with conexion(RUTA_BD) as conn, txn(conn):
+            conn.execute(...)
+
+    Al salir del contexto más externo, si quedó una transacción abierta se
+    confirma (o se revierte si hubo excepción) para no retener el bloqueo.
+    """
+    h = _holder(ruta)
+    conn = h.conn
+    h.profundidad += 1
+    try:
+        yield conn
+    except BaseException:
+        if h.profundidad == 1 and conn.in_transaction:
+            conn.rollback()
+        raise
+    else:
+        if h.profundidad == 1 and conn.in_transaction:
+            conn.commit()
+    finally:
+        h.profundidad -= 1
+
+
+def cerrar_conexiones() -> None:
+    """Cierra todas las conexiones (activas y libres). Útil en tests/apagado."""
+    with _lock:
+        vivas = list(_vivas)
+        libres = [c for lst in _libres.values() for c in lst]
+        _libres.clear()
+    for h in vivas:
+        conn, h.conn = h.conn, None
+        if conn is not None:
+            _cerrar(conn)
+    for conn in libres:
+        _cerrar(conn)
+
+
+def estadisticas_pool() -> dict:
+    """Contadores del pool: creadas, recicladas, reutilizadas, activas, libres..."""
+    with _lock:
+        stats = dict(_stats)
+        stats["activas"] = sum(1 for h in _vivas if h.conn is not None)
+        stats["libres"] = sum(len(v) for v in _libres.values())
+    total = stats["creadas"] + stats["recicladas"] + stats["reutilizadas"]
+    stats["tasa_reuso"] = round((stats["recicladas"] + stats["reutilizadas"]) / total, 3) if total else 0.0
+    return stats
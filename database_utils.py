@@ -1,20 +1,37 @@
 # database_utils.py
+import itertools
 import sqlite3
 from contextlib import contextmanager
 from errors import AppError, ValidationError, ConflictError, NotFoundError, IntegrityError
 
+_savepoints = itertools.count(1)
+
+def _deshacer(conn, savepoint):
+    if savepoint:
+        conn.execute(f"ROLLBACK TO {savepoint}")
+        conn.execute(f"RELEASE {savepoint}")
+    else:
+        conn.rollback()
+
 @contextmanager
 def txn(conn):
+    # Si la conexión (del pool) ya está en una transacción, anidamos con SAVEPOINT
+    # para no confirmar a medias la transacción externa.
+    savepoint = f"sp_{next(_savepoints)}" if conn.in_transaction else None
+    conn.execute(f"SAVEPOINT {savepoint}" if savepoint else "BEGIN IMMEDIATE")
     try:
         yield
-        conn.commit()
+        if savepoint:
+            conn.execute(f"RELEASE {savepoint}")
+        else:
+            conn.commit()
     except sqlite3.IntegrityError as e:
-        conn.rollback()
+        _deshacer(conn, savepoint)
         # constraints UNIQUE, CHECK, FK
         raise IntegrityError(str(e))
     except AppError:
-        conn.rollback()
+        _deshacer(conn, savepoint)
         raise
     except Exception as e:
-        conn.rollback()
+        _deshacer(conn, savepoint)
         raise AppError(str(e))
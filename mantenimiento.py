@@ -0,0 +1,85 @@
+# mantenimiento.py
+"""
+Tareas de mantenimiento de las tablas derivadas.
+
+    python mantenimiento.py reconstruir-diario
+    python mantenimiento.py conciliar-diario [--desde 2025-01-01] [--hasta 2025-06-30]
+    python mantenimiento.py reconstruir-resumen
+    python mantenimiento.py conciliar-resumen
+    python mantenimiento.py purgar-cambios [--conservar 200000]
+
+conciliar-* sale con código 1 si la tabla derivada no cuadra con los datos
+crudos (y muestra las diferencias); se arregla con reconstruir-*.
+"""
+import argparse
+import sys
+import time
+
+import database
+import database_cambios
+
+
+def _reconstruir_diario(args) -> int:
+    t0 = time.perf_counter()
+    n = database.reconstruir_llaves_diario()
+    print(f"llaves_diario: {n} grupos en {time.perf_counter() - t0:.2f} s")
+    return 0
+
+
+def _conciliar_diario(args) -> int:
+    difs = database.conciliar_llaves_diario(args.desde, args.hasta)
+    if difs.empty:
+        print("llaves_diario cuadra con llaves.")
+        return 0
+    print(f"llaves_diario: {len(difs)} grupo(s) no cuadran")
+    print(difs.head(50).to_string(index=False))
+    return 1
+
+
+def _reconstruir_resumen(args) -> int:
+    t0 = time.perf_counter()
+    n = database.reconstruir_inventario_resumen()
+    print(f"inventario_resumen: {n} grupos en {time.perf_counter() - t0:.2f} s")
+    return 0
+
+
+def _conciliar_resumen(args) -> int:
+    difs = database.conciliar_inventario_resumen()
+    if difs.empty:
+        print("inventario_resumen cuadra con inventario.")
+        return 0
+    print(f"inventario_resumen: {len(difs)} grupo(s) no cuadran")
+    print(difs.head(50).to_string(index=False))
+    return 1
+
+
+def _purgar_cambios(args) -> int:
+    n = database.purgar_cambios(args.conservar)
+    print(f"cambios: {n} entrada(s) borradas (última secuencia {database.ultima_secuencia()})")
+    return 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--bd", help="ruta de la BD (por defecto database.RUTA_BD)")
+    sub = ap.add_subparsers(dest="tarea", required=True)
+    sub.add_parser("reconstruir-diario", help="backfill de llaves_diario").set_defaults(fn=_reconstruir_diario)
+    p = sub.add_parser("conciliar-diario", help="compara llaves_diario con llaves")
+    p.add_argument("--desde")
+    p.add_argument("--hasta")
+    p.set_defaults(fn=_conciliar_diario)
+    sub.add_parser("reconstruir-resumen", help="backfill de inventario_resumen").set_defaults(fn=_reconstruir_resumen)
+    sub.add_parser("conciliar-resumen", help="compara inventario_resumen con inventario").set_defaults(fn=_conciliar_resumen)
+    p = sub.add_parser("purgar-cambios", help="deja solo las últimas entradas del registro de cambios")
+    p.add_argument("--conservar", type=int, default=database_cambios.CONSERVAR)
+    p.set_defaults(fn=_purgar_cambios)
+    args = ap.parse_args()
+
+    if args.bd:
+        database.RUTA_BD = args.bd
+    database.ensure_db()
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# normalizacion.py
+"""
+Normalización de texto (nombres y salones) en un solo lugar.
+
+Las funciones escalares están memoizadas con un LRU acotado: en migraciones e
+importaciones se repiten pocos valores distintos muchas veces. Para columnas
+completas están las versiones *_series, que hacen el mismo trabajo con los
+métodos .str de pandas y deben dar exactamente el mismo resultado que la
+escalar; las migraciones las usan por lotes (database_migraciones.PasoSerie).
+Todas son idempotentes: f(f(x)) == f(x), así que reaplicarlas sobre datos
+ya normalizados no los cambia. Ambas cosas las comprueban
+tests/test_normalizacion.py y `python -m benchmarks.normalizacion`.
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+TAM_CACHE = 4096
+
+_ESPACIOS = re.compile(r"\s+")
+# Patrón típico de sala: 7, 316, 303-F, 7A, 3-204, 316F, etc.
+_NUCLEO_SALA = re.compile(r"([A-Z]?\s*\d+(?:\s*-\s*\d+)?(?:\s*[A-Z])?(?:\s*-\s*[A-Z])?)", re.I)
+# Prefijo de una etiqueta ya normalizada ('Sala 7', 'Salón 303-F'): se quita
+# antes de buscar el núcleo, si no 'Sala 7' daría 'Sala A7'
+_PREFIJO_SALA = re.compile(r"^(?:sala|sal[oó]n)(?:\s+|$)", re.I)
+# Inicio de cada palabra (tras inicio o espacio simple, ya normalizado)
+_INICIO_PALABRA = re.compile(r"(^| )(\S)")
+
+_BODEGA = {"bodega", "la bodega"}
+_CONECTORES = {"de", "del", "la", "las", "los", "y", "e", "da", "do"}
+_CONECTOR_RE = re.compile(r" (" + "|".join(sorted(_CONECTORES)) + r")(?= |$)", re.I)
+
+
+def normalizar_espacios(s: str | None) -> str:
+    """Quita espacios extra y normaliza a un único espacio."""
+    return _ESPACIOS.sub(" ", (s or "").strip())
+
+
+@lru_cache(maxsize=TAM_CACHE)
+def titlecase_nombre(s: str | None) -> str:
+    """
+    Pone mayúscula inicial en cada palabra, respetando conectores comunes.
+    Ej: 'ana maría de la cruz' -> 'Ana María de la Cruz'
+    """
+    s = normalizar_espacios(s)
+    if not s:
+        return s
+    out = []
+    for i, p in enumerate(s.lower().split(" ")):
+        if p in _CONECTORES and i != 0:
+            out.append(p)
+        else:
+            out.append(p[:1].upper() + p[1:])
+    return " ".join(out)
+
+
+@lru_cache(maxsize=TAM_CACHE)
+def normalizar_salon_label(texto: str | None) -> str:
+    """
+    '7', 'sala 316 f', 'Salón 303-F' -> 'Sala 7', 'Sala 316F', 'Sala 303-F'; bodega -> 'BODEGA'.
+    Idempotente: aplicada a su propia salida la devuelve igual.
+    """
+    t = normalizar_espacios(texto)
+    if not t:
+        return ""
+    if t.lower() in _BODEGA:
+        return "BODEGA"
+
+    t = _PREFIJO_SALA.sub("", t)
+    # si no encuentra el patrón, usa todo el texto como núcleo
+    m = _NUCLEO_SALA.search(t)
+    core = m.group(1) if m else t
+    core = _ESPACIOS.sub("", core).upper()    # "316 F" -> "316F", "303 - F" -> "303-F"
+    core = core.replace("SALON", "").replace("SALA", "")
+    core = core.strip("- ")
+
+    return f"Sala {core}" if core else "Sala"
+
+
+# ---------------------------
+# Versiones vectorizadas
+# ---------------------------
+def _por_unicos(s: pd.Series, fn) -> pd.Series:
+    """
+    Aplica `fn` (Series -> Series, ya con espacios normalizados) a los valores
+    distintos y reparte el resultado: en columnas reales se repiten mucho.
+    NaN/None se tratan como "" (igual que la escalar con None).
+    """
+    codigos, unicos = pd.factorize(s.astype(object).where(s.notna(), ""))
+    t = pd.Series(unicos, dtype=object).astype(str).str.strip().str.replace(_ESPACIOS, " ", regex=True)
+    out = fn(t).to_numpy()
+    return pd.Series(out.take(codigos) if len(codigos) else out[:0], index=s.index, dtype=object)
+
+
+def titlecase_series(s: pd.Series) -> pd.Series:
+    """titlecase_nombre sobre una columna completa."""
+    return _por_unicos(s, _titlecase_unicos)
+
+
+def _titlecase_unicos(t: pd.Series) -> pd.Series:
+    t = t.str.lower()
+    t = t.str.replace(_INICIO_PALABRA, lambda m: m.group(1) + m.group(2).upper(), regex=True)
+    # conectores en minúscula salvo en la primera palabra (el patrón exige espacio antes)
+    return t.str.replace(_CONECTOR_RE, lambda m: m.group(0).lower(), regex=True)
+
+
+def normalizar_salon_series(s: pd.Series) -> pd.Series:
+    """normalizar_salon_label sobre una columna completa."""
+    return _por_unicos(s, _salon_unicos)
+
+
+def _salon_unicos(t: pd.Series) -> pd.Series:
+    resto = t.str.replace(_PREFIJO_SALA, "", regex=True)
+    core = resto.str.extract(_NUCLEO_SALA, expand=False)
+    core = core.where(core.notna(), resto)
+    core = (core.str.replace(_ESPACIOS, "", regex=True).str.upper()
+                .str.replace("SALON", "", regex=False).str.replace("SALA", "", regex=False)
+                .str.strip("- "))
+    out = ("Sala " + core).where(core != "", "Sala")
+    out = out.where(~t.str.lower().isin(_BODEGA), "BODEGA")
+    return out.where(t != "", "")
@@ -9,8 +9,12 @@ class Result:
     error: Optional[str] = None
     msg: Optional[str] = None
 
+    @property
+    def value(self) -> Any:
+        return self.data
+
 def OK(value: Any = None, msg: str | None = None) -> Result:
-    return Result(ok=True, value=value, msg=msg)
+    return Result(ok=True, data=value, msg=msg)
 
 def ERR(error: str) -> Result:
     return Result(ok=False, error=error)
\ No newline at end of file
@@ -0,0 +1,78 @@
+# presupuesto_import.py
+"""
+Presupuesto de tiempo de importación del armazón (main_v3) y de cada página.
+
+    python presupuesto_import.py [--repeticiones 3]
+
+Cada caso corre en un proceso nuevo con `python -X importtime`. Para las
+páginas se importa antes lo que ya cargó el armazón, así se mide solo lo que
+agrega la página al seleccionarla. Se toma el mínimo de varias corridas y se
+compara contra PRESUPUESTO_MS; sale con código 1 si algún caso se pasa.
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent
+
+# Lo que importa main_v3 antes de despachar a una página
+ARMAZON = ["streamlit", "streamlit_option_menu", "auth", "database", "ui.theme"]
+
+PRESUPUESTO_MS = {
+    "armazon": 2500,
+    "ui.pages.dashboard": 800,     # altair
+    "ui.pages.registrar": 100,
+    "ui.pages.activas": 100,
+    "ui.pages.historial": 100,
+    "ui.pages.stats": 800,         # altair
+    "ui.pages.inventario": 200,    # services.importacion
+    "ui.pages.inv_salon": 100,
+    "ui.pages.mov_equipos": 100,
+}
+
+
+def _importtime(codigo: str) -> list[tuple[int, str]]:
+    """[(acumulado_us, módulo)] de las líneas de -X importtime (módulo con sangría)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=RAIZ, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    filas = []
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, modulo = linea[len("import time:"):].split("|", 2)
+        filas.append((int(acumulado), modulo[1:]))  # quita el espacio separador
+    return filas
+
+
+def medir(caso: str) -> float:
+    """Milisegundos de importación del caso ('armazon' o un módulo de página)."""
+    if caso == "armazon":
+        filas = _importtime("import " + ", ".join(ARMAZON))
+        # solo las importaciones de primer nivel (sin sangría): no se cuentan dos veces
+        return sum(us for us, mod in filas if not mod.startswith(" ")) / 1000
+    filas = _importtime(f"import {', '.join(ARMAZON)}; import {caso}")
+    return next(us for us, mod in filas if mod.strip() == caso) / 1000
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeticiones", type=int, default=3)
+    args = ap.parse_args()
+
+    excedidos = 0
+    print(f"{'caso':<24}{'ms':>9}{'presupuesto':>13}")
+    for caso, limite in PRESUPUESTO_MS.items():
+        ms = min(medir(caso) for _ in range(args.repeticiones))
+        marca = "" if ms <= limite else "  EXCEDIDO"
+        excedidos += bool(marca)
+        print(f"{caso:<24}{ms:>9.1f}{limite:>13}{marca}")
+    return 1 if excedidos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
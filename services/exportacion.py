@@ -0,0 +1,110 @@
+# services/exportacion.py
+"""
+Exportes CSV/XLSX escritos directo desde un cursor SQL.
+
+Las filas se leen por bloques (fetchmany) y se escriben a medida que llegan:
+no se arma un DataFrame ni el archivo completo en memoria. El XLSX usa
+xlsxwriter en modo constant_memory (cada fila se vuelca a un temporal al
+escribirse). La consulta es un (sql, params) de las funciones
+database.consulta_exportar_*; el archivo se genera solo cuando se pide.
+"""
+import csv
+import io
+import re
+import tempfile
+
+from database import conexion
+
+TAM_BLOQUE = 5000
+EN_MEMORIA_MAX = 8 * 1024 * 1024  # el temporal pasa a disco por encima de esto
+MIME = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+_HOJA_INVALIDA = re.compile(r"[\[\]:*?/\\]")
+
+
+def filas_por_bloques(consulta: tuple[str, list], tam_bloque: int = TAM_BLOQUE):
+    """Genera primero los nombres de columna y luego listas de hasta tam_bloque filas."""
+    sql, params = consulta
+    with conexion() as conn:
+        cur = conn.execute(sql, params)
+        yield [d[0] for d in cur.description]
+        while True:
+            bloque = cur.fetchmany(tam_bloque)
+            if not bloque:
+                break
+            yield [tuple(f) for f in bloque]
+
+
+def contar_filas(consulta: tuple[str, list]) -> int:
+    """Filas que devolverá la consulta (para informar progreso)."""
+    sql, params = consulta
+    with conexion() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+
+def escribir_csv(consulta: tuple[str, list], destino, tam_bloque: int = TAM_BLOQUE,
+                 al_avanzar=None) -> int:
+    """
+    Escribe el CSV (utf-8) en `destino` (archivo binario). Devuelve filas
+    escritas; `al_avanzar(n)` se llama tras cada bloque con las filas hasta ahí.
+    """
+    bloques = filas_por_bloques(consulta, tam_bloque)
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(next(bloques))
+    n = 0
+    for bloque in bloques:
+        w.writerows(bloque)
+        n += len(bloque)
+        destino.write(buf.getvalue().encode("utf-8"))
+        buf.seek(0)
+        buf.truncate()
+        if al_avanzar:
+            al_avanzar(n)
+    destino.write(buf.getvalue().encode("utf-8"))  # encabezado si no hubo filas
+    return n
+
+
+def nombre_hoja(nombre: str) -> str:
+    """Excel: máximo 31 caracteres y sin []:*?/\\."""
+    return _HOJA_INVALIDA.sub("_", nombre)[:31] or "Datos"
+
+
+def escribir_xlsx(consulta: tuple[str, list], destino, hoja: str = "Datos",
+                  tam_bloque: int = TAM_BLOQUE, al_avanzar=None) -> int:
+    """Escribe el XLSX en `destino` (ruta o archivo binario). Devuelve filas escritas."""
+    import xlsxwriter  # opcional: solo hace falta para exportar XLSX
+
+    libro = xlsxwriter.Workbook(destino, {"constant_memory": True})
+    try:
+        ws = libro.add_worksheet(nombre_hoja(hoja))
+        bloques = filas_por_bloques(consulta, tam_bloque)
+        ws.write_row(0, 0, next(bloques), libro.add_format({"bold": True}))
+        n = 0
+        for bloque in bloques:
+            for fila in bloque:
+                n += 1
+                ws.write_row(n, 0, fila)
+            if al_avanzar:
+                al_avanzar(n)
+    finally:
+        libro.close()
+    return n
+
+
+def exportar(consulta: tuple[str, list], formato: str = "csv", hoja: str = "Datos"):
+    """
+    Genera el archivo en un temporal (en memoria hasta EN_MEMORIA_MAX, luego
+    en disco) y lo devuelve posicionado al inicio, listo para st.download_button.
+    """
+    tmp = tempfile.SpooledTemporaryFile(max_size=EN_MEMORIA_MAX)
+    if formato == "csv":
+        escribir_csv(consulta, tmp)
+    elif formato == "xlsx":
+        escribir_xlsx(consulta, tmp, hoja)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    tmp.seek(0)
+    return tmp
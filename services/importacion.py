@@ -0,0 +1,140 @@
+# services/importacion.py
+"""
+Carga masiva de inventario desde CSV/XLSX por bloques.
+
+El archivo nunca se carga completo: se lee en bloques de TAM_BLOQUE filas,
+cada bloque se normaliza/valida con operaciones vectorizadas de pandas y
+database.importar_inventario lo deja en staging para insertarlo todo en una
+sola transacción.
+"""
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from errors import ValidationError
+from validators import CATEGORIAS_VALIDAS, ESTADOS_VALIDOS
+from database import importar_inventario, COLUMNAS_IMPORTACION
+
+TAM_BLOQUE = 5000
+REQUERIDAS = ["nombre", "tipo", "estado", "salon", "responsable", "fecha_registro"]
+ALIAS = {"nombre equipo": "nombre", "equipo": "nombre", "ubicación": "salon", "salón": "salon"}
+
+# Mapas insensibles a mayúsculas -> valor canónico ("en uso" -> "En uso")
+_TIPOS = {c.lower(): c for c in CATEGORIAS_VALIDAS}
+_ESTADOS = {e.lower(): e for e in ESTADOS_VALIDOS}
+
+
+@dataclass
+class ReporteImportacion:
+    total: int = 0
+    insertadas: int = 0
+    errores: pd.DataFrame = field(default_factory=lambda: pd.DataFrame(columns=["fila", "placa", "error"]))
+
+    @property
+    def ok(self) -> bool:
+        return self.errores.empty
+
+
+def _normalizar_encabezados(cols) -> list[str]:
+    out = [str(c).strip().lower() for c in cols]
+    return [ALIAS.get(c, c) for c in out]
+
+
+def leer_en_bloques(archivo, nombre_archivo: str, sep: str = ",", tam_bloque: int = TAM_BLOQUE):
+    """Genera DataFrames de hasta `tam_bloque` filas con encabezados normalizados."""
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+
+    if nombre_archivo.lower().endswith(".xlsx"):
+        from openpyxl import load_workbook  # lo usa pandas.read_excel para xlsx
+        wb = load_workbook(archivo, read_only=True, data_only=True)
+        try:
+            filas = wb.active.iter_rows(values_only=True)
+            encabezado = _normalizar_encabezados(next(filas, ()))
+            buf = []
+            for fila in filas:
+                if fila is None or all(v is None for v in fila):
+                    continue
+                buf.append(fila)
+                if len(buf) >= tam_bloque:
+                    yield pd.DataFrame(buf, columns=encabezado)
+                    buf = []
+            if buf:
+                yield pd.DataFrame(buf, columns=encabezado)
+        finally:
+            wb.close()
+    else:
+        for df in pd.read_csv(archivo, sep=sep, chunksize=tam_bloque, dtype=str, keep_default_na=False):
+            df.columns = _normalizar_encabezados(df.columns)
+            yield df
+
+
+def _texto(s: pd.Series) -> pd.Series:
+    return s.astype(object).where(s.notna(), "").astype(str).str.strip()
+
+
+def validar_bloque(df: pd.DataFrame, primera_fila: int, placas_vistas: set) -> pd.DataFrame:
+    """
+    Normaliza un bloque y anota en 'error' el primer problema de cada fila.
+    `primera_fila` es el nº de fila del archivo de la primera fila del bloque
+    (la fila 1 es el encabezado). `placas_vistas` acumula placas entre bloques.
+    """
+    faltantes = [c for c in REQUERIDAS if c not in df.columns]
+    if faltantes:
+        raise ValidationError(f"Faltan columnas obligatorias: {faltantes}")
+
+    out = pd.DataFrame({"fila": range(primera_fila, primera_fila + len(df))})
+    out["nombre"] = _texto(df["nombre"]).values
+    out["tipo"] = _texto(df["tipo"]).str.lower().map(_TIPOS).values
+    out["estado"] = _texto(df["estado"]).str.lower().map(_ESTADOS).values
+    salon = _texto(df["salon"]).str.upper()
+    out["salon"] = salon.where(salon != "", "BODEGA").values
+    out["responsable"] = _texto(df["responsable"]).values
+    fechas = pd.to_datetime(df["fecha_registro"].replace("", None), errors="coerce")
+    out["fecha_registro"] = fechas.dt.strftime("%Y-%m-%d %H:%M:%S").values
+    if "placa" in df.columns:
+        placa = _texto(df["placa"]).str.upper()
+        out["placa"] = placa.where(placa != "", None).values
+    else:
+        out["placa"] = None
+
+    # Errores en orden inverso de prioridad: el último que aplica es el que queda
+    dup = out["placa"].notna() & (out["placa"].duplicated() | out["placa"].isin(placas_vistas))
+    reglas = [
+        (dup, "Placa duplicada en el archivo"),
+        (out["fecha_registro"].isna(), "fecha_registro inválida (usa YYYY-MM-DD)"),
+        (out["estado"].isna(), f"Estado inválido. Usa uno de: {', '.join(ESTADOS_VALIDOS)}"),
+        (out["tipo"].isna(), f"Tipo inválido. Usa uno de: {', '.join(CATEGORIAS_VALIDAS)}"),
+        (out["nombre"] == "", "El nombre del equipo es obligatorio."),
+    ]
+    out["error"] = None
+    for mascara, msg in reglas:
+        out.loc[mascara.values, "error"] = msg
+
+    placas_vistas.update(out["placa"].dropna().tolist())
+    return out[COLUMNAS_IMPORTACION]
+
+
+def bloques_validados(archivo, nombre_archivo: str, sep: str = ",", tam_bloque: int = TAM_BLOQUE):
+    """Lee y valida el archivo bloque a bloque."""
+    placas_vistas: set = set()
+    fila = 2  # fila 1 = encabezado
+    for df in leer_en_bloques(archivo, nombre_archivo, sep, tam_bloque):
+        yield validar_bloque(df, fila, placas_vistas)
+        fila += len(df)
+
+
+def importar_archivo(archivo, nombre_archivo: str, sep: str = ",", *,
+                     registrar_salones: bool = False, todo_o_nada: bool = True,
+                     simular: bool = False, tam_bloque: int = TAM_BLOQUE) -> ReporteImportacion:
+    """Pipeline completo: leer -> validar -> staging -> conflictos -> insertar."""
+    rep = importar_inventario(
+        bloques_validados(archivo, nombre_archivo, sep, tam_bloque),
+        registrar_salones=registrar_salones, todo_o_nada=todo_o_nada, simular=simular,
+    )
+    return ReporteImportacion(rep["total"], rep["insertadas"], rep["errores"])
+
+
+def previsualizar(archivo, nombre_archivo: str, sep: str = ",", n: int = 20) -> pd.DataFrame:
+    """Primeras `n` filas del archivo, sin leerlo completo."""
+    return next(leer_en_bloques(archivo, nombre_archivo, sep, tam_bloque=n), pd.DataFrame())
@@ -0,0 +1,193 @@
+# services/trabajos.py
+"""
+Trabajos en segundo plano: importaciones, exportes y reconstrucciones.
+
+El script de Streamlit solo encola (enviar_trabajo) y consulta el avance en
+la tabla trabajos (database.obtener_trabajo): un rerun o cambiar de página
+no corta el trabajo, y si el proceso se reinicia los que quedaron a medias
+se marcan 'interrumpido'. Corren en un pool de hilos del proceso (no de
+procesos): usan el pool de conexiones y el escritor único de
+database_escritor como cualquier sesión, y casi todo el tiempo se va en
+SQLite, que suelta el GIL.
+
+Los archivos de entrada (subidas) y de salida (exportes, errores de una
+importación) viven en la carpeta trabajos/ junto a la BD (dir_trabajos);
+se borran a los RETENCION_DIAS.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import database
+from database import actualizar_trabajo, crear_trabajo, marcar_trabajos_interrumpidos
+
+MAX_HILOS = 2
+RETENCION_DIAS = 2
+INTERVALO_PROGRESO_S = 0.5  # como mucho una escritura de progreso cada medio segundo
+TERMINADOS = ("ok", "error", "interrumpido")
+
+_lock = threading.Lock()
+_pool: ThreadPoolExecutor | None = None
+_tareas: dict = {}
+
+
+def tarea(tipo: str):
+    """Registra fn(progreso, **parametros) -> dict (resultado) para un tipo de trabajo."""
+    def deco(fn):
+        _tareas[tipo] = fn
+        return fn
+    return deco
+
+
+def dir_trabajos() -> Path:
+    d = Path(database.RUTA_BD).with_name("trabajos")
+    d.mkdir(exist_ok=True)
+    return d
+
+
+def _ahora() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _purgar_archivos() -> None:
+    limite = time.time() - RETENCION_DIAS * 86400
+    for f in dir_trabajos().iterdir():
+        if f.is_file() and f.stat().st_mtime < limite:
+            f.unlink(missing_ok=True)
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            # primera vez en el proceso: nada de lo que figura activo sigue corriendo
+            marcar_trabajos_interrumpidos()
+            _purgar_archivos()
+            _pool = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix="almacen-trabajo")
+        return _pool
+
+
+def enviar_trabajo(tipo: str, **parametros) -> int:
+    """Crea el trabajo (estado 'pendiente') y lo encola. Devuelve su id."""
+    if tipo not in _tareas:
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+    pool = _executor()
+    trabajo_id = crear_trabajo(tipo, parametros)
+    pool.submit(_correr, trabajo_id, tipo, parametros)
+    return trabajo_id
+
+
+def guardar_subida(archivo, nombre_archivo: str) -> str:
+    """Copia un archivo subido (file_uploader) a dir_trabajos(): el objeto muere con la sesión."""
+    ruta = dir_trabajos() / f"{uuid.uuid4().hex[:12]}_{Path(nombre_archivo).name}"
+    if hasattr(archivo, "seek"):
+        archivo.seek(0)
+    with open(ruta, "wb") as f:
+        while bloque := archivo.read(1 << 20):
+            f.write(bloque)
+    return str(ruta)
+
+
+class Progreso:
+    """Callback de avance para las tareas; limita las escrituras a la BD."""
+
+    def __init__(self, trabajo_id: int):
+        self.trabajo_id = trabajo_id
+        self._ultimo = 0.0
+
+    def __call__(self, fraccion: float, mensaje: str | None = None, forzar: bool = False) -> None:
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo < INTERVALO_PROGRESO_S:
+            return
+        self._ultimo = ahora
+        campos = {"progreso": round(max(0.0, min(1.0, fraccion)), 4)}
+        if mensaje is not None:
+            campos["mensaje"] = mensaje
+        actualizar_trabajo(self.trabajo_id, **campos)
+
+
+def _correr(trabajo_id: int, tipo: str, parametros: dict) -> None:
+    actualizar_trabajo(trabajo_id, estado="corriendo", iniciado=_ahora())
+    try:
+        resultado = _tareas[tipo](Progreso(trabajo_id), **parametros)
+    except Exception as e:
+        actualizar_trabajo(trabajo_id, estado="error", error=str(e) or type(e).__name__,
+                           terminado=_ahora())
+        return
+    actualizar_trabajo(trabajo_id, estado="ok", progreso=1.0, mensaje="Listo", resultado=resultado,
+                       terminado=_ahora())
+
+
+# ---------------------------
+# Tareas
+# ---------------------------
+@tarea("exportar")
+def _exportar(progreso, consulta, formato: str = "csv", hoja: str = "Datos",
+              nombre_archivo: str = "export") -> dict:
+    """Exporte CSV/XLSX a un archivo en dir_trabajos() (ver services.exportacion)."""
+    from services.exportacion import contar_filas, escribir_csv, escribir_xlsx
+
+    consulta = (consulta[0], list(consulta[1]))
+    total = contar_filas(consulta)
+    progreso(0.0, f"0 de {total} filas", forzar=True)
+    avance = lambda n: progreso(n / total if total else 1.0, f"{n} de {total} filas")
+    ruta = dir_trabajos() / f"{uuid.uuid4().hex[:12]}_{Path(nombre_archivo).name}"
+    if formato == "csv":
+        with open(ruta, "wb") as f:
+            filas = escribir_csv(consulta, f, al_avanzar=avance)
+    elif formato == "xlsx":
+        filas = escribir_xlsx(consulta, str(ruta), hoja, al_avanzar=avance)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return {"archivo": str(ruta), "nombre_archivo": nombre_archivo, "formato": formato, "filas": filas}
+
+
+@tarea("importar_inventario")
+def _importar(progreso, archivo: str, nombre_archivo: str, sep: str = ",",
+              registrar_salones: bool = False, todo_o_nada: bool = True,
+              simular: bool = False, total_estimado: int | None = None) -> dict:
+    """
+    Validación (simular=True) o importación de un archivo guardado con
+    guardar_subida. Los errores por fila quedan en un CSV junto al archivo.
+    """
+    from services.importacion import bloques_validados
+    from database import importar_inventario
+
+    def con_avance(bloques):
+        leidas = 0
+        for b in bloques:
+            leidas += len(b)
+            frac = min(0.95, leidas / total_estimado) if total_estimado else 0.0
+            progreso(frac, f"{leidas} filas leídas")
+            yield b
+
+    progreso(0.0, "Leyendo archivo", forzar=True)
+    with open(archivo, "rb") as f:
+        rep = importar_inventario(
+            con_avance(bloques_validados(f, nombre_archivo, sep)),
+            registrar_salones=registrar_salones, todo_o_nada=todo_o_nada, simular=simular,
+        )
+    resultado = {"total": rep["total"], "insertadas": rep["insertadas"], "errores": len(rep["errores"])}
+    if not rep["errores"].empty:
+        ruta_err = Path(archivo).with_name(Path(archivo).stem + "_errores.csv")
+        rep["errores"].to_csv(ruta_err, index=False)
+        resultado["archivo_errores"] = str(ruta_err)
+    return resultado
+
+
+@tarea("reconstruir")
+def _reconstruir(progreso, tabla: str) -> dict:
+    """Backfill de una tabla derivada (llaves_estado, llaves_diario, inventario_resumen)."""
+    fn = {
+        "llaves_estado": database.reconstruir_llaves_estado,
+        "llaves_diario": database.reconstruir_llaves_diario,
+        "inventario_resumen": database.reconstruir_inventario_resumen,
+    }.get(tabla)
+    if fn is None:
+        raise ValueError(f"No hay reconstrucción para {tabla}")
+    progreso(0.0, f"Reconstruyendo {tabla}", forzar=True)
+    return {"tabla": tabla, "grupos": fn()}
+
@@ -0,0 +1,54 @@
+# tests/test_normalizacion.py
+"""Escalares vs *_series de normalizacion: mismo resultado e idempotencia."""
+import pandas as pd
+import pytest
+
+from normalizacion import (
+    normalizar_salon_label, normalizar_salon_series, titlecase_nombre, titlecase_series,
+)
+
+SALONES = [
+    "", " ", None, "7", "Sala 7", "sala   316 f", "SALÓN 303 - F", "salon 3-204", "316F",
+    "303-F-2", "bodega", "  La Bodega ", "BODEGA", "BODEGA 2", "Sala", "salón", "Salón",
+    "Auditorio", "C3-512-A", "C3-204", "Sala C3-204", "lab. 12b", "LAB 2", "7a", "-", "\t7\n",
+    "Sala A12", "Sala B2", "Sala 303-F", "sala de juntas", "piso 2 sala 14",
+]
+NOMBRES = [
+    "", "  ", None, "ana maría de la cruz", "DE LA CRUZ", "juan y pedro", "luis e hijos",
+    "o'neil", "maría-josé  pérez", "josé DEL valle", "da silva", "y", "ñandú  ñoño",
+    "ÁLVARO do carmo", "  laura\tlos  santos ", "de", "la de los",
+]
+PARES = [
+    pytest.param(normalizar_salon_label, normalizar_salon_series, SALONES, id="salon"),
+    pytest.param(titlecase_nombre, titlecase_series, NOMBRES, id="nombre"),
+]
+
+
+@pytest.mark.parametrize("escalar, vectorial, valores", PARES)
+def test_series_igual_a_escalar(escalar, vectorial, valores):
+    obtenido = vectorial(pd.Series(valores, dtype=object)).tolist()
+    assert obtenido == [escalar(v) for v in valores]
+
+
+@pytest.mark.parametrize("escalar, vectorial, valores", PARES)
+def test_idempotente(escalar, vectorial, valores):
+    una = [escalar(v) for v in valores]
+    assert [escalar(v) for v in una] == una
+    assert vectorial(pd.Series(una, dtype=object)).tolist() == una
+
+
+def test_series_conserva_indice():
+    s = pd.Series(["7", None, "bodega"], index=[10, 20, 30], dtype=object)
+    assert normalizar_salon_series(s).to_dict() == {10: "Sala 7", 20: "", 30: "BODEGA"}
+
+
+@pytest.mark.parametrize("entrada, esperado", [
+    ("7", "Sala 7"),
+    ("sala 316 f", "Sala 316F"),
+    ("Salón 303-F", "Sala 303-F"),
+    ("Sala 7", "Sala 7"),           # ya etiquetado: no cambia
+    ("Sala C3-204", "Sala C3-204"),
+    ("la bodega", "BODEGA"),
+])
+def test_salon_label(entrada, esperado):
+    assert normalizar_salon_label(entrada) == esperado
@@ -0,0 +1,88 @@
+# ui/pages/activas.py
+"""Llaves actualmente entregadas (lee llaves_estado, no el historial)."""
+import pandas as pd
+import streamlit as st
+
+from database import contar_historial, obtener_llaves_activas, registrar_evento
+from ui.theme import badge, card
+from ui_helpers import now_str
+from validators import normalizar_salon_label
+
+
+def render():
+    st.header("🔐 Llaves actualmente entregadas")
+
+    # --- Datos base (llaves_estado: una fila por salón, sin leer el historial)
+    st.caption(f"Registros en historial: **{contar_historial()}**")
+
+    activas = obtener_llaves_activas()
+    activas["fecha_hora"] = pd.to_datetime(activas["fecha_hora"], errors="coerce")
+
+    st.caption(f"Salones con llave activa: **{len(activas)}**")
+    if activas.empty:
+        card("Estado", badge("No hay llaves prestadas", "ok"))
+        st.stop()
+
+    # --- Filtros (opcionales)
+    c1, c2, c3, c4 = st.columns(4)
+    with c1:
+        f_prof = st.selectbox(
+            "Profesor (opcional)",
+            ["Todos"] + sorted(activas["nombre"].dropna().unique().tolist()),
+            key="act_f_prof",
+        )
+    with c2:
+        f_area = st.selectbox(
+            "Programa (opcional)",
+            ["Todos"] + sorted(activas["area"].dropna().unique().tolist()),
+            key="act_f_area",
+        )
+    with c3:
+        f_salon = st.selectbox(
+            "Salón (opcional)",
+            ["Todos"] + sorted(activas["salon"].dropna().unique().tolist()),
+            key="act_f_salon",
+        )
+    with c4:
+        # campo libre opcional (normalizado si se escribe)
+        salon_raw = st.text_input("Buscar por texto (salón)", placeholder="Ej: Sala 7 / 303-F / Bodega")
+        salon_txt = normalizar_salon_label(salon_raw) if salon_raw.strip() else None
+
+    # Aplica filtros
+    df_view = activas.copy()
+    if f_prof != "Todos":
+        df_view = df_view[df_view["nombre"] == f_prof]
+    if f_area != "Todos":
+        df_view = df_view[df_view["area"] == f_area]
+    if f_salon != "Todos":
+        df_view = df_view[df_view["salon"] == f_salon]
+    if salon_txt:
+        df_view = df_view[df_view["salon"] == salon_txt]
+
+    if df_view.empty:
+        card("Resultado", badge("Sin coincidencias con los filtros", "warn"))
+    else:
+        # Render tarjetas + botón devolver (key única por ID)
+        for _, r in df_view.sort_values("fecha_hora", ascending=False).iterrows():
+            fh = r["fecha_hora"]
+            fh_txt = fh.strftime("%Y-%m-%d %H:%M") if pd.notna(fh) else "—"
+            estado = badge("Entregada", "warn")
+
+            # OJO: r, no row
+            card(
+                f"{r['salon']} — {estado}",
+                f"👤 **{r['nombre']}** · 🏫 {r['area']}  \n"
+                f"🕒 {fh_txt}"
+            )
+
+            btn_key = f"dev_{int(r['id']) if pd.notna(r['id']) else hash((r['salon'], fh_txt))}"
+            if st.button(f"Devolver {r['salon']}", key=btn_key):
+                registrar_evento(
+                    r["nombre"],
+                    r["area"],
+                    r["salon"],
+                    "Devuelta",
+                    now_str()
+                )
+                st.success(f"Llave de {r['salon']} devuelta.")
+                st.rerun()
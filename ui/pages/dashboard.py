@@ -0,0 +1,232 @@
+# ui/pages/dashboard.py
+"""Dashboard: KPIs, recordatorios, últimos movimientos y actividad semanal."""
+import datetime
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from database import (
+    contar_historial, contar_inventario, contar_llaves_activas, ultimos_eventos, actividad_ultimos_dias,
+    agregar_recordatorio, obtener_recordatorios, marcar_recordatorio, eliminar_recordatorio,
+)
+from ui.theme import badge, card
+from ui_helpers import procesar_fechas
+
+
+def render():
+    st.header("📊 Dashboard")
+
+    # --- Datos base (conteos en SQL; el historial no se carga) ---
+    total_registros = contar_historial()
+    total_inventario = contar_inventario()
+    activas = contar_llaves_activas()
+
+    # --- KPIs (solo una fila, sin resumen duplicado) ---
+    c1, c2, c3 = st.columns(3)
+    c1.metric("🔑 Registros (llaves)", total_registros)
+    c2.metric("🟢 Llaves activas", activas)
+    c3.metric("💼 Activos en inventario", total_inventario)
+
+    st.divider()
+
+    # --- Dos columnas: Recordatorios  |  Últimos movimientos ---
+    col_left, col_right = st.columns([1, 1])
+
+    # --- RECORDATORIOS (colaborativos) ---
+    st.markdown("### 🔔 Recordatorios !!! ")
+
+    # --- Formulario para agregar nuevo recordatorio ---
+    with st.form("form_recordatorio", clear_on_submit=True):
+        c1, c2, c3 = st.columns([3, 1, 1])
+        with c1:
+            texto = st.text_input("Nuevo recordatorio o tarea", placeholder="Ej: Revisar equipos de Sala 305-F")
+        with c2:
+            fecha = st.date_input("Fecha (opcional)")
+        with c3:
+            responsable = st.text_input("Responsable", placeholder="Ej: Mateo o ADSO")
+
+        if st.form_submit_button("➕ Agregar recordatorio"):
+            if texto.strip():
+                agregar_recordatorio(
+                    texto,
+                    fecha.strftime("%Y-%m-%d") if fecha else None,
+                    responsable or None
+                )
+                st.success("Recordatorio agregado ✅")
+                st.rerun()
+            else:
+                st.warning("Escribe una tarea o recordatorio antes de guardar.")
+
+    # --- Mostrar lista de recordatorios existentes ---
+    df_rec = obtener_recordatorios()
+
+    if df_rec.empty:
+        st.info("No hay recordatorios por ahora.")
+    else:
+        for _, r in df_rec.iterrows():
+            cols = st.columns([0.55, 0.15, 0.15, 0.15])
+            texto = r["texto"]
+            fecha = r["fecha"] or ""
+            resp = r["responsable"] or ""
+            hecho = bool(r["hecho"])
+
+            with cols[0]:
+                msg = f"**{texto}**"
+                if fecha:
+                    msg += f"  \n📅 {fecha}"
+                if resp:
+                    msg += f"  \n👤 {resp}"
+                if hecho:
+                    st.markdown(f"✅ ~~{msg}~~")
+                else:
+                    st.markdown(msg)
+
+            with cols[1]:
+                if st.button("✅ Hecho" if not hecho else "↩️ Pendiente", key=f"done_{r['id']}"):
+                    marcar_recordatorio(int(r["id"]), not hecho)
+                    st.rerun()
+
+            with cols[2]:
+                if st.button("🗑️ Eliminar", key=f"del_{r['id']}"):
+                    eliminar_recordatorio(int(r["id"]))
+                    st.rerun()
+
+    # 🔍 Fecha actual
+    hoy = datetime.date.today()
+
+    # 🔎 Filtrar recordatorios pendientes con fecha
+    pendientes = df_rec[(df_rec["hecho"] == 0) & (df_rec["fecha"].notna())]
+
+    # ⚠️ Recordatorios vencidos o del día actual
+    vencidos = pendientes[pendientes["fecha"].apply(lambda d: datetime.date.fromisoformat(d) <= hoy)]
+
+    # 🔔 Mostrar alerta si hay recordatorios urgentes
+    if not vencidos.empty:
+        st.warning(f"⚠️ {len(vencidos)} recordatorio(s) con fecha vencida o para hoy.")
+
+
+    # 2) Últimos movimientos
+    # === 🕓 Últimos movimientos (centrado y color dinámico) ===
+    st.markdown("## 🕓 Últimos movimientos recientes")
+    st.write("")  # espacio visual
+
+    if total_registros == 0:
+        st.info("No hay registros recientes.")
+    else:
+
+        def rel_time(ts):
+            """Convierte fecha a formato relativo legible."""
+            if ts is None or not isinstance(ts, datetime.datetime):
+                return ""
+            now = datetime.datetime.now()
+            delta = now - ts
+            s = delta.total_seconds()
+            if s < 60:
+                return "hace segundos"
+            elif s < 3600:
+                return f"hace {int(s//60)} min"
+            elif s < 86400:
+                return f"hace {int(s//3600)} h"
+            elif s < 172800:
+                return "ayer"
+            else:
+                return f"hace {int(s//86400)} días"
+
+        # Mostrar más registros si el usuario lo desea
+        ver_mas = st.toggle("Ver más movimientos", value=False, key="dash_movs_toggle")
+        topn = 20 if ver_mas else 6
+
+        df_last = procesar_fechas(ultimos_eventos(topn))
+
+        # CSS personalizado para animación y colores dinámicos
+        st.markdown("""
+        <style>
+        .mov-card {
+            border-radius: 14px;
+            padding: 16px 20px;
+            margin: 14px auto;
+            max-width: 700px;
+            color: #fff;
+            animation: fadeIn 0.7s ease-in-out;
+            box-shadow: 0 3px 10px rgba(0,0,0,0.3);
+            transition: transform 0.2s ease;
+        }
+        .mov-card:hover { transform: scale(1.01); }
+        .mov-entregada { background: linear-gradient(135deg, #f9d976, #f39c12); }
+        .mov-devuelta  { background: linear-gradient(135deg, #76d7c4, #27ae60); }
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(10px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
+        .mov-title {
+            font-size: 20px;
+            margin: 0 0 8px 0;
+            font-weight: 600;
+        }
+        .mov-meta {
+            font-size: 15px;
+            color: #f4f4f4;
+            margin-top: 4px;
+            line-height: 1.5;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+        # Render tarjetas centradas
+        st.markdown("<div style='text-align:center;'>", unsafe_allow_html=True)
+        for _, r in df_last.iterrows():
+            icon = "🔑" if r["accion"] == "Entregada" else "✅"
+            clase_color = "mov-entregada" if r["accion"] == "Entregada" else "mov-devuelta"
+            fh_txt = r["fecha_hora"].strftime("%Y-%m-%d %H:%M") if pd.notna(r["fecha_hora"]) else "—"
+            tiempo = rel_time(r["fecha_hora"])
+
+            st.markdown(f"""
+            <div class="mov-card {clase_color}">
+                <div class="mov-title">{icon} {r['accion']} — <b>{r['salon']}</b></div>
+                <div class="mov-meta">
+                    👤 <b>{r['nombre']}</b> · 🏫 {r['area']} <br>
+                    🕒 {fh_txt} · {tiempo}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # ----------- --------- ---------------------
+
+    # --- Actividad (7 días) ---
+    st.markdown("### 📅 Actividad (últimos 7 días)")
+    if total_registros:
+        by_day = actividad_ultimos_dias(7, hoy)
+        if not by_day.empty:
+            chart = (
+                alt.Chart(by_day)
+                .mark_bar()
+                .encode(
+                    x=alt.X("fecha:T", title="Fecha"),
+                    y=alt.Y("movimientos:Q", title="Movimientos"),
+                    tooltip=["fecha", "movimientos"],
+                )
+                .properties(height=240)
+            )
+            st.altair_chart(chart, use_container_width=True)
+        else:
+            card("Actividad", badge("No hay datos en los últimos 7 días", "warn"))
+    else:
+        card("Actividad", badge("Sin datos para graficar", "warn"))
+
+    # (Opcional) Top salones de la semana — descomenta si quieres este mini-chart
+    # st.markdown("#### 🏫 Top salones (7 días)")
+    # top_salones = top_llaves("salon", 8, fecha_ini=hoy - datetime.timedelta(days=6), fecha_fin=hoy)
+    # if not top_salones.empty:
+    #     chart2 = (
+    #         alt.Chart(top_salones)
+    #         .mark_bar()
+    #         .encode(
+    #             x=alt.X("mov:Q", title="Mov."),
+    #             y=alt.Y("salon:N", sort="-x", title="Salón"),
+    #             tooltip=["salon", "mov"],
+    #         )
+    #         .properties(height=220)
+    #     )
+    #     st.altair_chart(chart2, use_container_width=True)
@@ -0,0 +1,70 @@
+# ui/pages/historial.py
+"""Historial de llaves: filtros en SQL y paginación keyset."""
+import streamlit as st
+
+from database import (
+    consultar_historial, resumen_historial, valores_filtro_historial, DIAS_SEMANA,
+    consulta_exportar_historial,
+)
+from ui.theme import badge, card
+from ui_helpers import descarga_diferida
+
+
+def render():
+    st.header("🕒 Historial de movimientos")
+
+    # Filtros -> predicados SQL (no se carga el historial completo)
+    opciones = valores_filtro_historial()
+    c1, c2, c3 = st.columns(3)
+    with c1: f_prof = st.selectbox("Profesor", ["Todos"] + opciones["nombre"], key="hist_prof")
+    with c2: f_salon = st.selectbox("Salón", ["Todos"] + opciones["salon"], key="hist_salon")
+    with c3: f_area = st.selectbox("Área", ["Todos"] + opciones["area"], key="hist_area")
+    c4, c5, c6 = st.columns([2, 2, 1])
+    with c4: f_dia = st.selectbox("Día de la semana", ["Todos"] + DIAS_SEMANA, key="hist_dia")
+    with c5: f_rango = st.date_input("Rango de fechas", [], key="hist_rango")
+    with c6: por_pagina = st.selectbox("Filas por página", [25, 50, 100, 200], index=1, key="hist_pp")
+
+    filtros = {
+        "profesor": None if f_prof == "Todos" else f_prof,
+        "salon": None if f_salon == "Todos" else f_salon,
+        "area": None if f_area == "Todos" else f_area,
+        "dia_semana": None if f_dia == "Todos" else f_dia,
+    }
+    if isinstance(f_rango, (list, tuple)) and len(f_rango) == 2:
+        filtros["fecha_ini"], filtros["fecha_fin"] = f_rango
+
+    # Paginación keyset: pila de cursores; se reinicia si cambian los filtros
+    firma = (tuple(sorted((k, str(v)) for k, v in filtros.items())), por_pagina)
+    if st.session_state.get("hist_firma") != firma:
+        st.session_state.hist_firma = firma
+        st.session_state.hist_cursores = [None]
+    cursores = st.session_state.hist_cursores
+
+    resumen = resumen_historial(**filtros)
+    if resumen["total"] == 0:
+        card("Historial", badge("Sin registros con estos filtros", "ok"))
+    else:
+        df, siguiente = consultar_historial(limite=por_pagina, despues_de=cursores[-1], **filtros)
+        st.dataframe(df, use_container_width=True, hide_index=True)
+
+        n_pag = len(cursores)
+        total_pag = -(-resumen["total"] // por_pagina)
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("← Anterior", key="hist_prev", disabled=n_pag == 1):
+                cursores.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Página {n_pag} de {total_pag} · {resumen['total']} registros")
+        with p3:
+            if st.button("Siguiente →", key="hist_next", disabled=siguiente is None):
+                cursores.append(siguiente)
+                st.rerun()
+
+        c1,c2 = st.columns(2)
+        with c1: card("Resumen", f"{badge('Entregadas','warn')} **{resumen['Entregada']}**  \n{badge('Devueltas','ok')} **{resumen['Devuelta']}**")
+        with c2:
+            # El CSV completo solo se arma cuando se pide, directo desde SQL
+            descarga_diferida("CSV", consulta_exportar_historial(**filtros),
+                              "historial_llaves.csv", key="hist_csv")
+        # (opcional) eliminar por ID si usas rol admin
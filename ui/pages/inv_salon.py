@@ -0,0 +1,184 @@
+# ui/pages/inv_salon.py
+"""Inventario de un salón: KPIs, búsqueda, exportes y acciones en lote."""
+import streamlit as st
+
+from database import (
+    obtener_salones, registrar_salon, buscar_inventario, salones_inventario,
+    inventario_salon, resumen_salon,
+    actualizar_equipos_lote, eliminar_equipos_lote, mover_equipos_lote, consulta_exportar_inventario,
+)
+from ui.theme import badge, card
+from ui_helpers import now_str, descarga_diferida
+
+
+def render():
+    st.header("🏫 Inventario por salón")
+
+    # Salones disponibles (rooms + salones con equipos; sin cargar el inventario)
+    try:
+        rooms_df = obtener_salones()
+        rooms = rooms_df["codigo"].str.upper().tolist() if not rooms_df.empty else []
+    except Exception:
+        rooms = []
+    salones_disponibles = sorted(set(rooms) | set(salones_inventario()))
+
+    if not salones_disponibles:
+        card("Salones", badge("No hay salones registrados ni equipos con salón", "warn"))
+        st.stop()
+
+    # Selector de salón + creación rápida
+    cA, cB = st.columns([3, 2])
+    with cA:
+        salon_sel = st.selectbox("Selecciona un salón", salones_disponibles, index=0, key="inv_room_sel")
+    with cB:
+        st.caption("Crear salón")
+        nuevo_salon = st.text_input("Código nuevo (ej: C3-204)", key="inv_room_new").strip().upper()
+        if st.button("➕ Registrar salón", key="inv_room_add"):
+            if not nuevo_salon:
+                st.warning("Escribe un código.")
+            else:
+                registrar_salon(nuevo_salon)
+                st.success(f"Salón {nuevo_salon} registrado.")
+                st.rerun()
+
+    # KPIs y resumen por tipo: un GROUP BY sobre el salón
+    resumen = resumen_salon(salon_sel)
+    if resumen["total"] == 0:
+        card(f"Salón {salon_sel}", badge("Sin equipos en este salón", "warn"))
+        st.stop()
+
+    k1,k2,k3,k4,k5 = st.columns(5)
+    k1.metric("Total", resumen["total"])
+    k2.metric("Disponibles", resumen["Disponible"])
+    k3.metric("En uso", resumen["En uso"])
+    k4.metric("Dañados", resumen["Dañado"])
+    k5.metric("Extraviados", resumen["Extraviado"])
+    st.caption(f"🔘 Equipos sin placa (consumibles): **{resumen['sin_placa']}**")
+
+    st.divider()
+
+    # Filtros y búsqueda (incluye placa)
+    c1,c2,c3 = st.columns(3)
+    with c1:
+        f_tipo = st.selectbox("Tipo", ["Todos"] + sorted(resumen["por_tipo"]["tipo"].dropna().tolist()), key="inv_room_tipo")
+    with c2:
+        f_estado = st.selectbox("Estado", ["Todos","Disponible","En uso","Dañado","Extraviado"], key="inv_room_estado")
+    with c3:
+        q = st.text_input("Buscar (placa / nombre / tipo / responsable)", key="inv_room_q")
+
+    if q.strip():
+        df_f, _ = buscar_inventario(
+            q, columnas=("placa", "nombre", "tipo", "responsable"), salon=salon_sel,
+            tipo=None if f_tipo == "Todos" else f_tipo,
+            estado=None if f_estado == "Todos" else f_estado,
+            limite=None,
+        )
+    else:
+        # solo las filas del salón (idx_inventario_salon)
+        df_f = inventario_salon(salon_sel)
+        if f_tipo != "Todos":
+            df_f = df_f[df_f["tipo"] == f_tipo]
+        if f_estado != "Todos":
+            df_f = df_f[df_f["estado"] == f_estado]
+
+    # Tabla + export
+    st.markdown(f"### 📋 Equipos en **{salon_sel}**")
+    cols_show = ["id","placa","nombre","tipo","estado","responsable","fecha_registro"]
+    st.dataframe(df_f[cols_show], use_container_width=True, hide_index=True)
+
+    # Exportes: se generan al pedirlos, directo desde SQL (mismas filas y orden que la tabla)
+    consulta = consulta_exportar_inventario(
+        cols_show, texto=q, columnas=("placa", "nombre", "tipo", "responsable"),
+        salon=salon_sel,
+        tipo=None if f_tipo == "Todos" else f_tipo,
+        estado=None if f_estado == "Todos" else f_estado,
+    )
+    e1, e2 = st.columns(2)
+    with e1:
+        descarga_diferida("CSV del salón", consulta, f"inventario_{salon_sel}.csv",
+                          key="inv_room_export_csv")
+    with e2:
+        descarga_diferida("XLSX del salón", consulta, f"inventario_{salon_sel}.xlsx",
+                          key="inv_room_export_xlsx", formato="xlsx", hoja=f"{salon_sel}_inventario")
+
+    st.divider()
+
+    # --- Acciones en lote ---
+    st.markdown("### ⚙️ Acciones en lote")
+    ids_disponibles = df_f["id"].tolist()
+    ids_sel = st.multiselect("Selecciona IDs", ids_disponibles, key="inv_room_ids")
+
+    cA1, cA2, cA3 = st.columns(3)
+
+    # A) Cambiar estado
+    with cA1:
+        nuevo_estado = st.selectbox("Cambiar a estado", ["Disponible","En uso","Dañado","Extraviado"], key="inv_room_state")
+        st.button(
+            "Cambiar estado",
+            key="inv_room_change",
+            disabled=(len(ids_sel) == 0),
+            on_click=lambda: None
+        )
+        if st.session_state.get("inv_room_change"):
+            n = actualizar_equipos_lote(ids_sel, responsable=st.session_state.get("usuario", "Mateo"),
+                                        estado=nuevo_estado)
+            st.success(f"Estado actualizado en {n} equipo(s).")
+            st.rerun()
+
+    # B) Mover + registrar movimiento (trazabilidad)
+    with cA2:
+        target  = st.text_input("Mover al salón", placeholder="Ej: C3-205", key="inv_room_target").strip().upper()
+        motivo  = st.selectbox("Motivo", ["Traslado", "Préstamo", "Mantenimiento", "Auditoría", "Otro"], key="inv_room_motivo")
+        resp_mv = st.text_input("Responsable del movimiento", key="inv_room_resp")
+        notas_mv= st.text_area("Notas (opcional)", key="inv_room_notas", height=70)
+
+        if st.button("Mover equipo(s)", key="inv_room_move"):
+            if not ids_sel:
+                st.warning("Selecciona al menos un ID.")
+            elif not target:
+                st.warning("Indica el salón destino.")
+            else:
+                try:
+                    res = mover_equipos_lote(ids_sel, target, motivo, (resp_mv or "N/A"),
+                                             (notas_mv or None), now_str())
+                    ok = sum(r.ok for r in res.values())
+                    fail = len(res) - ok
+                    st.success(f"Movidos {ok} equipo(s) a {target}. {f'Fallidos: {fail}' if fail else ''}")
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Error moviendo equipos (no se movió ninguno): {e}")
+
+
+    # C) Eliminar
+    with cA3:
+        delete_disabled = (len(ids_sel) == 0)
+        if st.button("Eliminar seleccionados", type="secondary", key="inv_room_delete", disabled=delete_disabled):
+            n = eliminar_equipos_lote(ids_sel, responsable=st.session_state.get("usuario", "Mateo"))
+            st.success(f"Eliminados {n} equipo(s).")
+            st.rerun()
+
+    st.divider()
+
+    # Resumen por tipo (tarjetas + gráfico)
+    st.markdown("### 🧩 Resumen por tipo")
+    g_tipo = resumen["por_tipo"]
+    for _, r in g_tipo.iterrows():
+        card(f"{r['tipo']}", f"**{int(r['cantidad'])}** equipo(s) en {salon_sel}")
+
+    # Gráfico (opcional)
+    try:
+        import altair as alt
+        st.markdown("### 📊 Distribución por tipo")
+        chart = (
+            alt.Chart(g_tipo)
+            .mark_bar()
+            .encode(
+                x=alt.X("tipo:N", title="Tipo de equipo", sort="-y"),
+                y=alt.Y("cantidad:Q", title="Cantidad"),
+                tooltip=["tipo","cantidad"]
+            )
+            .properties(height=280)
+        )
+        st.altair_chart(chart, use_container_width=True)
+    except Exception:
+        pass
@@ -0,0 +1,254 @@
+# ui/pages/inventario.py
+"""Inventario: alta, carga masiva, consulta/edición y plantillas."""
+import io
+
+import pandas as pd
+import streamlit as st
+
+from database import (
+    RUTA_BD, contar_inventario, salones_inventario, tipos_inventario, listar_inventario,
+    obtener_equipo, actualizar_equipo, eliminar_equipo, registrar_salon,
+    existe_placa, buscar_inventario, agregar_equipo_safe, consulta_exportar_inventario,
+)
+from errors import AppError
+from services.importacion import previsualizar
+from services.trabajos import enviar_trabajo, guardar_subida
+from ui_helpers import ui_result, now_str, descarga_diferida, seguir_trabajo
+from validators import CATEGORIAS_VALIDAS, ESTADOS_VALIDOS
+
+
+def render():
+    st.header("🧰 Inventario de equipos")
+
+    # Diagnóstico rápido
+    st.caption(f"BD usada: **{RUTA_BD}**")
+    total_inv = contar_inventario()
+    st.caption(f"Registros actuales: **{total_inv}**")
+
+    tab_add, tab_upload, tab_view, tab_tpl = st.tabs(
+        ["➕ Agregar equipo", "⤴️ Cargar archivo", "📋 Ver / Editar / Exportar", "📑 Plantillas"]
+    )
+
+    # ---------- TAB: AGREGAR ----------
+    with st.form("form_inv_add", clear_on_submit=True):
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            nombre = st.text_input("Nombre del equipo *")
+            tipo = st.selectbox("Tipo/Categoría *", options=CATEGORIAS_VALIDAS)
+        with c2:
+            estado = st.selectbox("Estado *", options=ESTADOS_VALIDOS)
+            salon = st.text_input("Salón (código)", placeholder="C3-204 (o Bodega)")
+        with c3:
+            responsable = st.text_input("Responsable (opcional)")
+            placa = st.text_input("Placa (opcional)")
+            fecha_registro = now_str()
+
+                # --- Guardar equipo ---
+        if st.form_submit_button("Guardar", type="primary"):
+            r = agregar_equipo_safe(
+                nombre=nombre,
+                tipo=tipo,
+                estado=estado,
+                salon=salon,
+                responsable=(responsable or ""),
+                fecha_registro=fecha_registro,
+                placa=placa or None
+            )
+            ui_result(r)
+            if r.ok:
+                st.rerun()
+
+
+
+
+    # ---------- TAB: CARGAR ARCHIVO ----------
+    with tab_upload:
+        st.markdown("Sube un **XLSX** o **CSV** con el inventario.")
+        file = st.file_uploader("Archivo", type=["xlsx", "csv"], key="inv_up_file")
+        sep = st.selectbox("Separador (para CSV)", [",", ";", "|"], index=0, key="inv_up_sep")
+
+        if file is not None:
+            try:
+                st.subheader("Previsualización")
+                st.dataframe(previsualizar(file, file.name, sep), use_container_width=True)
+            except (AppError, ValueError) as e:
+                st.error(f"Error leyendo el archivo: {e}")
+                file = None
+
+        if file is not None:
+            # Validación en seco e importación corren como trabajos en segundo plano
+            # (services.trabajos): un rerun no los corta y la página no se bloquea.
+            clave = (file.name, file.size, sep)
+            up = st.session_state.get("inv_up")
+            if not up or up["clave"] != clave:
+                ruta = guardar_subida(file, file.name)
+                up = st.session_state.inv_up = {
+                    "clave": clave, "archivo": ruta, "guardado": None,
+                    "validacion": enviar_trabajo("importar_inventario", archivo=ruta,
+                                                 nombre_archivo=file.name, sep=sep, simular=True),
+                }
+
+            if up["guardado"]:
+                t = seguir_trabajo(up["guardado"], "inv_up_save")
+                if t is not None and t["estado"] == "ok":
+                    st.success(f"{t['resultado']['insertadas']} filas importadas.")
+                elif t is not None:
+                    st.error(f"Error guardando: {t['error']}")
+            else:
+                t = seguir_trabajo(up["validacion"], "inv_up_val")
+                if t is None:
+                    st.caption("Validando el archivo en segundo plano…")
+                elif t["estado"] != "ok":
+                    st.error(f"Error leyendo el archivo: {t['error']}")
+                else:
+                    rep = t["resultado"]
+                    st.subheader("Validación")
+                    if not rep["errores"]:
+                        st.success(f"Validación OK ✅ ({rep['total']} filas)")
+                    else:
+                        st.error(f"{rep['errores']} de {rep['total']} fila(s) con errores.")
+                        st.dataframe(pd.read_csv(rep["archivo_errores"], nrows=500),
+                                     use_container_width=True, hide_index=True)
+
+                    auto_room = st.checkbox("Registrar salones inexistentes automáticamente", key="inv_up_autoroom")
+                    omitir = False
+                    if rep["errores"]:
+                        omitir = st.checkbox("Importar solo las filas válidas (omitir las que tienen error)",
+                                             key="inv_up_omitir")
+
+                    if st.button("Guardar en inventario", type="primary", key="inv_up_save",
+                                 disabled=not (rep["errores"] == 0 or omitir)):
+                        up["guardado"] = enviar_trabajo(
+                            "importar_inventario", archivo=up["archivo"], nombre_archivo=file.name, sep=sep,
+                            registrar_salones=auto_room, todo_o_nada=not omitir, total_estimado=rep["total"],
+                        )
+                        st.rerun()
+
+    # ---------- TAB: VER / EDITAR / EXPORTAR ----------
+    with tab_view:
+        if not total_inv:
+            st.info("No hay equipos.")
+        else:
+            # Filtros (opciones leídas con DISTINCT sobre índices, sin cargar la tabla)
+            c1, c2, c3, c4 = st.columns(4)
+            with c1:
+                f_tipo = st.selectbox("Tipo", ["Todos"] + tipos_inventario(), key="inv_view_tipo")
+            with c2:
+                f_estado = st.selectbox("Estado", ["Todos"] + ESTADOS_VALIDOS, key="inv_view_estado")
+            with c3:
+                f_salon = st.selectbox("Salón", ["Todos"] + salones_inventario(), key="inv_view_salon")
+            with c4:
+                q = st.text_input("Buscar (placa/nombre/tipo/salón)", key="inv_view_q")
+
+            # Búsqueda en el índice FTS (por prefijos, ordenada por relevancia) o,
+            # sin texto, el inventario filtrado en SQL; las dos por páginas
+            por_pagina = 100
+            firma = (q, f_tipo, f_estado, f_salon)
+            if st.session_state.get("inv_view_firma") != firma:
+                st.session_state.inv_view_firma = firma
+                st.session_state.inv_view_pag = 1   # otra búsqueda: volver a la página 1
+            pagina = st.session_state.get("inv_view_pag", 1)
+            filtros = dict(
+                tipo=None if f_tipo == "Todos" else f_tipo,
+                estado=None if f_estado == "Todos" else f_estado,
+                salon=None if f_salon == "Todos" else f_salon,
+            )
+            if q.strip():
+                df, total_q = buscar_inventario(q, columnas=("placa", "nombre", "tipo", "salon"),
+                                                limite=por_pagina, pagina=pagina - 1, **filtros)
+            else:
+                df, total_q = listar_inventario(limite=por_pagina, pagina=pagina - 1, **filtros)
+            paginas = max(1, -(-total_q // por_pagina))
+            if paginas > 1:
+                st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas,
+                                step=1, key="inv_view_pag")
+            st.caption(f"{total_q} coincidencias" if q.strip() else f"{total_q} equipos")
+
+            # Tabla + Export
+            cols_tabla = ["id", "placa", "nombre", "tipo", "estado", "salon", "responsable", "fecha_registro"]
+            st.dataframe(df[cols_tabla], use_container_width=True, hide_index=True)
+            consulta = consulta_exportar_inventario(
+                cols_tabla, texto=q, columnas=("placa", "nombre", "tipo", "salon"), **filtros
+            )
+            descarga_diferida("CSV", consulta, "inventario_filtrado.csv", key="inv_view_export")
+
+            colA, colB, colC, colD = st.columns(4)
+            with colB:
+                row_id = st.number_input("ID para editar", min_value=0, step=1, key="inv_view_row")
+            with colC:
+                nuevo_estado = st.selectbox("Nuevo estado", ESTADOS_VALIDOS, key="inv_view_new_estado")
+            with colD:
+                nuevo_salon = st.text_input("Nuevo salón (código)", placeholder="C3-204 / BODEGA",
+                                            key="inv_view_new_salon").strip().upper()
+
+            nueva_placa = st.text_input("Nueva placa (opcional, única)", key="inv_view_new_placa").strip().upper()
+
+            if st.button("Aplicar cambios", key="inv_view_apply"):
+                reg_actual = obtener_equipo(int(row_id))
+                if reg_actual is None:
+                    st.warning("ID no existente.")
+                else:
+                    updates = {"estado": nuevo_estado}
+
+                    if nuevo_salon:
+                        updates["salon"] = nuevo_salon
+                        if nuevo_salon != "BODEGA":
+                            registrar_salon(nuevo_salon)
+
+                    if nueva_placa:
+                        # validar unicidad excepto si es la misma del registro editado
+                        placa_actual = str(reg_actual.get("placa") or "").upper()
+                        if nueva_placa != placa_actual and existe_placa(nueva_placa):
+                            st.error(f"La placa {nueva_placa} ya existe.")
+                            st.stop()
+                        updates["placa"] = nueva_placa
+
+                    actualizar_equipo(int(row_id), **updates)
+                    st.success("Actualizado.")
+                    st.rerun()
+
+            st.divider()
+
+            # Eliminar
+            del_id = st.number_input("Eliminar registro ID", min_value=0, step=1, key="inv_view_del_id")
+            if st.button("Eliminar", type="secondary", key="inv_view_delete"):
+                if obtener_equipo(int(del_id)) is not None:
+                    eliminar_equipo(int(del_id))
+                    st.success("Eliminado.")
+                    st.rerun()
+                else:
+                    st.warning("ID no encontrado.")
+
+    # ---------- TAB: PLANTILLAS ----------
+    with tab_tpl:
+        st.markdown("### Plantillas de carga (estandarizadas)")
+        # Usamos encabezados estándar y añadimos 'placa' (opcional)
+        cols = ["nombre","tipo","estado","salon","responsable","fecha_registro","placa"]
+        ejemplo = pd.DataFrame([
+            ["Osciloscopio 100MHz","Osciloscopio","Disponible","C3-204","Mateo","2025-10-17","EQ-OSC-0001"],
+            ["Multímetro TRMS","Multímetro","En uso","C3-204","Mateo","2025-10-17",""]  # consumible sin placa
+        ], columns=cols)
+        st.dataframe(ejemplo, use_container_width=True)
+
+        # CSV
+        st.download_button(
+            "Descargar plantilla CSV",
+            ejemplo.to_csv(index=False).encode("utf-8"),
+            file_name="plantilla_inventario.csv",
+            mime="text/csv",
+            key="inv_tpl_csv"
+        )
+
+        # XLSX
+        bio = io.BytesIO()
+        with pd.ExcelWriter(bio, engine="xlsxwriter") as writer:
+            ejemplo.to_excel(writer, index=False, sheet_name="inventario_template")
+            pd.DataFrame({"CATEGORIAS_VALIDAS": CATEGORIAS_VALIDAS}).to_excel(writer, index=False, sheet_name="listas")
+            pd.DataFrame({"ESTADOS_VALIDOS": ESTADOS_VALIDOS}).to_excel(writer, index=False, sheet_name="listas", startcol=2)
+        st.download_button(
+            "Descargar plantilla XLSX",
+            data=bio.getvalue(),
+            file_name="plantilla_inventario.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            key="inv_tpl_xlsx"
+        )
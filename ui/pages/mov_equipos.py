@@ -0,0 +1,85 @@
+# ui/pages/mov_equipos.py
+"""Movimientos de equipos (trazabilidad de traslados): filtros en SQL y paginación keyset."""
+import streamlit as st
+
+from database import (
+    consultar_movimientos, resumen_movimientos, movimientos_por_salon,
+    valores_filtro_movimientos, consulta_exportar_movimientos,
+)
+from ui.theme import badge, card
+from ui_helpers import descarga_diferida
+
+
+def render():
+    st.header("🔀 Movimientos de equipos")
+
+    # Filtros -> predicados SQL sobre columnas indexadas (no se carga la tabla)
+    opciones = valores_filtro_movimientos()
+    c1, c2, c3 = st.columns(3)
+    with c1: f_placa = st.text_input("Placa (exacta)", key="mov_placa").strip().upper()
+    with c2: f_origen = st.selectbox("Salón origen", ["Todos"] + opciones["salon_origen"], key="mov_origen")
+    with c3: f_destino = st.selectbox("Salón destino", ["Todos"] + opciones["salon_destino"], key="mov_destino")
+    c4, c5, c6 = st.columns([2, 2, 1])
+    with c4: f_resp = st.selectbox("Responsable", ["Todos"] + opciones["responsable"], key="mov_resp")
+    with c5: f_rango = st.date_input("Rango de fechas", [], key="mov_rango")
+    with c6: por_pagina = st.selectbox("Filas por página", [25, 50, 100, 200], index=1, key="mov_pp")
+
+    filtros = {
+        "placa": f_placa or None,
+        "salon_origen": None if f_origen == "Todos" else f_origen,
+        "salon_destino": None if f_destino == "Todos" else f_destino,
+        "responsable": None if f_resp == "Todos" else f_resp,
+    }
+    if isinstance(f_rango, (list, tuple)) and len(f_rango) == 2:
+        filtros["fecha_ini"], filtros["fecha_fin"] = f_rango
+
+    resumen = resumen_movimientos(**filtros)
+    if resumen["total"] == 0:
+        card("Movimientos", badge("Sin movimientos con estos filtros", "ok"))
+        return
+
+    k1, k2, k3 = st.columns(3)
+    k1.metric("Movimientos", resumen["total"])
+    k2.metric("Equipos distintos", resumen["equipos"])
+    k3.metric("Periodo", f"{resumen['primero'][:10]} → {resumen['ultimo'][:10]}")
+
+    # Paginación keyset: pila de cursores; se reinicia si cambian los filtros
+    firma = (tuple(sorted((k, str(v)) for k, v in filtros.items())), por_pagina)
+    if st.session_state.get("mov_firma") != firma:
+        st.session_state.mov_firma = firma
+        st.session_state.mov_cursores = [None]
+    cursores = st.session_state.mov_cursores
+
+    df, siguiente = consultar_movimientos(limite=por_pagina, despues_de=cursores[-1], **filtros)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+    n_pag = len(cursores)
+    total_pag = -(-resumen["total"] // por_pagina)
+    p1, p2, p3 = st.columns([1, 2, 1])
+    with p1:
+        if st.button("← Anterior", key="mov_prev", disabled=n_pag == 1):
+            cursores.pop()
+            st.rerun()
+    with p2:
+        st.caption(f"Página {n_pag} de {total_pag} · {resumen['total']} movimientos")
+    with p3:
+        if st.button("Siguiente →", key="mov_next", disabled=siguiente is None):
+            cursores.append(siguiente)
+            st.rerun()
+
+    descarga_diferida("CSV", consulta_exportar_movimientos(**filtros),
+                      "movimientos_equipos.csv", key="mov_csv")
+
+    st.divider()
+
+    # Conteos por origen/destino (GROUP BY en SQL con los mismos filtros)
+    st.markdown("### 🧭 Movimientos por salón")
+    g1, g2 = st.columns(2)
+    with g1:
+        st.caption("Desde (origen)")
+        st.dataframe(movimientos_por_salon("salon_origen", 15, **filtros),
+                     use_container_width=True, hide_index=True)
+    with g2:
+        st.caption("Hacia (destino)")
+        st.dataframe(movimientos_por_salon("salon_destino", 15, **filtros),
+                     use_container_width=True, hide_index=True)
@@ -0,0 +1,104 @@
+# ui/pages/registrar.py
+"""Registro de entrega/devolución de llaves."""
+import streamlit as st
+
+from database import registrar_evento, llave_activa_por_salon
+from ui.theme import badge, card
+from ui_helpers import now_str
+from validators import (
+    validar_nombre_instructor,
+    titlecase_nombre,
+    _normalize_spaces,
+    normalizar_salon_label,
+)
+
+# Lista base de programas (el selectbox de Streamlit tiene búsqueda por tipeo)
+PROGRAMAS_BASE = [
+    "Electrónica",
+    "ADSO",
+    "Multimedia"
+    "Redes",
+    "Teleco",
+    "Otro…",
+]
+
+
+def render():
+    st.header("📝 Registrar Prestamo de Salones")
+
+    card(
+        "Instrucciones",
+        "Completa los campos y registra **Entregada** o **Devuelta**.  \n"
+        + badge("Una llave no puede entregarse dos veces seguidas", "warn")
+    )
+
+
+    # Fuente de programas (permite que crezcan por sesión)
+    if "programas" not in st.session_state:
+        st.session_state.programas = PROGRAMAS_BASE.copy()
+
+    with st.form("form_llave", clear_on_submit=True):
+        c1, c2 = st.columns(2)
+        with c1:
+            # Nombre con validación estricta (sin números)
+            nombre_raw = st.text_input("Instructor *", key="reg_nombre", placeholder="Ej: Ana María Pérez")
+
+            # Programa con autocompletado
+            programa_sel = st.selectbox("Programa *", options=st.session_state.programas, key="reg_programa")
+        with c2:
+            salon_raw = st.text_input("Salón *", placeholder="Ej: Sala 7 / 316-F / Bodega", key="reg_salon")
+            accion = st.selectbox("Acción *", ["Entregada", "Devuelta"], key="reg_accion")
+
+        # Si el usuario escoge "Otro…", pedimos el nombre del programa
+        otro_programa = None
+        if programa_sel == "Otro…":
+            otro_programa = st.text_input("Escribe el nombre del programa", key="reg_programa_otro")
+
+        # Botón de envío
+        if st.form_submit_button("Registrar", type="primary", use_container_width=False):
+
+            # --- Validaciones y normalizaciones ---
+            ok, msg = validar_nombre_instructor(nombre_raw)
+            if not ok:
+                st.error(msg)
+                st.stop()
+
+            nombre_fmt = titlecase_nombre(nombre_raw)
+            salon = normalizar_salon_label(salon_raw)
+            if not salon:
+                st.error("Indica un salón válido.")
+                st.stop()
+
+            # Programa final (si escribió “Otro…”)
+            if programa_sel == "Otro…":
+                p = _normalize_spaces(otro_programa or "")
+                if not p:
+                    st.error("Escribe el nombre del programa.")
+                    st.stop()
+                p_fmt = titlecase_nombre(p)
+                if p_fmt not in st.session_state.programas:
+                    st.session_state.programas.insert(-1, p_fmt)  # antes de “Otro…”
+                programa_final = p_fmt
+            else:
+                programa_final = programa_sel
+
+            # --- Reglas de negocio ---
+            if accion == "Entregada" and llave_activa_por_salon(salon):
+                st.error(f"La llave del salón {salon} ya está prestada. Primero debe devolverse.")
+                st.stop()
+
+            # --- Guardado ---
+            registrar_evento(
+                nombre_fmt,
+                programa_final,
+                salon,
+                accion,
+                now_str()
+            )
+
+            b = badge("OK", "ok") if accion == "Devuelta" else badge("Entregada", "warn")
+            card(
+                "Registro exitoso",
+                f"{b}  \n**{accion}** para **{salon}** — **{nombre_fmt}** ({programa_final})  \n🕒 {now_str()}"
+            )
+            st.rerun()
@@ -0,0 +1,131 @@
+# ui/pages/stats.py
+"""Estadísticas: agregados calculados en SQL (GROUP BY), nunca el historial completo."""
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from database import (
+    resumen_historial, contar_inventario, valores_filtro_historial,
+    movimientos_por_dia, top_llaves, inventario_por_estado,
+)
+from ui.theme import badge, card
+
+
+def render():
+    st.header("📈 Estadísticas")
+
+    # ----- Datos base (solo agregados) -----
+    res = resumen_historial()
+    total_inv = contar_inventario()
+
+    if res["total"] == 0 and total_inv == 0:
+        card("Sin datos", badge("Aún no hay información para graficar", "warn"))
+    else:
+        # ---------- KPIs ----------
+        k1, k2, k3, k4 = st.columns(4)
+        k1.metric("📝 Movimientos", res["total"])
+        k2.metric("🔑 Entregas", res["Entregada"])
+        k3.metric("✅ Devoluciones", res["Devuelta"])
+        k4.metric("🧰 Equipos inventario", total_inv)
+
+        st.divider()
+
+        # ---------- Filtros (se aplican en SQL) ----------
+        filtros = None
+        if res["total"]:
+            opciones = valores_filtro_historial()
+            hoy = pd.Timestamp.now().normalize()
+            fecha_ini = hoy - pd.Timedelta(days=30)
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                rango = st.date_input("Rango (llaves)", [fecha_ini.date(), hoy.date()], key="flt_stats_rango")
+            with c2:
+                f_salon = st.selectbox("Salón", ["Todos"] + opciones["salon"], key="flt_stats_salon")
+            with c3:
+                f_area = st.selectbox("Área", ["Todos"] + opciones["area"], key="flt_stats_area")
+
+            filtros = {
+                "salon": None if f_salon == "Todos" else f_salon,
+                "area": None if f_area == "Todos" else f_area,
+            }
+            if isinstance(rango, (list, tuple)) and len(rango) == 2:
+                filtros["fecha_ini"], filtros["fecha_fin"] = rango
+
+        # ============ Gráfico 1: Movimientos diarios (últimos 30 días / filtrado) ============
+        st.subheader("🗓️ Movimientos por día")
+        g1 = movimientos_por_dia(**filtros) if filtros is not None else None
+        if g1 is None or g1.empty:
+            card("Movimientos por día", badge("Sin datos de llaves en el rango", "warn"))
+        else:
+            chart1 = (
+                alt.Chart(g1)
+                .mark_bar()
+                .encode(
+                    x=alt.X("fecha:T", title="Fecha"),
+                    y=alt.Y("movimientos:Q", title="Movimientos"),
+                    tooltip=["fecha:T", "movimientos:Q"],
+                )
+                .properties(height=240)
+            )
+            st.altair_chart(chart1, use_container_width=True)
+
+        st.divider()
+
+        # ============ Gráfico 2: Top salones e instructores ============
+        colA, colB = st.columns(2)
+        with colA:
+            st.subheader("🏫 Top salones")
+            top_salones = top_llaves("salon", 8, **filtros) if filtros is not None else None
+            if top_salones is None or top_salones.empty:
+                card("Top salones", badge("Sin datos", "warn"))
+            else:
+                chart3 = (
+                    alt.Chart(top_salones)
+                    .mark_bar()
+                    .encode(
+                        x=alt.X("mov:Q", title="Movimientos"),
+                        y=alt.Y("salon:N", sort="-x", title="Salón"),
+                        tooltip=["salon","mov"]
+                    )
+                    .properties(height=240)
+                )
+                st.altair_chart(chart3, use_container_width=True)
+
+        with colB:
+            st.subheader("👤 Top instructores")
+            top_prof = top_llaves("nombre", 8, **filtros) if filtros is not None else None
+            if top_prof is None or top_prof.empty:
+                card("Top instructores", badge("Sin datos", "warn"))
+            else:
+                chart4 = (
+                    alt.Chart(top_prof)
+                    .mark_bar()
+                    .encode(
+                        x=alt.X("mov:Q", title="Movimientos"),
+                        y=alt.Y("nombre:N", sort="-x", title="Instructor"),
+                        tooltip=["nombre","mov"]
+                    )
+                    .properties(height=240)
+                )
+                st.altair_chart(chart4, use_container_width=True)
+
+        st.divider()
+
+        # ============ Gráfico 3: Estado del inventario ============
+        st.subheader("🧰 Estado del inventario")
+        if total_inv == 0:
+            card("Inventario", badge("No hay equipos registrados", "warn"))
+        else:
+            g5 = inventario_por_estado()
+            # donut sencillo
+            chart5 = (
+                alt.Chart(g5)
+                .mark_arc(innerRadius=60)
+                .encode(
+                    theta="cantidad:Q",
+                    color=alt.Color("estado:N", legend=None),
+                    tooltip=["estado","cantidad"]
+                )
+                .properties(height=280)
+            )
+            st.altair_chart(chart5, use_container_width=False)
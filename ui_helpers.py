@@ -1,4 +1,9 @@
 # ui_helpers.py
+import importlib.util
+import json
+from datetime import datetime
+
+import pandas as pd
 import streamlit as st
 from patterns import Result
 
@@ -8,3 +13,93 @@ def ui_result(r: Result):
             st.success(r.msg)
     else:
         st.error(getattr(r, "error", "Ocurrió un error."))
+
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def procesar_fechas(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return df
+    if "fecha_hora" in df.columns:
+        df["fecha_hora"] = pd.to_datetime(df["fecha_hora"], errors="coerce")
+        df["fecha"] = df["fecha_hora"].dt.date
+        df["hora"] = df["fecha_hora"].dt.strftime("%H:%M")
+        df["día_semana"] = df["fecha_hora"].dt.day_name()
+    return df
+
+_TERMINADOS = ("ok", "error", "interrumpido")
+
+
+def _barra_trabajo(trabajo_id: int):
+    from database import obtener_trabajo
+    t = obtener_trabajo(trabajo_id)
+    if t is None or t["estado"] in _TERMINADOS:
+        st.rerun()  # la página completa muestra el resultado
+    st.progress(float(t["progreso"]), text=t["mensaje"] or t["estado"].capitalize())
+
+
+# Con fragment la barra se refresca sola cada segundo sin rerun de toda la página
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+_barra_viva = _fragment(run_every=1.0)(_barra_trabajo) if _fragment else None
+
+
+def seguir_trabajo(trabajo_id: int, key: str) -> dict | None:
+    """
+    Avance de un trabajo en segundo plano (services.trabajos). Devuelve el
+    trabajo cuando terminó (estado ok/error/interrumpido); None mientras corre.
+    """
+    from database import obtener_trabajo
+    t = obtener_trabajo(trabajo_id)
+    if t is None:
+        return {"id": trabajo_id, "estado": "error", "error": "El trabajo ya no existe.", "resultado": None}
+    if t["estado"] in _TERMINADOS:
+        return t
+    if _barra_viva is not None:
+        _barra_viva(trabajo_id)
+    else:
+        st.progress(float(t["progreso"]), text=t["mensaje"] or t["estado"].capitalize())
+        st.button("Actualizar", key=f"{key}_actualizar")
+    return None
+
+
+def descarga_diferida(etiqueta: str, consulta: tuple, nombre_archivo: str, key: str,
+                      formato: str = "csv", hoja: str = "Datos"):
+    """
+    Botón 'Preparar <etiqueta>': encola un trabajo que escribe el archivo en
+    streaming desde SQL; la página sigue usable mientras tanto y al terminar
+    aparece el botón de descarga. Si cambian los filtros se descarta.
+    """
+    from services.exportacion import MIME
+    from services.trabajos import enviar_trabajo
+
+    firma = json.dumps([consulta[0], list(consulta[1]), formato, hoja], default=str)
+    estado = st.session_state.get(f"{key}_trabajo")
+    if estado and estado[0] != firma:
+        st.session_state.pop(f"{key}_trabajo")
+        estado = None
+
+    if st.button(f"Preparar {etiqueta}", key=f"{key}_prep"):
+        if formato == "xlsx" and importlib.util.find_spec("xlsxwriter") is None:
+            st.info("Para exportar a XLSX instala `xlsxwriter`. (Se mantiene la descarga CSV).")
+            return
+        trabajo_id = enviar_trabajo("exportar", consulta=consulta, formato=formato, hoja=hoja,
+                                    nombre_archivo=nombre_archivo)
+        estado = st.session_state[f"{key}_trabajo"] = (firma, trabajo_id)
+    if not estado:
+        return
+
+    t = seguir_trabajo(estado[1], key)
+    if t is None:
+        return
+    if t["estado"] != "ok":
+        st.error(f"No se pudo generar {etiqueta}: {t['error']}")
+        return
+    try:
+        with open(t["resultado"]["archivo"], "rb") as f:
+            datos = f.read()  # st.download_button necesita bytes
+    except FileNotFoundError:
+        st.session_state.pop(f"{key}_trabajo", None)
+        st.warning("El archivo ya no está disponible; vuelve a prepararlo.")
+        return
+    st.download_button(f"⬇️ Descargar {etiqueta}", data=datos, file_name=nombre_archivo,
+                       mime=MIME[formato], key=key)